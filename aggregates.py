@@ -0,0 +1,241 @@
+COUNT, DEPTH, HEIGHT = range(3)
+
+
+def better(fn):
+    # How a min or max reducer compares a new value against the current one.
+    if fn is min:
+        return lambda value, current: value < current
+    elif fn is max:
+        return lambda value, current: value > current
+
+
+class Aggregates:
+    # Descendant counts, depths, subtree heights and column reducers for the
+    # items of a tree, kept up to date from the changes the tree reports.
+    # Reducers are named (column, fn) pairs over an item's subtree, itself
+    # included. fn is given the item's value and its children's results, None
+    # values left out, so it has to combine partial results as sum, min and max do.
+    def __init__(self, tree, **reducers):
+        self.tree = tree
+        self.rows = {}
+        self.names = {}
+        self.reducers = []
+        for name, (column, fn) in reducers.items():
+            self.names[name] = len(self.reducers)
+            self.reducers.append((tree.column_index(column), fn, better(fn)))
+
+        self.refresh()
+        tree.observe(self)
+
+    def refresh(self):
+        self.rows = {}
+        self.build(self.tree, -1)
+
+    def close(self):
+        self.tree.unobserve(self)
+
+    def add(self, name, column, fn):
+        self.names[name] = len(self.reducers)
+        self.reducers.append((self.tree.column_index(column), fn, better(fn)))
+        self.build(self.tree, -1)
+
+    def row(self, item):
+        row = self.rows.get(id(item))
+        if row is None:
+            # Items loaded since the last change, under a lazy node.
+            parent = self.rows.get(id(item.parent))
+            row = self.build(item, parent[DEPTH] + 1 if parent else 0)
+        return row
+
+    def count(self, item):
+        return self.row(item)[COUNT]
+
+    def depth(self, item):
+        return self.row(item)[DEPTH]
+
+    def height(self, item):
+        return self.row(item)[HEIGHT]
+
+    def value(self, item, name):
+        return self.row(item)[3 + self.names[name]]
+
+    def children(self, item):
+        return item if item.is_node() and item.is_loaded() else ()
+
+    def build(self, item, depth, below=True):
+        # Rows for an item and everything below it, children before their
+        # parents. Without below, the item's children are left out, as for a
+        # node about to be unloaded.
+        rows = self.rows
+        tree = self.tree
+        reducers = self.reducers
+        order = []
+        stack = [(item, depth)]
+        while stack:
+            node, level = stack.pop()
+            children = self.children(node) if below or node is not item else ()
+            order.append((node, children))
+            rows[id(node)] = [0, level, 0] + [None] * len(reducers)
+            if children:
+                stack.extend((child, level+1) for child in children)
+
+        for node, children in reversed(order):
+            row = rows[id(node)]
+            below = [rows[id(child)] for child in children] if children else ()
+            for child_row in below:
+                row[COUNT] += child_row[COUNT] + 1
+                if child_row[HEIGHT] >= row[HEIGHT]:
+                    row[HEIGHT] = child_row[HEIGHT] + 1
+            if not reducers:
+                continue
+
+            # As reduce does, reading the item's columns once.
+            columns = node.columns if node is not tree else ()
+            for idx, (column, fn, _) in enumerate(reducers, 3):
+                if node is tree:
+                    own = None
+                elif not column:
+                    own = node.name
+                else:
+                    own = columns[column-1] if column <= len(columns) else None
+                values = [] if own is None else [own]
+                for child_row in below:
+                    if child_row[idx] is not None:
+                        values.append(child_row[idx])
+                row[idx] = fn(values) if values or fn is sum else None
+        return rows[id(item)]
+
+    def reduce(self, node, idx):
+        column, fn, _ = self.reducers[idx]
+        rows = self.rows
+        own = node.get(column) if node is not self.tree else None
+        values = [] if own is None else [own]
+        for child in self.children(node):
+            value = rows[id(child)][3 + idx]
+            if value is not None:
+                values.append(value)
+        return fn(values) if values or fn is sum else None
+
+    def recount(self, node, field):
+        if field == HEIGHT:
+            return max((self.rows[id(child)][HEIGHT] + 1 for child in self.children(node)), default=0)
+        return self.reduce(node, field - 3)
+
+    def update(self, node, field, added, removed):
+        # A subtree below node now gives added where it gave removed. Walk up
+        # while the change still moves a value. A child gives its height plus one.
+        fn = max if field == HEIGHT else self.reducers[field - 3][1]
+        compare = better(fn)
+        while node is not None and (added is not None or removed is not None):
+            row = self.rows[id(node)]
+            current = row[field]
+            if fn is sum:
+                row[field] = (current or 0) + (added or 0) - (removed or 0)
+                node = node.parent
+                continue
+            elif compare is None or (removed is not None and removed == current):
+                value = self.recount(node, field)
+            elif added is not None and (current is None or compare(added, current)):
+                value = added
+            else:
+                return
+
+            if value == current:
+                return
+            row[field] = value
+            added, removed = (value + 1, current + 1) if field == HEIGHT else (value, current)
+            node = node.parent
+
+    def grow(self, node, row, sign=1):
+        # Add, or with sign -1 take away, a subtree summed up by row, below node.
+        count = sign * (row[COUNT] + 1)
+        parent = node
+        while parent is not None:
+            self.rows[id(parent)][COUNT] += count
+            parent = parent.parent
+
+        height = row[HEIGHT] + 1
+        if sign > 0:
+            self.update(node, HEIGHT, height, None)
+        else:
+            self.update(node, HEIGHT, None, height)
+        for idx in range(len(self.reducers)):
+            value = row[3 + idx]
+            if value is not None:
+                self.update(node, 3 + idx, value if sign > 0 else None, None if sign > 0 else value)
+
+    def carry(self, node, old, new):
+        # The row of node went from old to new, its ancestors follow.
+        count = new[COUNT] - old[COUNT]
+        parent = node.parent
+        while parent is not None:
+            self.rows[id(parent)][COUNT] += count
+            parent = parent.parent
+
+        if node.parent is None:
+            return
+        self.update(node.parent, HEIGHT, new[HEIGHT] + 1, old[HEIGHT] + 1)
+        for idx in range(3, len(new)):
+            self.update(node.parent, idx, new[idx], old[idx])
+
+    def forget(self, item):
+        stack = [item]
+        while stack:
+            node = stack.pop()
+            self.rows.pop(id(node), None)
+            stack.extend(self.children(node))
+
+    def added(self, item):
+        row = self.build(item, self.row(item.parent)[DEPTH] + 1)
+        self.grow(item.parent, row)
+
+    def removed(self, item, parent, idx):
+        row = self.rows.get(id(item))
+        if row is not None:
+            self.grow(parent, row, -1)
+        self.forget(item)
+
+    def moved(self, item, parent, idx):
+        row = self.row(item)
+        self.grow(parent, row, -1)
+        self.grow(item.parent, row)
+
+        shift = self.row(item.parent)[DEPTH] + 1 - row[DEPTH]
+        if shift:
+            stack = [item]
+            while stack:
+                node = stack.pop()
+                self.row(node)[DEPTH] += shift
+                stack.extend(self.children(node))
+
+    def loaded(self, node):
+        # The items read in under a lazy node are added in one step, the node's row built again with them.
+        row = self.rows.get(id(node))
+        if row is not None:
+            self.carry(node, row, self.build(node, row[DEPTH]))
+
+    def unloaded(self, node):
+        row = self.rows.get(id(node))
+        if row is None:
+            return
+        for child in node._children or ():
+            self.forget(child)
+        self.carry(node, row, self.build(node, row[DEPTH], below=False))
+
+    def renamed(self, item, name):
+        pass
+
+    def changed(self, item, column, old, value):
+        for idx, (_column, fn, _) in enumerate(self.reducers):
+            if _column != column:
+                continue
+            row = self.row(item)
+            if fn is sum:
+                self.update(item, 3 + idx, value, old)
+                continue
+
+            current = row[3 + idx]
+            new = self.reduce(item, idx)
+            if new != current:
+                row[3 + idx] = new
+                self.update(item.parent, 3 + idx, new, current)
@@ -0,0 +1,210 @@
+import gc
+
+STALE = 16
+WIDTH = 4
+
+
+class Batch:
+    # The changes made within tree.batch(), kept as one. Duplicate names are
+    # looked for once, at commit, among the items added, moved or renamed.
+    # Observers with a refresh method, as indexes, aggregates and row indexes
+    # have, are set aside once there is more than a change per STALE items,
+    # and refreshed in one pass at commit. Other observers, as a journal or
+    # storage, are told of every change. Each change is recorded with what
+    # undoes it, and on an exception, or a duplicate name, the tree is put
+    # back as it was. A batch within a batch undoes only its own changes. In a
+    # concurrent tree the batch holds the write lock, so readers see all of it or none.
+    # The log is kept flat, WIDTH slots a change, rather than a tuple each,
+    # and the renames and changes of items added in the batch are not logged
+    # at all, undoing the add drops them. The batch is told of each change by
+    # the method making it, ahead of the observers and without going through
+    # them, so a batch on a tree without observers costs no more than the
+    # same changes made one by one.
+    def __init__(self, tree):
+        self.tree = tree
+        self.outer = None
+        self.mark = 0
+        self.floor = 0
+        self.items = 0
+        self.collecting = False
+
+    def __enter__(self):
+        tree = self.tree
+        if tree._lock is not None:
+            tree._lock.acquire_write()
+        self.items = tree.items
+        if tree._batch is not None:
+            self.outer = tree._batch
+            self.mark = len(self.outer.log)
+            # Undoing this batch alone drops only the items added after its mark.
+            self.floor = self.outer.floor
+            self.outer.floor = self.mark
+            return self
+
+        # As in bulk loads, the cyclic collector would rescan the tree many
+        # times over while the batch holds on to what it changed.
+        self.collecting = gc.isenabled()
+        gc.disable()
+        self.log = []
+        self.fresh = {}
+        self.touched = []
+        self.stale = []
+        self.deferred = False
+        self.limit = WIDTH * (len(tree._ids) // STALE)
+        tree._batch = self
+        return self
+
+    def __exit__(self, kind, value, traceback):
+        lock = self.tree._lock
+        try:
+            self.end(kind)
+        finally:
+            if lock is not None:
+                lock.release_write()
+        return False
+
+    def end(self, kind):
+        if self.outer is not None:
+            self.outer.floor = self.floor
+            if kind is not None:
+                self.outer.undo(self.mark, self.items)
+            return
+
+        try:
+            if kind is not None:
+                self.undo(0, self.items)
+            else:
+                name = self.duplicate()
+                if name is not None:
+                    self.undo(0, self.items)
+                    raise ValueError(f'duplicate name {name} found.')
+        finally:
+            self.close()
+
+    def close(self):
+        tree = self.tree
+        tree._batch = None
+        tree._observers = tree._observers + self.stale
+        try:
+            for observer in self.stale:
+                observer.refresh()
+        finally:
+            if self.collecting:
+                gc.enable()
+
+    def record(self, kind, item, first=None, second=None):
+        log = self.log
+        log += kind, item, first, second
+        if len(log) > self.limit and not self.deferred:
+            self.defer()
+
+    def defer(self):
+        tree = self.tree
+        self.deferred = True
+        self.stale = [observer for observer in tree._observers if hasattr(observer, 'refresh')]
+        tree._observers = [observer for observer in tree._observers if not hasattr(observer, 'refresh')]
+
+    def duplicate(self):
+        tree = self.tree
+        if not tree.unique:
+            return
+        for item in self.touched:
+            if item._tree is tree and item.parent._names.get(item.name).__class__ is list:
+                return item.name
+
+    def undo(self, mark, items):
+        # Undo the changes after mark, last first, telling the observers but not the batch.
+        tree = self.tree
+        log = self.log
+        tree._batch = Replay()
+        try:
+            while len(log) > mark:
+                kind, item, first, second = log[-WIDTH:]
+                del log[-WIDTH:]
+                getattr(self, f'undo_{kind}')(item, first, second)
+        finally:
+            tree._batch = self
+            self.fresh = {key: position for key, position in self.fresh.items() if position < len(log)}
+        tree.items = items
+
+    def undo_added(self, item, *_):
+        item.delete()
+
+    def undo_removed(self, item, parent, idx):
+        # Deleted, or moved to another tree.
+        if item._tree is not None:
+            item.move(parent, idx)
+            return
+
+        tree = self.tree
+        if tree._pending:
+            tree._unshare(parent, structure=True)
+        tree.adopt(item)
+        parent._link(item, idx)
+        item.parent = parent
+        if tree._observers:
+            tree.notify('added', item)
+
+    def undo_moved(self, item, parent, idx):
+        item.move(parent, idx)
+
+    def undo_renamed(self, item, name, _):
+        item.rename(name)
+
+    def undo_changed(self, item, column, old):
+        item.set(column, old)
+
+    def added(self, item):
+        # Added again after it was removed, it was there before the batch, see removed.
+        log = self.log
+        self.touched.append(item)
+        self.fresh.setdefault(id(item), len(log))
+        log += 'added', item, None, None
+        if len(log) > self.limit and not self.deferred:
+            self.defer()
+
+    def removed(self, item, parent, idx):
+        log = self.log
+        self.fresh.setdefault(id(item), -1)
+        log += 'removed', item, parent, idx
+        if len(log) > self.limit and not self.deferred:
+            self.defer()
+
+    def moved(self, item, parent, idx):
+        self.touched.append(item)
+        self.record('moved', item, parent, idx)
+
+    def renamed(self, item, name):
+        self.touched.append(item)
+        if self.fresh.get(id(item), -1) < self.floor:
+            log = self.log
+            log += 'renamed', item, name, None
+            if len(log) > self.limit and not self.deferred:
+                self.defer()
+
+    def changed(self, item, column, old, value):
+        # Items added after the floor are dropped by the undo, whatever they hold.
+        if self.fresh.get(id(item), -1) < self.floor:
+            log = self.log
+            log += 'changed', item, column, old
+            if len(log) > self.limit and not self.deferred:
+                self.defer()
+
+
+class Replay:
+    # Stands in for a batch while it undoes its changes, so names are still
+    # checked only at the end, and the undoing is not logged in turn.
+    def added(self, item):
+        pass
+
+    def removed(self, item, parent, idx):
+        pass
+
+    def moved(self, item, parent, idx):
+        pass
+
+    def renamed(self, item, name):
+        pass
+
+    def changed(self, item, column, old, value):
+        pass
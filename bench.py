@@ -0,0 +1,628 @@
+import os
+import sys
+import json
+import pickle
+import hashlib
+import random
+import tempfile
+import tracemalloc
+from time import perf_counter, sleep
+from threading import Thread, Event, Lock
+from contextlib import redirect_stdout, nullcontext
+
+from tree import Tree, Base, Node, Leaf
+from parallel import chunks, Row
+
+
+def timed(func, setup=None, repeat=3):
+    best = None
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = perf_counter()
+        func(*args)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def chain(tree, depth):
+    node = tree
+    for level in range(depth):
+        node = node.append(Node(name=f'Node {level}'))
+    return node
+
+
+def bench_deep_append(depths=(1, 10, 50, 200, 1000), count=20000):
+    print('-- deep append ----------------------------------------')
+    print(f'{"depth":>6} {"append/s":>12} {"get/s":>12}')
+
+    for depth in depths:
+        def setup():
+            return chain(Tree(headings=['Type', 'Size']), depth),
+
+        def append(node):
+            for idx in range(count):
+                node.append(Leaf(name=f'Leaf {idx}'))
+
+        def get():
+            for _ in range(count):
+                leaf.get()
+
+        t = Tree(headings=['Type', 'Size'])
+        leaf = chain(t, depth).append(Leaf(name='Leaf'))
+
+        print(f'{depth:>6} {count / timed(append, setup):>12,.0f} {count / timed(get):>12,.0f}')
+
+
+def recursive_preorder(node):
+    for item in node:
+        yield item
+        if item.is_node():
+            yield from recursive_preorder(item)
+
+
+def recursive_to_list(node):
+    data = []
+    for item in node:
+        item_data = {'name': item.name, 'columns': item.columns}
+        data.append(item_data)
+        if item.is_node():
+            item_data['children'] = recursive_to_list(item)
+    return data
+
+
+def wide(count, fanout=10):
+    t = Tree()
+    level = [t]
+    total = 0
+    while total < count:
+        nodes = []
+        for parent in level:
+            for idx in range(fanout):
+                if total >= count:
+                    break
+                nodes.append(parent.append(Node(name=f'Node {idx}')))
+                total += 1
+        level = nodes
+    return t
+
+
+def bench_traversal(count=100000, depth=900):
+    print('-- traversal, items/s ---------------------------------')
+    print(f'{"tree":>12} {"walk":>12} {"recursive":>12} {"iterative":>12}')
+
+    trees = (
+        (f'wide {count}', wide(count)),
+        (f'deep {depth}', chain(Tree(), depth).tree),
+    )
+    for label, t in trees:
+        size = sum(1 for _ in t.iter_preorder())
+        rows = (
+            ('preorder', lambda: sum(1 for _ in recursive_preorder(t)), lambda: sum(1 for _ in t.iter_preorder())),
+            ('to_list', lambda: recursive_to_list(t), lambda: t.to_list()),
+        )
+        for name, recursive, iterative in rows:
+            print(f'{label:>12} {name:>12} {size / timed(recursive):>12,.0f} {size / timed(iterative):>12,.0f}')
+
+
+def bench_memory(count=100000):
+    print('-- memory, bytes per item -----------------------------')
+    print(f'{"tree":>12} {"headings":>9} {"columnar":>9} {"bytes":>10}')
+
+    def leaves(t):
+        node = t
+        for idx in range(count):
+            if not idx % 100:
+                node = t.append(Node(name=f'Node {idx}'))
+            node.append(Leaf(name=f'Leaf {idx}'))
+
+    def nodes(t):
+        node = t
+        for idx in range(count):
+            if not idx % 100:
+                node = t.append(Node(name=f'Node {idx}'))
+            node.append(Node(name=f'Sub Node {idx}'))
+
+    layouts = (([], False), (['Type', 'Size', 'Path'], False), (['Type', 'Size', 'Path'], True))
+    for label, build in (('leaf-heavy', leaves), ('node-heavy', nodes)):
+        for headings, columnar in layouts:
+            tracemalloc.start()
+            t = Tree(headings=headings, columnar=columnar, dtypes={'Size': 'q'})
+            build(t)
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            # Item names are shared by every layout, leave them out.
+            names = sum(sys.getsizeof(item.name) for item in t.iter_preorder())
+            print(f'{label:>12} {len(headings):>9} {str(columnar):>9} {(size - names) / t.items:>10,.0f}')
+            del t
+
+
+def nested(count, fanout=10, width=3):
+    # Nested populate data with about count items, nodes holding fanout children each.
+    data = []
+    level = [data]
+    total = 0
+    while total < count:
+        nodes = []
+        for children in level:
+            for idx in range(fanout):
+                if total >= count:
+                    break
+                item = {'name': f'Item {idx}', 'columns': [None] * width, 'children': []}
+                children.append(item)
+                nodes.append(item['children'])
+                total += 1
+        level = nodes
+
+    # Items that were never given children are leaves.
+    stack = list(data)
+    while stack:
+        item = stack.pop()
+        if item['children']:
+            stack.extend(item['children'])
+        else:
+            del item['children']
+    return data
+
+
+def bench_populate(sizes=(10**4, 10**5, 10**6)):
+    print('-- populate, items/s ----------------------------------')
+    print(f'{"items":>9} {"populate":>12} {"fast":>12} {"speedup":>8}')
+
+    headings = ['Type', 'Size', 'Path']
+    for size in sizes:
+        data = nested(size)
+        slow = timed(lambda: Tree(headings=headings).populate(data), repeat=1)
+        fast = timed(lambda: Tree(headings=headings).populate(data, fast=True), repeat=1)
+        print(f'{size:>9,} {size / slow:>12,.0f} {size / fast:>12,.0f} {slow / fast:>7.1f}x')
+
+
+def copy_move(node, dst):
+    # Node.move before it reparented items: copy the subtree, then delete it.
+    copy = dst.append(Node(name=node.name))
+    copy.populate(node.to_list())
+    node.delete()
+    return copy
+
+
+def bench_move(sizes=(10**3, 10**4, 10**5)):
+    print('-- move subtree, seconds ------------------------------')
+    print(f'{"items":>9} {"copy":>12} {"same tree":>12} {"new tree":>12}')
+
+    def setup(size):
+        t = Tree(headings=['Type', 'Size'])
+        t.populate([{'name': 'Source', 'children': nested(size)}], fast=True)
+        return t[0], t.append(Node(name='Destination'))
+
+    for size in sizes:
+        copy = timed(copy_move, lambda: setup(size))
+        same = timed(lambda node, dst: node.move(dst), lambda: setup(size))
+        other = timed(lambda node, dst: node.move(Tree(headings=['Type', 'Size'])), lambda: setup(size))
+        print(f'{size:>9,} {copy:>12.6f} {same:>12.6f} {other:>12.6f}')
+
+
+def copy_clone(node, dst):
+    # Base.clone before it shared structure: copy the whole subtree up front.
+    copy = dst.append(Node(name=node.name, columns=node.columns))
+    copy.populate(node.to_list())
+    return copy
+
+
+def bench_clone(sizes=(10**3, 10**4, 10**5), edits=10):
+    print('-- clone subtree --------------------------------------')
+    print(f'{"items":>9} {"copy s":>10} {"clone s":>10} {"copy KB":>10} {"clone KB":>10} {"edited KB":>10}')
+
+    for size in sizes:
+        t = Tree(headings=['Type', 'Size'])
+        t.populate([{'name': 'Source', 'children': nested(size, width=2)}], fast=True)
+        src = t[0]
+        paths = [item for item in src.iter_preorder() if not item.is_node()][:edits]
+
+        copy = timed(lambda: copy_clone(src, Tree(headings=['Type', 'Size'])), repeat=1)
+        clone = timed(lambda: src.clone(Tree(headings=['Type', 'Size'])))
+
+        memory = []
+        for func in (copy_clone, Base.clone):
+            tracemalloc.start()
+            dst = Tree(headings=['Type', 'Size'])
+            node = func(src, dst)
+            memory.append(tracemalloc.get_traced_memory()[0])
+            if func is Base.clone:
+                for item in paths:
+                    node.find(item.path()[len(src.path()) + 1:]).set(2, 1)
+                memory.append(tracemalloc.get_traced_memory()[0])
+            tracemalloc.stop()
+            del dst, node
+
+        print(f'{size:>9,} {copy:>10.6f} {clone:>10.6f} ' + ' '.join(f'{value / 1024:>10,.0f}' for value in memory))
+
+
+def bench_snapshot(sizes=(10**4, 10**5, 10**6)):
+    print('-- save and load, seconds -----------------------------')
+    print(f'{"items":>9} {"json save":>10} {"save":>10} {"json load":>10} {"load":>10} {"json MB":>8} {"MB":>8}')
+
+    headings = ['Type', 'Size', 'Path']
+    folder = tempfile.mkdtemp()
+    text = os.path.join(folder, 'tree.json')
+    binary = os.path.join(folder, 'tree.snap')
+
+    def dump(t):
+        with open(text, 'w') as file:
+            json.dump(t.to_list(), file)
+
+    def restore():
+        with open(text) as file:
+            Tree(headings=headings).populate(json.load(file), fast=True)
+
+    for size in sizes:
+        t = Tree(headings=headings)
+        t.populate(nested(size), fast=True)
+        for item in t.iter_preorder():
+            item.set((1, 2), (item.type, len(item) if item.is_node() else 1024))
+
+        times = (
+            timed(lambda: dump(t), repeat=1),
+            timed(lambda: t.save(binary), repeat=1),
+            timed(restore, repeat=1),
+            timed(lambda: Tree.load(binary), repeat=1),
+        )
+        megabytes = (os.path.getsize(text) / 2**20, os.path.getsize(binary) / 2**20)
+        print(f'{size:>9,} ' + ' '.join(f'{value:>10.3f}' for value in times) +
+              ' ' + ' '.join(f'{value:>8.1f}' for value in megabytes))
+
+    os.remove(text)
+    os.remove(binary)
+    os.rmdir(folder)
+
+
+def bench_json(sizes=(10**4, 10**5)):
+    print('-- json export and import, seconds and peak MB -------')
+    print(f'{"items":>9} {"dump s":>8} {"dump_json":>10} {"dump MB":>8} {"stream":>8} '
+          f'{"load s":>8} {"load_json":>10} {"load MB":>8} {"stream":>8}')
+
+    headings = ['Type', 'Size', 'Path']
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, 'tree.json')
+
+    def peak(func):
+        # Seconds, then megabytes held above what the call leaves behind, traced separately.
+        elapsed = timed(func, repeat=1)
+        tracemalloc.start()
+        result = func()
+        size, top = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+        return elapsed, (top - size) / 2**20
+
+    def dump(t):
+        with open(path, 'w') as file:
+            json.dump(t.to_list(), file)
+
+    def dump_json(t):
+        with open(path, 'w') as file:
+            t.dump_json(file)
+
+    def load():
+        with open(path) as file:
+            return Tree(headings=headings).populate(json.load(file))
+
+    def load_json():
+        with open(path) as file:
+            return Tree.load_json(file, headings=headings)
+
+    for size in sizes:
+        t = Tree(headings=headings)
+        t.populate(nested(size), fast=True)
+        for item in t.iter_preorder():
+            item.set((1, 2, 3), (item.type, len(item) if item.is_node() else 1024, item.path()))
+
+        results = peak(lambda: dump(t)) + peak(lambda: dump_json(t)) + peak(load) + peak(load_json)
+        print(f'{size:>9,} {results[0]:>8.3f} {results[2]:>10.3f} {results[1]:>8.1f} {results[3]:>8.1f} '
+              f'{results[4]:>8.3f} {results[6]:>10.3f} {results[5]:>8.1f} {results[7]:>8.1f}')
+        del t
+
+    os.remove(path)
+    os.rmdir(folder)
+
+
+def print_show(node, indent=2, index_pad=2):
+    # Node.show before the renderer: one print per item.
+    headings = node.tree.headings
+    header_postfix = f', Columns: {str(headings)}' if headings else ''
+    print('-----------------------------------------------------')
+    print(f'   ID: Name{header_postfix}')
+    print('-----------------------------------------------------')
+    for _node, level in node.walk():
+        pad = '' if not level else ' ' * (indent * level)
+        columns = '' if not _node.columns else f', {str(_node.columns)}'
+        print(f' {str(_node.id).zfill(index_pad)}:{pad} {_node.name}{columns}')
+
+
+def bench_render(sizes=(10**4, 10**5, 10**6)):
+    # To a file, and line buffered as stdout is on a terminal.
+    print('-- render, rows/s --------------------------------------')
+    print(f'{"items":>9} {"print":>10} {"tree":>10} {"csv":>10} {"fixed":>10} {"speedup":>8} '
+          f'{"print tty":>10} {"tree tty":>10} {"speedup":>8}')
+
+    headings = ['Type', 'Size', 'Path']
+    for size in sizes:
+        t = Tree(headings=headings)
+        t.populate(nested(size), fast=True)
+        results = []
+        for buffering in (-1, 1):
+            with open(os.devnull, 'w', buffering=buffering) as file:
+                def show():
+                    with redirect_stdout(file):
+                        print_show(t)
+
+                results.append(timed(show, repeat=1))
+                for format in ('tree', 'csv', 'fixed') if buffering < 0 else ('tree', ):
+                    results.append(timed(lambda: t.render(file, format), repeat=1))
+
+        rates = [size / result for result in results]
+        print(f'{size:>9,} {rates[0]:>10,.0f} {rates[1]:>10,.0f} {rates[2]:>10,.0f} {rates[3]:>10,.0f} '
+              f'{rates[1] / rates[0]:>7.1f}x {rates[4]:>10,.0f} {rates[5]:>10,.0f} {rates[5] / rates[4]:>7.1f}x')
+        del t
+
+def bench_journal(count=100000):
+    # With no subscriber a change costs one check of the tree's observers,
+    # timed on its own as a share of the change.
+    print('-- mutation journal, ops/s ----------------------------')
+    print(f'{"op":>8} {"none":>12} {"subscribed":>12} {"check %":>8} {"to_list/s":>10}')
+
+    def leaves():
+        t = Tree(headings=['Type', 'Size'])
+        src = t.append(Node(name='Source'))
+        t.append(Node(name='Destination'))
+        t.bulk_load([{'name': f'Leaf {idx}'} for idx in range(count)], parent=src)
+        return t,
+
+    def append(t):
+        node = t[1]
+        for idx in range(count):
+            node.append(Leaf(name=f'New {idx}'))
+
+    def change(t):
+        for idx, item in enumerate(t[0]):
+            item.set(1, idx)
+
+    def move(t):
+        dst = t[1]
+        for item in list(t[0]):
+            item.move(dst)
+
+    def subscribed():
+        t, = leaves()
+        t.subscribe(lambda events: None)
+        return t,
+
+    def check(t):
+        for _ in range(count):
+            if t._observers:
+                pass
+
+    for name, func in (('append', append), ('set', change), ('move', move)):
+        none = timed(func, leaves)
+        with_journal = timed(func, subscribed)
+        share = timed(check, leaves) / none * 100
+        sync = timed(lambda t: t.to_list(), leaves, repeat=1)
+        print(f'{name:>8} {count / none:>12,.0f} {count / with_journal:>12,.0f} {share:>7.1f}% {1 / sync:>10.1f}')
+
+
+def bench_batch(nodes=100, leaves=1000, count=100000):
+    # The same mixed edits, one by one and in a batch, on a bare tree and on
+    # one with a hash index, a sorted index and aggregates to keep up to date.
+    print('-- batched edits, ops/s ---------------------------------')
+    print(f'{"observers":>10} {"one by one":>12} {"batch":>12} {"speedup":>8}')
+
+    rnd = random.Random(1)
+    ids = list(range(2, nodes * (leaves + 1) + 1))
+    ids = [_id for _id in ids if (_id - 1) % (leaves + 1)]
+    rnd.shuffle(ids)
+    deleted = ids[:count // 10]
+    kept = ids[count // 10:]
+    ops = [('delete', _id, None) for _id in deleted]
+    for idx in range(count - len(ops)):
+        kind = rnd.choice(('set', 'set', 'set', 'set', 'set', 'rename', 'rename', 'append', 'append'))
+        if kind == 'append':
+            ops.append((kind, 1 + rnd.randrange(nodes) * (leaves + 1), f'New {idx}'))
+        elif kind == 'rename':
+            ops.append((kind, rnd.choice(kept), f'Renamed {idx}'))
+        else:
+            ops.append((kind, rnd.choice(kept), rnd.randrange(1000000)))
+    rnd.shuffle(ops)
+
+    def tree(observed):
+        def setup():
+            t = Tree(headings=['Type', 'Size'])
+            t.bulk_load([{'name': f'Node {node}', 'columns': ['Node', 0], 'children': [
+                {'name': f'Leaf {leaf}', 'columns': ['Leaf', leaf]} for leaf in range(leaves)]}
+                for node in range(nodes)])
+            if observed:
+                t.create_index('Type')
+                t.create_index('Size', kind='sorted')
+                t.aggregates(size=('Size', sum), largest=('Size', max))
+            return t,
+        return setup
+
+    def edit(t):
+        fetch = t.fetch
+        for kind, _id, value in ops:
+            item = fetch(_id)
+            if kind == 'set':
+                item.set(2, value)
+            elif kind == 'rename':
+                item.rename(value)
+            elif kind == 'append':
+                item.append(Leaf(name=value, columns=['Leaf', 0]))
+            else:
+                item.delete()
+
+    def batch(t):
+        with t.batch():
+            edit(t)
+
+    for name, observed in (('none', False), ('indexed', True)):
+        single = timed(edit, tree(observed), repeat=3)
+        batched = timed(batch, tree(observed), repeat=3)
+        print(f'{name:>10} {count / single:>12,.0f} {count / batched:>12,.0f} {single / batched:>7.1f}x')
+
+
+def bench_threads(nodes=100, leaves=100, seconds=2.0, readers=(1, 2, 4, 8)):
+    # Short reads per second from reader threads, while a writer changes the
+    # tree every millisecond and another thread reads the whole tree with
+    # to_list: a concurrent tree's readers-writer lock, against one mutex
+    # held around every call on a plain tree.
+    print('-- reads during writes, per second -----------------------')
+    print(f'{"readers":>8} {"rw reads":>10} {"writes":>7} {"mutex reads":>12} {"writes":>7}')
+
+    def tree(concurrent):
+        t = Tree(headings=['Type', 'Size'], concurrent=concurrent)
+        t.bulk_load([{'name': f'Node {node}', 'children': [
+            {'name': f'Leaf {leaf}', 'columns': ['Leaf', leaf]} for leaf in range(leaves)]} for node in range(nodes)])
+        return t
+
+    def run(count, concurrent):
+        t = tree(concurrent)
+        lock = nullcontext() if concurrent else Lock()
+        stop = Event()
+        reads = [0] * count
+        writes = [0]
+
+        def writer():
+            step = 0
+            while not stop.is_set():
+                with lock:
+                    node = t[step % nodes]
+                    node.append(Leaf(name=f'New {step}'))
+                    node[0].delete()
+                    node[-1].set(2, step)
+                writes[0] += 1
+                step += 1
+                sleep(0.001)
+
+        def report():
+            while not stop.is_set():
+                with lock:
+                    t.to_list()
+
+        def reader(idx):
+            step = idx
+            while not stop.is_set():
+                path = f'Node {step % nodes}/Leaf {step % leaves}'
+                with lock:
+                    item = t.find(path)
+                    if item is not None:
+                        t.get_cell(item.id, 2)
+                reads[idx] += 1
+                step += 7
+
+        threads = [Thread(target=writer), Thread(target=report)]
+        threads += [Thread(target=reader, args=(idx, )) for idx in range(count)]
+        for thread in threads:
+            thread.start()
+        sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return sum(reads) / seconds, writes[0] / seconds
+
+    for count in readers:
+        locked, locked_writes = run(count, True)
+        mutex, mutex_writes = run(count, False)
+        print(f'{count:>8} {locked:>10,.0f} {locked_writes:>7,.0f} {mutex:>12,.0f} {mutex_writes:>7,.0f}')
+
+
+def bench_view(sizes=(10**4, 10**5, 4 * 10**5), count=200):
+    # An append or delete among many expanded siblings, each followed by a
+    # window of 60 rows from the middle of the view.
+    print('-- view edit + window, ms -------------------------------')
+    print(f'{"siblings":>10} {"append":>10} {"delete":>10} {"toggle":>10}')
+
+    for size in sizes:
+        t = Tree(headings=['Type', 'Size'])
+        top = t.append(Node(name='Top'))
+        t.bulk_load([{'name': f'Node {idx}', 'columns': ['Node', idx], 'children': [{'name': 'Leaf'}]}
+                     for idx in range(size)], parent=top)
+        view = t.view()
+        view.expand(top)
+        for node in list(top)[::max(1, size // 100)]:
+            view.expand(node)
+
+        def append():
+            for idx in range(count):
+                top.insert(size // 2, Leaf(name=f'Leaf {idx}'))
+                view.rows(size // 2, 60)
+
+        def delete():
+            for idx in range(count):
+                top[size // 2].delete()
+                view.rows(size // 2, 60)
+
+        def toggle():
+            for idx in range(count):
+                view.toggle(top[size // 3])
+                view.rows(size // 2, 60)
+
+        times = [timed(func, repeat=1) * 1000 / count for func in (append, delete, toggle)]
+        print(f'{size:>10,} ' + ' '.join(f'{ms:>10.3f}' for ms in times))
+
+
+def digest(row):
+    # Enough work per item for the workers to be worth starting.
+    return hashlib.sha256(row.path.encode() * 200).hexdigest()[:16]
+
+
+def bench_parallel(nodes=200, leaves=500, workers=(1, 2, 4, 8, 16)):
+    # A path digest for each item, set in a column in this process, then
+    # mapped over worker processes. Scaling is bounded by the cores present.
+    print('-- parallel map, items/s ---------------------------------')
+    print(f'cores: {os.cpu_count()}')
+
+    def setup():
+        t = Tree(headings=['Type', 'Size', 'Digest'])
+        t.bulk_load([{'name': f'Node {node}', 'columns': ['Node', 0], 'children': [
+            {'name': f'Leaf {leaf}', 'columns': ['Leaf', leaf]} for leaf in range(leaves)]}
+            for node in range(nodes)])
+        return t,
+
+    def serial(t):
+        for item, depth in t.walk():
+            item.set(3, digest(Row(item.id, item.name, item.path(), item.type, depth, item.columns)))
+
+    count = nodes * (leaves + 1)
+    t, = setup()
+    part = next(chunks(t, 4))
+    print(f'{"payload":>10} {len(pickle.dumps(part)) / len(part[1]):>12,.0f} bytes/item')
+    print(f'{"serial":>10} {count / timed(serial, setup, repeat=1):>12,.0f}')
+    for size in workers:
+        elapsed = timed(lambda t: t.parallel_map(digest, 'Digest', workers=size), setup, repeat=1)
+        print(f'{size:>10} {count / elapsed:>12,.0f}')
+
+
+BENCHMARKS = {
+    'deep_append': bench_deep_append,
+    'traversal': bench_traversal,
+    'memory': bench_memory,
+    'populate': bench_populate,
+    'move': bench_move,
+    'clone': bench_clone,
+    'snapshot': bench_snapshot,
+    'json': bench_json,
+    'render': bench_render,
+    'journal': bench_journal,
+    'batch': bench_batch,
+    'threads': bench_threads,
+    'parallel': bench_parallel,
+    'view': bench_view,
+}
+
+
+def main():
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
+
+
+if __name__ == '__main__':
+    main()
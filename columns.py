@@ -0,0 +1,168 @@
+from array import array
+from itertools import compress
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Column:
+    def __init__(self, name=None, typecode=None):
+        self.name = name
+        self.typecode = typecode
+        if typecode:
+            # Numeric values live in an array, a parallel byte per row marks the ones that are set.
+            self.data = array(typecode)
+            self.valid = bytearray()
+        else:
+            self.data = []
+            self.valid = None
+
+    def __repr__(self):
+        return f'Column({self.name!r}, typecode={self.typecode!r})'
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, row):
+        if row >= len(self.data):
+            return
+        elif self.valid is None:
+            return self.data[row]
+        return self.data[row] if self.valid[row] else None
+
+    def __setitem__(self, row, value):
+        if self.valid is None:
+            self.data[row] = value
+        elif value is None:
+            self.data[row] = 0
+            self.valid[row] = 0
+        else:
+            self.data[row] = value
+            self.valid[row] = 1
+
+    def grow(self, size):
+        extra = size - len(self.data)
+        if extra <= 0:
+            return
+        elif self.valid is None:
+            self.data.extend([None] * extra)
+        else:
+            self.data.extend(array(self.typecode, bytes(extra * self.data.itemsize)))
+            self.valid.extend(bytes(extra))
+
+    def clear(self):
+        del self.data[:]
+        if self.valid is not None:
+            del self.valid[:]
+
+    def values(self):
+        if self.valid is None:
+            return [value for value in self.data if value is not None]
+        return list(compress(self.data, self.valid))
+
+    def items(self):
+        if self.valid is None:
+            return [(row, value) for row, value in enumerate(self.data) if value is not None]
+        return list(compress(enumerate(self.data), self.valid))
+
+    def count(self):
+        return len(self.values()) if self.valid is None else self.valid.count(1)
+
+    def sum(self):
+        return sum(self.values())
+
+    def min(self):
+        values = self.values()
+        return min(values) if values else None
+
+    def max(self):
+        values = self.values()
+        return max(values) if values else None
+
+    def mean(self):
+        count = self.count()
+        return self.sum() / count if count else None
+
+    def mask(self, predicate):
+        # One byte per row, set where the row holds a value that satisfies the predicate.
+        if self.valid is None:
+            return bytearray(value is not None and bool(predicate(value)) for value in self.data)
+        return bytearray(bool(valid and predicate(value)) for value, valid in zip(self.data, self.valid))
+
+    def where(self, predicate):
+        return list(compress(range(len(self)), self.mask(predicate)))
+
+    def to_numpy(self):
+        if numpy is None:
+            raise ImportError('numpy is required for to_numpy().')
+        elif self.valid is None:
+            return numpy.array(self.data, dtype=object)
+
+        data = numpy.frombuffer(self.data, dtype=self.data.typecode) if len(self.data) else numpy.array([])
+        return numpy.ma.masked_array(data, mask=~numpy.frombuffer(self.valid, dtype=bool))
+
+
+class ColumnStore:
+    def __init__(self, headings, dtypes=None):
+        dtypes = dtypes or {}
+        self.columns = []
+        for idx, heading in enumerate(headings):
+            typecode = dtypes.get(heading, dtypes.get(idx+1))
+            self.columns.append(Column(heading, typecode))
+        self.size = 0
+
+    def __repr__(self):
+        return f'ColumnStore({[column.name for column in self.columns]!r})'
+
+    @property
+    def width(self):
+        return len(self.columns)
+
+    def column(self, column):
+        # Columns are numbered from 1 as in Base.get, or named by their heading.
+        if isinstance(column, int):
+            if not 0 < column <= len(self.columns):
+                raise IndexError(f'column {column} out of range.')
+            return self.columns[column-1]
+
+        for item in self.columns:
+            if item.name == column:
+                return item
+        raise KeyError(f'column {column} not found.')
+
+    def reserve(self, row):
+        if row < self.size:
+            return
+
+        self.size = max(row+1, self.size * 2, 64)
+        for column in self.columns:
+            column.grow(self.size)
+
+    def get(self, row, idx):
+        return self.columns[idx][row]
+
+    def set(self, row, idx, value):
+        self.reserve(row)
+        self.columns[idx][row] = value
+
+    def row(self, row):
+        return [column[row] for column in self.columns]
+
+    def put(self, row, values):
+        self.reserve(row)
+        for idx, column in enumerate(self.columns):
+            column[row] = values[idx] if idx < len(values) else None
+
+    def pop(self, row):
+        values = self.row(row)
+        if row < self.size:
+            for column in self.columns:
+                column[row] = None
+        return values
+
+    def clear(self):
+        self.size = 0
+        for column in self.columns:
+            column.clear()
@@ -0,0 +1,151 @@
+from bisect import bisect_left, bisect_right
+
+
+class Index:
+    # Items by the value of a column, kept up to date from the changes the
+    # tree reports. Column 0 indexes names.
+    kind = None
+
+    def __init__(self, tree, column):
+        self.tree = tree
+        self.column = column
+        self.refresh()
+
+    def refresh(self):
+        tree = self.tree
+        self.clear()
+        self.build([(self.value(item), item) for item in self.items(tree) if item is not tree])
+
+    def build(self, pairs):
+        for value, item in pairs:
+            self.add(item, value)
+
+    def value(self, item):
+        return item.columns[self.column-1] if self.column else item.name
+
+    def items(self, item):
+        # The item and everything below it that is loaded, in preorder.
+        stack = [item]
+        while stack:
+            item = stack.pop()
+            yield item
+            if item.is_node() and item.is_loaded():
+                stack.extend(reversed(item))
+
+    def added(self, item):
+        for item in self.items(item):
+            self.add(item, self.value(item))
+
+    def removed(self, item, parent, idx):
+        for item in self.items(item):
+            self.discard(item, self.value(item))
+
+    def moved(self, item, parent, idx):
+        pass
+
+    def loaded(self, node):
+        for item in node._children or ():
+            self.added(item)
+
+    def unloaded(self, node):
+        for item in node._children or ():
+            self.removed(item, node, None)
+
+    def renamed(self, item, name):
+        if not self.column:
+            self.discard(item, name)
+            self.add(item, item.name)
+
+    def changed(self, item, column, old, value):
+        if column == self.column:
+            self.discard(item, old)
+            self.add(item, value)
+
+
+class HashIndex(Index):
+    # Equal values share a bucket of items, in the order they were indexed.
+    # Values that cannot be hashed are left out.
+    kind = 'hash'
+
+    def clear(self):
+        self.buckets = {}
+
+    def add(self, item, value):
+        try:
+            self.buckets.setdefault(value, {})[id(item)] = item
+        except TypeError:
+            pass
+
+    def discard(self, item, value):
+        try:
+            bucket = self.buckets.get(value)
+        except TypeError:
+            return
+        if bucket is not None:
+            bucket.pop(id(item), None)
+            if not bucket:
+                del self.buckets[value]
+
+    def lookup(self, value):
+        return list(self.buckets.get(value, {}).values())
+
+
+class SortedIndex(Index):
+    # Values in order, with their items alongside. None, and values that do
+    # not compare with those already indexed, are left out.
+    kind = 'sorted'
+
+    def clear(self):
+        self.values = []
+        self.entries = []
+
+    def build(self, pairs):
+        # One sort, unless the values do not compare, when each is added in turn.
+        pairs = [(value, seq, item) for seq, (value, item) in enumerate(pairs) if value is not None]
+        try:
+            pairs.sort(key=lambda pair: pair[:2])
+        except TypeError:
+            super().build((value, item) for value, _, item in pairs)
+            return
+        self.values = [value for value, _, _ in pairs]
+        self.entries = [item for _, _, item in pairs]
+
+    def add(self, item, value):
+        if value is None:
+            return
+        try:
+            idx = bisect_right(self.values, value)
+        except TypeError:
+            return
+        self.values.insert(idx, value)
+        self.entries.insert(idx, item)
+
+    def discard(self, item, value):
+        if value is None:
+            return
+        try:
+            idx = bisect_left(self.values, value)
+            end = bisect_right(self.values, value, idx)
+        except TypeError:
+            return
+        for pos in range(idx, end):
+            if self.entries[pos] is item:
+                del self.values[pos]
+                del self.entries[pos]
+                return
+
+    def lookup(self, value):
+        return self.range(value, value, True)
+
+    def range(self, lo=None, hi=None, inclusive=False):
+        # Items with lo <= value < hi, or value <= hi when inclusive, in value order.
+        values = self.values
+        start = 0 if lo is None else bisect_left(values, lo)
+        if hi is None:
+            end = len(values)
+        else:
+            end = bisect_right(values, hi) if inclusive else bisect_left(values, hi)
+        return self.entries[start:end]
+
+
+INDEXES = {'hash': HashIndex, 'sorted': SortedIndex}
@@ -0,0 +1,135 @@
+BATCH = 1000
+
+
+class Journal:
+    # Records the changes the tree reports as events, and hands them to the
+    # subscribers in batches, once BATCH are pending or on flush. Events are
+    # tuples that start with the kind and the item's id:
+    #   ('added', id, parent id, position, entry)
+    #   ('removed', id, parent id, position)
+    #   ('moved', id, old parent id, old position, parent id, position)
+    #   ('renamed', id, old name, name)
+    #   ('changed', id, column, old, value)
+    # An entry is the item as to_list gives it, with ids, as it is at the time
+    # of the batch. Changes to an item added in the same batch go into its
+    # entry, and repeated changes to a cell or a name become one event.
+    def __init__(self, tree, batch=BATCH):
+        self.tree = tree
+        self.batch = batch
+        self.subscribers = []
+        self.events = []
+        self.entries = {}
+        self.cells = {}
+        self.last = None, -1
+
+    def subscribe(self, subscriber):
+        if not self.subscribers:
+            self.tree.observe(self)
+        self.subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber):
+        # The last to leave is handed what is pending.
+        if self.subscribers == [subscriber]:
+            self.flush()
+            self.tree.unobserve(self)
+        self.subscribers.remove(subscriber)
+
+    def flush(self):
+        events = [event for event in self.events if event is not None]
+        self.events = []
+        self.entries = {}
+        self.cells = {}
+        self.last = None, -1
+        if events:
+            for subscriber in list(self.subscribers):
+                subscriber(events)
+
+    def record(self, event):
+        self.events.append(event)
+        if len(self.events) >= self.batch:
+            self.flush()
+
+    def position(self, item):
+        # Appends, and items added one after another as bulk_load adds them,
+        # are found without searching the parent.
+        parent = item.parent
+        last, idx = self.last
+        if parent[-1] is item:
+            idx = len(parent) - 1
+        elif last is parent and idx + 1 < len(parent) and parent[idx+1] is item:
+            idx += 1
+        else:
+            idx = parent.index(item)
+        self.last = parent, idx
+        return idx
+
+    def entry(self, item):
+        # The item and what is below it, shaped as to_list, with ids.
+        entries = self.entries
+        root = None
+        stack = [(item, None)]
+        while stack:
+            item, children = stack.pop()
+            entry = {'id': item.id, 'name': item.name, 'columns': list(item.columns)}
+            entries[id(item)] = entry
+            if children is None:
+                root = entry
+            else:
+                children.append(entry)
+            if item.is_node():
+                entry['children'] = []
+                if item.is_loaded():
+                    stack.extend((child, entry['children']) for child in reversed(item))
+        return root
+
+    def forget(self, item):
+        # Later changes to the item start new events.
+        stack = [item]
+        while stack:
+            item = stack.pop()
+            self.entries.pop(id(item), None)
+            self.cells.pop(id(item), None)
+            if item.is_node() and item.is_loaded():
+                stack.extend(item)
+
+    def added(self, item):
+        self.record(('added', item.id, item.parent.id, self.position(item), self.entry(item)))
+
+    def removed(self, item, parent, idx):
+        self.forget(item)
+        self.record(('removed', item.id, parent.id, idx))
+
+    def moved(self, item, parent, idx):
+        self.record(('moved', item.id, parent.id, idx, item.parent.id, self.position(item)))
+
+    def renamed(self, item, name):
+        entry = self.entries.get(id(item))
+        if entry is not None:
+            entry['name'] = item.name
+            return
+        self.change(item, 0, name, item.name, 'renamed')
+
+    def changed(self, item, column, old, value):
+        entry = self.entries.get(id(item))
+        if entry is not None:
+            columns = entry['columns']
+            columns += [None] * (column - len(columns))
+            columns[column-1] = value
+            return
+        self.change(item, column, old, value, 'changed')
+
+    def change(self, item, column, old, value, kind):
+        # Fold a change into the last event for the same cell.
+        cells = self.cells.setdefault(id(item), {})
+        idx = cells.pop(column, None)
+        if idx is not None:
+            old = self.events[idx][-2]
+            self.events[idx] = None
+        if old is value or old == value:
+            return
+
+        cells[column] = len(self.events)
+        if kind == 'renamed':
+            self.record((kind, item.id, old, value))
+        else:
+            self.record((kind, item.id, column, old, value))
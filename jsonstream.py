@@ -0,0 +1,229 @@
+import re
+import json
+import codecs
+from json.decoder import JSONDecoder, JSONDecodeError
+from json.scanner import make_scanner
+from json.encoder import encode_basestring_ascii
+
+CHUNK = 1 << 16
+FLUSH = 1 << 12
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+DELIMITERS = ' \t\n\r,:]}'
+
+# Parser states, see read().
+ITEMS, ITEM, AFTER_ITEM, MEMBERS, MEMBER, AFTER_MEMBER = range(6)
+
+
+class Tokens:
+    # Pulls JSON tokens off a text stream, a chunk at a time. Punctuation is
+    # returned as its character, any other value whole, as (value, ).
+    def __init__(self, stream, size=CHUNK):
+        self.stream = stream
+        self.size = size
+        self.buffer = ''
+        self.pos = 0
+        self.done = False
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.scan = make_scanner(JSONDecoder())
+
+    def more(self):
+        if self.done:
+            return False
+
+        data = self.stream.read(self.size)
+        while isinstance(data, bytes):
+            # A chunk can end part way into a character.
+            text = self.decoder.decode(data, final=not data)
+            data = self.stream.read(self.size) if data and not text else text
+        if not data:
+            self.done = True
+            return False
+
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def error(self, message):
+        return JSONDecodeError(message, self.buffer, self.pos)
+
+    def skip(self):
+        # The next character that is not whitespace, reading on as needed.
+        while True:
+            buffer = self.buffer
+            pos = self.pos
+            if pos < len(buffer) and buffer[pos] not in ' \t\n\r':
+                return buffer[pos]
+
+            pos = self.pos = WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer):
+                return buffer[pos]
+            elif not self.more():
+                return None
+
+    def next(self):
+        char = self.skip()
+        if char is None:
+            return None
+        elif char in '{}[],:':
+            self.pos += 1
+            return char
+        return self.value(),
+
+    def expect(self, expected):
+        token = self.next()
+        if token != expected:
+            raise self.error(f'Expecting {expected!r}')
+
+    def value(self):
+        # Read a whole value, containers included, with the json module's scanner.
+        while True:
+            char = self.skip()
+            if char is None:
+                raise self.error('Expecting value')
+
+            try:
+                value, end = self.scan(self.buffer, self.pos)
+            except StopIteration:
+                if self.more():
+                    continue
+                raise self.error('Expecting value') from None
+            except JSONDecodeError:
+                if self.more():
+                    continue
+                raise
+
+            # A number or literal that ends with the chunk may go on in the next one.
+            if char in '"[{' or (end < len(self.buffer) and self.buffer[end] in DELIMITERS) or self.done:
+                self.pos = end
+                return value
+            self.more()
+
+
+def read(stream, parent, create):
+    # Feed items from a populate shaped JSON list to create(parent, entry),
+    # which returns the new item. An item is created once its children key is
+    # reached, or at the end of its object, so only open items are held.
+    tokens = Tokens(stream)
+    tokens.expect('[')
+    frames = []
+    node = parent
+    state = ITEMS
+    count = 0
+    while True:
+        token = tokens.next()
+        if token is None:
+            raise tokens.error('Unexpected end of data')
+
+        if state in (ITEMS, ITEM):
+            if token == ']' and state == ITEMS:
+                if not frames:
+                    break
+                node = frames[-1][0]
+                state = AFTER_MEMBER
+            elif token == '{':
+                # Parent, entry and the created item.
+                frames.append((node, {}, []))
+                state = MEMBERS
+            else:
+                raise tokens.error("Expecting '{'")
+
+        elif state in (MEMBERS, MEMBER):
+            if token == '}' and state == MEMBERS:
+                state = close(frames, create)
+                count += 1
+                continue
+            elif token.__class__ is not tuple or not isinstance(token[0], str):
+                raise tokens.error('Expecting property name enclosed in double quotes')
+
+            key = token[0]
+            tokens.expect(':')
+            _parent, entry, created = frames[-1]
+            if key == 'children':
+                if tokens.skip() == '[' and not created:
+                    tokens.next()
+                    entry['children'] = []
+                    created.append(create(_parent, entry))
+                    node = created[0]
+                    state = ITEMS
+                    continue
+                if tokens.value() is not None or created:
+                    raise tokens.error('Expecting a list of children')
+                entry['children'] = []
+            else:
+                entry[key] = tokens.value()
+                if created:
+                    update(created[0], key, entry[key])
+            state = AFTER_MEMBER
+
+        elif state == AFTER_MEMBER:
+            if token == ',':
+                state = MEMBER
+            elif token == '}':
+                state = close(frames, create)
+                count += 1
+            else:
+                raise tokens.error("Expecting ',' delimiter")
+
+        elif state == AFTER_ITEM:
+            if token == ',':
+                state = ITEM
+            elif token == ']':
+                if not frames:
+                    break
+                node = frames[-1][0]
+                state = AFTER_MEMBER
+            else:
+                raise tokens.error("Expecting ',' delimiter")
+
+    if tokens.next() is not None:
+        raise tokens.error('Extra data')
+    return count
+
+
+def close(frames, create):
+    _parent, entry, created = frames.pop()
+    if not created:
+        create(_parent, entry)
+    return AFTER_ITEM
+
+
+def update(item, key, value):
+    # Keys that follow the children of an item.
+    if key == 'name':
+        item.rename(value)
+    elif key == 'columns':
+        columns = list(value or ())
+        item.columns = columns + [None] * (len(item.tree.headings) - len(columns))
+
+
+def write(node, stream):
+    # Write the children of a node in the shape to_list returns, a level at a time.
+    encode = json.JSONEncoder().encode
+    chunks = ['[']
+    stack = [iter(node)]
+    first = True
+    while stack:
+        for item in stack[-1]:
+            chunks.append('{"name": ' if first else ', {"name": ')
+            chunks.append(encode_basestring_ascii(item.name) if item.name.__class__ is str else encode(item.name))
+            chunks.append(', "columns": ')
+            chunks.append(encode(item.columns))
+            if item.is_node():
+                chunks.append(', "children": [')
+                if item:
+                    stack.append(iter(item))
+                    first = True
+                    break
+                chunks.append(']')
+            chunks.append('}')
+            first = False
+        else:
+            stack.pop()
+            chunks.append(']}' if stack else ']')
+            first = False
+
+        if len(chunks) >= FLUSH:
+            stream.write(''.join(chunks))
+            chunks = []
+
+    stream.write(''.join(chunks))
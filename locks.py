@@ -0,0 +1,171 @@
+from functools import wraps
+from contextlib import contextmanager
+from threading import Condition, Lock, RLock, local, get_ident
+
+
+class RWLock:
+    # Many readers or one writer, for trees made with concurrent=True. Once a
+    # writer waits, new readers wait behind it, so a steady stream of reads
+    # cannot starve the writes. Both sides are reentrant and the writer may
+    # read, but a reader cannot go on to write. Lazy nodes are loaded by
+    # readers too, one at a time, under loading.
+    def __init__(self):
+        self.cond = Condition(Lock())
+        self.active = set()
+        self.waiting = 0
+        self.owner = None
+        self.depth = 0
+        self.local = local()
+        self.loading = RLock()
+
+    @property
+    def readers(self):
+        return len(self.active)
+
+    def acquire_read(self):
+        # Readers only take the condition's lock when a writer holds or
+        # waits for the lock. Adding to a set is atomic, and a writer checks
+        # for readers after it counts itself as waiting, so a reader reads
+        # waiting before owner.
+        local = self.local
+        depth = getattr(local, 'depth', 0)
+        if depth:
+            local.depth = depth + 1
+            return
+        me = get_ident()
+        local.depth = 1
+        if self.owner == me:
+            return
+
+        self.active.add(me)
+        if self.waiting or self.owner is not None:
+            self.active.discard(me)
+            with self.cond:
+                self.cond.notify_all()
+                while self.owner is not None or self.waiting:
+                    self.cond.wait()
+                self.active.add(me)
+
+    def release_read(self):
+        local = self.local
+        local.depth -= 1
+        if local.depth:
+            return
+        me = get_ident()
+        if self.owner == me:
+            return
+
+        self.active.discard(me)
+        if self.waiting:
+            with self.cond:
+                self.cond.notify_all()
+
+    def acquire_write(self):
+        me = get_ident()
+        if self.owner == me:
+            self.depth += 1
+            return
+        elif getattr(self.local, 'depth', 0):
+            raise RuntimeError('cannot write to a tree while reading it.')
+
+        with self.cond:
+            self.waiting += 1
+            while self.owner is not None or self.active:
+                self.cond.wait()
+            self.owner = me
+            self.waiting -= 1
+        self.depth = 1
+
+    def release_write(self):
+        self.depth -= 1
+        if self.depth:
+            return
+
+        with self.cond:
+            self.owner = None
+            self.cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+def reads(method):
+    # Run the method holding the read lock of the item's tree, if it has one.
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        tree = self._tree
+        lock = tree._lock if tree is not None else None
+        if lock is None:
+            return method(self, *args, **kwargs)
+        lock.acquire_read()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            lock.release_read()
+    return locked
+
+
+def writes(method):
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        tree = self._tree
+        lock = tree._lock if tree is not None else None
+        if lock is None:
+            return method(self, *args, **kwargs)
+        lock.acquire_write()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            lock.release_write()
+    return locked
+
+
+def moves(method):
+    # As writes, for a move or a clone into dst, holding the write locks of
+    # both trees, taken in a fixed order.
+    @wraps(method)
+    def locked(self, dst, *args, **kwargs):
+        trees = (self._tree, getattr(dst, '_tree', None))
+        locks = {id(tree): tree._lock for tree in trees if tree is not None and tree._lock is not None}
+        if not locks:
+            return method(self, dst, *args, **kwargs)
+        held = []
+        try:
+            for key in sorted(locks):
+                locks[key].acquire_write()
+                held.append(locks[key])
+            return method(self, dst, *args, **kwargs)
+        finally:
+            for lock in reversed(held):
+                lock.release_write()
+    return locked
+
+
+def snapshot(method):
+    # A generator method that, in a concurrent tree, runs to the end under the
+    # read lock, handing out what it found, so later writes do not show in it.
+    @wraps(method)
+    def iterate(self, *args, **kwargs):
+        tree = self._tree
+        lock = tree._lock if tree is not None else None
+        if lock is None:
+            return method(self, *args, **kwargs)
+        lock.acquire_read()
+        try:
+            return iter(list(method(self, *args, **kwargs)))
+        finally:
+            lock.release_read()
+    return iterate
@@ -0,0 +1,89 @@
+import os
+from functools import reduce
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+CHUNKS = 4
+SMALLEST = 1000
+
+# What fn is given for each item. Paths are as Base.path gives them, depth
+# is 0 for top level items, and columns holds every column's value.
+Row = namedtuple('Row', 'id name path type depth columns')
+
+
+def chunks(tree, workers, size=None):
+    # The items in preorder, cut into runs of about size rows, CHUNKS for
+    # each worker by default. A run is sent as the names above its first
+    # item and a tuple per item, without the items themselves.
+    rows = [(item.id, item.name, depth, item.is_node(), tuple(item.columns)) for item, depth in tree.walk()]
+    size = size or max(SMALLEST, -(-len(rows) // (workers * CHUNKS)))
+    for start in range(0, len(rows), size):
+        prefix = []
+        item = tree.fetch(rows[start][0]).parent
+        while item is not tree:
+            prefix.append(item.name)
+            item = item.parent
+        yield prefix[::-1], rows[start:start+size]
+
+
+def expand(chunk):
+    prefix, rows = chunk
+    names = list(prefix)
+    for _id, name, depth, is_node, columns in rows:
+        del names[depth:]
+        names.append(name)
+        yield Row(_id, name, '/' + '/'.join(names), 'Node' if is_node else 'Leaf', depth, columns)
+
+
+def map_chunk(fn, chunk):
+    return [fn(row) for row in expand(chunk)]
+
+
+def reduce_chunk(fn, combine, chunk):
+    return reduce(combine, map(fn, expand(chunk)))
+
+
+def run(func, args, chunks, workers):
+    # One worker runs here, without a pool.
+    if workers == 1:
+        return [func(*args, chunk) for chunk in chunks]
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(func, *zip(*[args + (chunk, ) for chunk in chunks])))
+
+
+def parallel_map(tree, fn, columns, workers=None, size=None):
+    # fn is called with a Row for each item, in worker processes, so it has
+    # to be a function that pickle can find by name. Its results go into
+    # columns, a tuple of results for a tuple of columns, set in one batch
+    # once every item is done. Items removed meanwhile are left out.
+    workers = workers or os.cpu_count()
+    if isinstance(columns, tuple):
+        idx = tuple(tree.column_index(column) for column in columns)
+    else:
+        idx = tree.column_index(columns)
+
+    with tree.reading():
+        parts = list(chunks(tree, workers, size))
+    results = run(map_chunk, (fn, ), parts, workers)
+
+    # With observers, as indexes, the values are set in a batch, for them to
+    # be refreshed once. Without, there is nothing to undo or refresh.
+    with tree.batch() if tree._observers else tree.writing():
+        fetch = tree.fetch
+        for (_, rows), values in zip(parts, results):
+            for row, value in zip(rows, values):
+                item = fetch(row[0])
+                if item is not None:
+                    item._set(idx, value)
+
+
+def parallel_reduce(tree, fn, combine, initial=None, workers=None, size=None):
+    # combine folds fn's results within each run, then the runs' results in
+    # order, starting with initial when it is given.
+    workers = workers or os.cpu_count()
+    with tree.reading():
+        parts = list(chunks(tree, workers, size))
+    results = run(reduce_chunk, (fn, combine), parts, workers)
+    if initial is None:
+        return reduce(combine, results) if results else None
+    return reduce(combine, results, initial)
@@ -0,0 +1,330 @@
+from heapq import nsmallest
+
+
+def value_of(item, column):
+    return item.columns[column-1] if column else item.name
+
+
+def level(item):
+    count = 0
+    while item.parent is not None:
+        item = item.parent
+        count += 1
+    return count
+
+
+def within(node, item):
+    # The depth of item below node, top level items being 0, or None when it is not below node.
+    depth = -1
+    while item is not None:
+        if item is node:
+            return depth
+        item = item.parent
+        depth += 1
+
+
+class Predicate:
+    # A test on an item and its depth, combined with &, | and ~. Predicates
+    # that an index or the ids can answer offer their candidates, and those
+    # that limit where matches can be, a node to search below or a depth.
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    def bind(self, node):
+        pass
+
+    def test(self, item, depth):
+        raise NotImplementedError
+
+    def candidates(self, tree):
+        return None
+
+    def scope(self):
+        return None
+
+    def deepest(self):
+        return None
+
+
+class Id(Predicate):
+    def __init__(self, *ids):
+        self.ids = ids
+
+    def test(self, item, depth):
+        return item.id in self.ids
+
+    def candidates(self, tree):
+        items = (tree.fetch(_id) for _id in self.ids)
+        return [item for item in items if item is not None], 'ids'
+
+
+class Eq(Predicate):
+    # Column 0 is the name.
+    def __init__(self, column, value):
+        self.column = column
+        self.value = value
+
+    def bind(self, node):
+        self.idx = node.tree.column_index(self.column)
+
+    def test(self, item, depth):
+        return value_of(item, self.idx) == self.value
+
+    def candidates(self, tree):
+        index = tree._indexes.get(self.idx)
+        if index is not None:
+            return index.lookup(self.value), f'{index.kind} index on {self.column}'
+
+
+class In(Eq):
+    def test(self, item, depth):
+        return value_of(item, self.idx) in self.value
+
+    def candidates(self, tree):
+        index = tree._indexes.get(self.idx)
+        if index is not None:
+            items = [item for value in self.value for item in index.lookup(value)]
+            return items, f'{index.kind} index on {self.column}'
+
+
+class Range(Predicate):
+    # lo <= value < hi, either bound left open with None.
+    def __init__(self, column, lo=None, hi=None):
+        self.column = column
+        self.lo = lo
+        self.hi = hi
+
+    def bind(self, node):
+        self.idx = node.tree.column_index(self.column)
+
+    def test(self, item, depth):
+        value = value_of(item, self.idx)
+        try:
+            return value is not None and (self.lo is None or self.lo <= value) and (self.hi is None or value < self.hi)
+        except TypeError:
+            return False
+
+    def candidates(self, tree):
+        index = tree._indexes.get(self.idx)
+        if index is not None and index.kind == 'sorted':
+            return index.range(self.lo, self.hi), f'sorted index on {self.column}'
+
+
+class Depth(Predicate):
+    # lo <= depth <= hi, top level items being 0.
+    def __init__(self, lo=None, hi=None):
+        self.lo = lo
+        self.hi = hi
+
+    def test(self, item, depth):
+        return (self.lo is None or self.lo <= depth) and (self.hi is None or depth <= self.hi)
+
+    def deepest(self):
+        return self.hi
+
+
+class Under(Predicate):
+    # The item at path, and everything below it.
+    def __init__(self, path):
+        self.path = path
+
+    def bind(self, node):
+        self.node = node.find(self.path) if self.path else node
+
+    def test(self, item, depth):
+        return self.node is not None and within(self.node, item) is not None
+
+    def scope(self):
+        return self.node
+
+
+class Where(Predicate):
+    # Any callable taking the item.
+    def __init__(self, func):
+        self.func = func
+
+    def test(self, item, depth):
+        return self.func(item)
+
+
+class And(Predicate):
+    def __init__(self, *predicates):
+        self.predicates = predicates
+
+    def bind(self, node):
+        for predicate in self.predicates:
+            predicate.bind(node)
+
+    def test(self, item, depth):
+        return all(predicate.test(item, depth) for predicate in self.predicates)
+
+    def candidates(self, tree):
+        found = [result for result in (predicate.candidates(tree) for predicate in self.predicates) if result]
+        return min(found, key=lambda result: len(result[0]), default=None)
+
+    def scope(self):
+        # The deepest of the nodes the parts search below.
+        scopes = [scope for scope in (predicate.scope() for predicate in self.predicates) if scope is not None]
+        return max(scopes, key=level, default=None)
+
+    def deepest(self):
+        return min((depth for depth in (predicate.deepest() for predicate in self.predicates) if depth is not None),
+                   default=None)
+
+
+class Or(And):
+    def test(self, item, depth):
+        return any(predicate.test(item, depth) for predicate in self.predicates)
+
+    def candidates(self, tree):
+        found = [predicate.candidates(tree) for predicate in self.predicates]
+        if not all(found):
+            return
+        items = {id(item): item for result in found for item in result[0]}
+        return list(items.values()), ' or '.join(plan for _, plan in found)
+
+    def scope(self):
+        return None
+
+    def deepest(self):
+        depths = [predicate.deepest() for predicate in self.predicates]
+        return None if None in depths else max(depths)
+
+
+class Not(Predicate):
+    def __init__(self, predicate):
+        self.predicate = predicate
+
+    def bind(self, node):
+        self.predicate.bind(node)
+
+    def test(self, item, depth):
+        return not self.predicate.test(item, depth)
+
+
+def predicate(where):
+    # A predicate, a callable, or a dict of column values to match.
+    if where is None or isinstance(where, Predicate):
+        return where
+    elif isinstance(where, dict):
+        return And(*[Eq(column, value) for column, value in where.items()])
+    return Where(where)
+
+
+class Query:
+    # Plans and runs Node.select. The plan is the smallest set of candidates
+    # from the ids or an index, checked against the whole predicate, or else
+    # a walk below the narrowest node the predicate allows, no deeper than it
+    # allows, that stops at the limit.
+    def __init__(self, node, where=None, depth=None, type=None, limit=None, order_by=None, load=True):
+        self.node = node
+        self.where = predicate(where)
+        self.depth = depth
+        self.type = type
+        self.limit = limit
+        self.order_by = order_by
+        self.load = load
+        self.plan = None
+        self.visited = 0
+        if self.where is not None:
+            self.where.bind(node)
+
+    def match(self, item, depth):
+        return (self.type is None or item.type == self.type) and \
+               (self.where is None or self.where.test(item, depth))
+
+    def run(self):
+        where = self.where
+        found = where.candidates(self.node.tree) if where is not None else None
+        limit = None if self.order_by is not None else self.limit
+        if found is not None:
+            items, self.plan = found
+            results = self.check(items, limit)
+        else:
+            results = self.scan(limit)
+
+        if self.order_by is not None:
+            results = self.sort(results)
+        return results
+
+    def check(self, items, limit):
+        node = self.node
+        tree = node.tree
+        deepest = self.deepest()
+        results = []
+        for item in items:
+            self.visited += 1
+            # Items no longer in the tree keep their parents, so are left out first.
+            if item._tree is not tree:
+                continue
+            depth = within(node, item)
+            if depth is None or depth < 0 or (deepest is not None and depth > deepest):
+                continue
+            if self.match(item, depth):
+                results.append(item)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    def deepest(self):
+        depths = [depth for depth in (self.depth, self.where and self.where.deepest()) if depth is not None]
+        return min(depths, default=None)
+
+    def scan(self, limit):
+        node = self.node
+        load = self.load
+        start = self.where.scope() if self.where is not None else None
+        if start is not None and within(node, start) is None:
+            start = None
+        deepest = self.deepest()
+
+        if start is None or start is node:
+            self.plan = 'scan'
+            stack = [(item, 0) for item in reversed(node)] if node.is_node() and (load or node.is_loaded()) else []
+        else:
+            self.plan = f'scan below {start.path()}'
+            stack = [(start, within(node, start))]
+
+        results = []
+        while stack:
+            item, depth = stack.pop()
+            self.visited += 1
+            if (deepest is None or depth <= deepest) and self.match(item, depth):
+                results.append(item)
+                if limit is not None and len(results) >= limit:
+                    break
+            if item.is_node() and (deepest is None or depth < deepest) and (load or item.is_loaded()):
+                stack.extend((child, depth+1) for child in reversed(item))
+        return results
+
+    def sort(self, results):
+        # By a callable, or by a column, descending with a leading '-', None values last.
+        order_by = self.order_by
+        limit = self.limit
+        if callable(order_by):
+            return nsmallest(limit, results, key=order_by) if limit is not None else sorted(results, key=order_by)
+
+        reverse = isinstance(order_by, str) and order_by.startswith('-')
+        idx = self.node.tree.column_index(order_by[1:] if reverse else order_by)
+        present = [(value_of(item, idx), seq, item) for seq, item in enumerate(results)]
+        missing = [item for value, _, item in present if value is None]
+        present = [entry for entry in present if entry[0] is not None]
+        if reverse:
+            present = [(value, -seq, item) for value, seq, item in present]
+            ordered = sorted(present, reverse=True)[:limit]
+        else:
+            ordered = nsmallest(limit, present) if limit is not None else sorted(present)
+        return ([item for _, _, item in ordered] + missing)[:limit]
+
+    def explain(self):
+        if self.plan is None:
+            self.run()
+        if self.deepest() is not None:
+            return f'{self.plan}, depth {self.deepest()}, {self.visited} visited'
+        return f'{self.plan}, {self.visited} visited'
@@ -0,0 +1,127 @@
+import sys
+import csv
+
+FLUSH = 1 << 12
+RULE = '-----------------------------------------------------'
+FORMATS = ('tree', 'csv', 'tsv', 'fixed')
+WIDTH = 16
+
+
+class Buffer:
+    # Collects what is written and hands it on to the stream in large pieces.
+    def __init__(self, stream, size=FLUSH):
+        self.stream = stream
+        self.size = size
+        self.chunks = []
+
+    def write(self, text):
+        self.chunks.append(text)
+        if len(self.chunks) >= self.size:
+            self.flush()
+
+    def flush(self):
+        self.stream.write(''.join(self.chunks))
+        self.chunks = []
+
+
+def rows(node, depth=None, load=True):
+    # The items below node with their levels, down to the given depth.
+    kinds = {}
+    stack = [iter(node)]
+    while stack:
+        level = len(stack) - 1
+        deeper = depth is None or level < depth
+        for item in stack[-1]:
+            yield item, level
+            cls = item.__class__
+            is_node = kinds.get(cls)
+            if is_node is None:
+                is_node = kinds[cls] = item.is_node()
+            if is_node and deeper and (load or item.is_loaded()) and item:
+                stack.append(iter(item))
+                break
+        else:
+            stack.pop()
+
+
+def write(node, stream=None, format='tree', columns=None, depth=None, header=True, **kwargs):
+    # Write the items below node to a text stream, stdout by default, as the
+    # indented tree show prints, as CSV or TSV, or in fixed width fields.
+    # columns selects headings by name or number, depth is the deepest level
+    # written, top level items being level 0.
+    if format not in FORMATS:
+        raise ValueError(f'unknown format {format}.')
+
+    buffer = Buffer(stream if stream is not None else sys.stdout)
+    headings = node.tree.headings
+    if columns is None:
+        selected = None
+        names = list(headings)
+    else:
+        selected = [node.tree.column_index(column) for column in columns]
+        names = [headings[column-1] for column in selected]
+    items = rows(node, depth, kwargs.get('load', True)) if node.is_node() else ()
+
+    if format == 'tree':
+        tree(items, buffer, header, names, selected, **kwargs)
+    elif format == 'fixed':
+        fixed(items, buffer, header, names, selected, node.tree, **kwargs)
+    else:
+        writer = csv.writer(buffer, delimiter=',' if format == 'csv' else '\t', lineterminator='\n')
+        if header:
+            writer.writerow(['ID', 'Depth', 'Name', *names])
+        if selected is None:
+            writer.writerows([item.id, level, item.name, *item.columns] for item, level in items)
+        else:
+            writer.writerows([item.id, level, item.name, *[item.get(column) for column in selected]]
+                             for item, level in items)
+    buffer.flush()
+
+
+def tree(items, buffer, header, names, selected, **kwargs):
+    label = kwargs.get('label', '')
+    indent = kwargs.get('indent', 2)
+    index_pad = kwargs.get('index_pad', 2)
+
+    if header:
+        header_postfix = f', Columns: {str(names)}' if names else ''
+        if label:
+            label = f' {label}\n'
+        buffer.write(f'{RULE}\n{label}   ID: Name{header_postfix}\n{RULE}\n')
+
+    pads = []
+    lines = []
+    append = lines.append
+    for item, level in items:
+        while len(pads) <= level:
+            pads.append(' ' * (indent * len(pads)))
+        columns = item.columns if selected is None else [item.get(column) for column in selected]
+        if columns:
+            append(f' {str(item.id).zfill(index_pad)}:{pads[level]} {item.name}, {columns}\n')
+        else:
+            append(f' {str(item.id).zfill(index_pad)}:{pads[level]} {item.name}\n')
+        if len(lines) >= buffer.size:
+            buffer.write(''.join(lines))
+            lines.clear()
+    buffer.write(''.join(lines))
+
+
+def fixed(items, buffer, header, names, selected, tree, **kwargs):
+    # Fields are padded, or cut, to widths, given for the id, the name and
+    # each column, with names indented by level.
+    indent = kwargs.get('indent', 2)
+    widths = kwargs.get('widths') or [len(str(tree.items)), WIDTH * 2] + [WIDTH] * len(names)
+    template = ' '.join(f'{{:<{width}.{width}}}' for width in widths) + '\n'
+
+    if header:
+        buffer.write(template.format('ID', 'Name', *names))
+    lines = []
+    append = lines.append
+    for item, level in items:
+        columns = item.columns if selected is None else [item.get(column) for column in selected]
+        append(template.format(str(item.id), ' ' * (indent * level) + str(item.name),
+                               *['' if value is None else str(value) for value in columns]))
+        if len(lines) >= buffer.size:
+            buffer.write(''.join(lines))
+            lines.clear()
+    buffer.write(''.join(lines))
@@ -0,0 +1,224 @@
+from view import Children
+
+LOAD = 512
+
+
+class RowIndex:
+    # The items of a tree in preorder, as rows numbered from 0, kept up to
+    # date from the changes the tree reports. Rows are held in blocks of
+    # about LOAD items, with a Fenwick tree over the block lengths, so an
+    # item's row and the item at a row are found without renumbering.
+    # Nodes wider than a block get their children in blocks too, as the
+    # view keeps them, once an item is put among them, so where it went is
+    # found without a pass over its siblings.
+    def __init__(self, tree, load=LOAD):
+        self.tree = tree
+        self.load = load
+        self.blocks = []
+        self.block = {}
+        self.position = {}
+        self.fenwick = []
+        self.siblings = {}
+        self.refresh()
+        tree.observe(self)
+
+    def __len__(self):
+        return sum(len(block) for block in self.blocks)
+
+    def close(self):
+        self.tree.unobserve(self)
+
+    def children(self, item):
+        return item if item.is_node() and item.is_loaded() else ()
+
+    def run(self, item):
+        # The item and everything below it, in preorder.
+        items = []
+        stack = [item]
+        while stack:
+            item = stack.pop()
+            items.append(item)
+            stack.extend(reversed(self.children(item)))
+        return items
+
+    def refresh(self):
+        # Every row again, from the tree as it is.
+        load = self.load
+        items = self.run(self.tree)[1:]
+        self.blocks = [items[idx:idx+load] for idx in range(0, len(items), load)] or [[]]
+        self.block = {}
+        for block in self.blocks:
+            for item in block:
+                self.block[id(item)] = block
+        self.siblings = {}
+        self.rebuild()
+
+    def rebuild(self):
+        blocks = self.blocks
+        self.position = {id(block): idx for idx, block in enumerate(blocks)}
+        fenwick = self.fenwick = [0] * (len(blocks) + 1)
+        for idx, block in enumerate(blocks, 1):
+            fenwick[idx] += len(block)
+            parent = idx + (idx & -idx)
+            if parent <= len(blocks):
+                fenwick[parent] += fenwick[idx]
+
+    def grow(self, idx, count):
+        fenwick = self.fenwick
+        idx += 1
+        while idx < len(fenwick):
+            fenwick[idx] += count
+            idx += idx & -idx
+
+    def before(self, idx):
+        # The number of rows in the blocks before block idx.
+        fenwick = self.fenwick
+        total = 0
+        while idx:
+            total += fenwick[idx]
+            idx -= idx & -idx
+        return total
+
+    def find(self, row):
+        # The block holding a row, and the row's offset in it.
+        fenwick = self.fenwick
+        idx = 0
+        step = 1 << (len(fenwick) - 1).bit_length()
+        while step:
+            nxt = idx + step
+            if nxt < len(fenwick) and fenwick[nxt] <= row:
+                idx = nxt
+                row -= fenwick[nxt]
+            step >>= 1
+        return idx, row
+
+    def row_of(self, item):
+        block = self.block.get(id(item))
+        if block is None:
+            return None
+        idx = self.position[id(block)]
+        return self.before(idx) + block.index(item)
+
+    def item_at(self, row):
+        if row < 0:
+            row += len(self)
+        idx, offset = self.find(row)
+        if row < 0 or idx >= len(self.blocks):
+            raise IndexError('row out of range.')
+        return self.blocks[idx][offset]
+
+    def insert(self, row, items):
+        idx, offset = self.find(row)
+        if idx >= len(self.blocks):
+            idx = len(self.blocks) - 1
+            offset = len(self.blocks[idx])
+
+        block = self.blocks[idx]
+        block[offset:offset] = items
+        for item in items:
+            self.block[id(item)] = block
+
+        if len(block) <= 2 * self.load:
+            self.grow(idx, len(items))
+            return
+
+        load = self.load
+        parts = [block[start:start+load] for start in range(0, len(block), load)]
+        block[:] = parts[0]
+        for part in parts[1:]:
+            for item in part:
+                self.block[id(item)] = part
+        self.blocks[idx+1:idx+1] = parts[1:]
+        self.rebuild()
+
+    def remove(self, row, count):
+        idx, offset = self.find(row)
+        emptied = False
+        while count:
+            block = self.blocks[idx]
+            taken = block[offset:offset+count]
+            del block[offset:offset+count]
+            for item in taken:
+                del self.block[id(item)]
+            self.grow(idx, -len(taken))
+            count -= len(taken)
+            emptied = emptied or not block
+            idx += 1
+            offset = 0
+
+        if emptied and len(self.blocks) > 1:
+            self.blocks = [block for block in self.blocks if block] or [[]]
+            self.rebuild()
+
+    def index(self, parent, item):
+        # Where an item just put among the parent's children is.
+        children = parent._children
+        siblings = self.siblings.get(id(parent))
+        if siblings is None and children[-1] is not item and len(children) > self.load:
+            siblings = self.siblings[id(parent)] = Children([child for child in children if child is not item],
+                                                            [0] * (len(children) - 1), self.load)
+        if siblings is None:
+            return len(children) - 1 if children[-1] is item else children.index(item)
+
+        idx = len(children) - 1 if children[-1] is item else siblings.place(parent, item)
+        siblings.insert(idx, item, 0)
+        return idx
+
+    def forget(self, items):
+        for item in items:
+            self.siblings.pop(id(item), None)
+
+    def after(self, item):
+        # The row an item takes, from the last row of its previous sibling's
+        # subtree, or its parent's row.
+        parent = item.parent
+        idx = self.index(parent, item)
+        if not idx:
+            return 0 if parent is self.tree else self.row_of(parent) + 1
+
+        previous = parent[idx-1]
+        while True:
+            children = self.children(previous)
+            if not children:
+                break
+            previous = children[-1]
+        return self.row_of(previous) + 1
+
+    def added(self, item):
+        self.insert(self.after(item), self.run(item))
+
+    def removed(self, item, parent, idx):
+        if id(parent) in self.siblings:
+            self.siblings[id(parent)].remove(item)
+        row = self.row_of(item)
+        if row is not None:
+            items = self.run(item)
+            self.remove(row, len(items))
+            self.forget(items)
+
+    def moved(self, item, parent, idx):
+        if id(parent) in self.siblings:
+            self.siblings[id(parent)].remove(item)
+        items = self.run(item)
+        self.remove(self.row_of(item), len(items))
+        self.insert(self.after(item), items)
+
+    def loaded(self, node):
+        # The items read in go in below the node, as added.
+        items = [item for child in node._children or () for item in self.run(child)]
+        row = 0 if node is self.tree else self.row_of(node)
+        if items and row is not None:
+            self.insert(row + (node is not self.tree), items)
+
+    def unloaded(self, node):
+        items = [item for child in node._children or () for item in self.run(child)]
+        row = 0 if node is self.tree else self.row_of(node)
+        if items and row is not None:
+            self.remove(row + (node is not self.tree), len(items))
+        self.forget([node] + items)
+
+    def renamed(self, item, name):
+        pass
+
+    def changed(self, item, column, old, value):
+        pass
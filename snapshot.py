@@ -0,0 +1,237 @@
+import os
+import sys
+import mmap
+import struct
+from array import array
+
+MAGIC = b'MEMTREE\x00'
+VERSION = 1
+
+# Magic, version, flags, column count, item count, table size, label, next id.
+HEADER = struct.Struct('<8sBBHIIiI')
+
+UNIQUE = 1
+COLUMNAR = 2
+
+# Column values are tagged by type in the table, names are always strings.
+STR, INT, FLOAT, TRUE, FALSE, BYTES = b'sifTFy'
+
+
+def encode(value):
+    if value.__class__ is str:
+        return STR, value.encode('utf-8', 'surrogatepass')
+    elif value is True:
+        return TRUE, b''
+    elif value is False:
+        return FALSE, b''
+    elif isinstance(value, int):
+        return INT, value.to_bytes(value.bit_length() // 8 + 1, 'little', signed=True)
+    elif isinstance(value, float):
+        return FLOAT, struct.pack('<d', value)
+    elif isinstance(value, (bytes, bytearray)):
+        return BYTES, bytes(value)
+    raise TypeError(f'cannot save a value of type {type(value).__name__}.')
+
+
+def decode(tag, data):
+    if tag == STR:
+        return str(data, 'utf-8', 'surrogatepass')
+    elif tag == INT:
+        return int.from_bytes(data, 'little', signed=True)
+    elif tag == FLOAT:
+        return struct.unpack('<d', data)[0]
+    elif tag == BYTES:
+        return bytes(data)
+    return tag == TRUE
+
+
+def pad(size):
+    return -size % 8
+
+
+def save(tree, path):
+    # Items are written in preorder as parallel arrays, every name and
+    # column value is stored once in a shared table and referenced by index.
+    table = {}
+    entries = []
+
+    def ref(value):
+        if value is None:
+            return -1
+        key = (value.__class__, value)
+        idx = table.get(key)
+        if idx is None:
+            idx = table[key] = len(entries)
+            entries.append(encode(value))
+        return idx
+
+    headings = tree.headings
+    width = len(headings)
+    store = tree.store
+    dtypes = bytes(ord(column.typecode) if column.typecode else 0 for column in store.columns) \
+        if store is not None else bytes(width)
+
+    heading_refs = array('i', (ref(heading) for heading in headings))
+    label = ref(tree.label or None)
+    ids = array('I')
+    parents = array('i')
+    counts = array('i')
+    names = array('i')
+    cells = array('i')
+
+    rows = {id(tree): -1}
+    for row, item in enumerate(tree.iter_preorder()):
+        rows[id(item)] = row
+        ids.append(item.id)
+        parents.append(rows[id(item.parent)])
+        counts.append(len(item) if item.is_node() else -1)
+        names.append(ref(item.name))
+
+        columns = item.columns
+        cells.extend(ref(value) for value in columns[:width])
+        cells.extend([-1] * (width - len(columns)))
+
+    offsets = array('Q', [0])
+    for _, data in entries:
+        offsets.append(offsets[-1] + len(data))
+    tags = bytes(tag for tag, _ in entries)
+
+    sections = [heading_refs, dtypes, ids, parents, counts, names, cells, tags, offsets]
+    if sys.byteorder == 'big':
+        for section in sections:
+            if isinstance(section, array):
+                section.byteswap()
+
+    flags = (UNIQUE if tree.unique else 0) | (COLUMNAR if store is not None else 0)
+    header = HEADER.pack(MAGIC, VERSION, flags, width, len(ids), len(entries), label, tree.items)
+
+    # Written beside the target first, so a failed save leaves the old file in place.
+    temp = f'{path}.tmp'
+    with open(temp, 'wb') as file:
+        file.write(header)
+        file.write(bytes(pad(HEADER.size)))
+        for section in sections:
+            data = section.tobytes() if isinstance(section, array) else section
+            file.write(data)
+            file.write(bytes(pad(len(data))))
+        for _, data in entries:
+            file.write(data)
+    os.replace(temp, path)
+
+
+class Snapshot:
+    # A saved tree, memory-mapped. The structure arrays are read in place,
+    # table values are decoded the first time they are used.
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._views = []
+        if len(self.map) < HEADER.size or self.map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f'{path} is not a tree snapshot.')
+        magic, version, flags, width, count, size, label, items = HEADER.unpack_from(self.map)
+        if version != VERSION:
+            self.close()
+            raise ValueError(f'unsupported snapshot version {version}.')
+
+        view = memoryview(self.map)
+
+        self.width = width
+        self.count = count
+        self.items = items
+        self.unique = bool(flags & UNIQUE)
+        self.columnar = bool(flags & COLUMNAR)
+        self._values = [self] * size
+
+        pos = HEADER.size + pad(HEADER.size)
+
+        def section(typecode, length):
+            nonlocal pos
+            if typecode is None:
+                data = view[pos:pos+length]
+                pos += length + pad(length)
+            else:
+                itemsize = array(typecode).itemsize
+                data = view[pos:pos+length*itemsize]
+                pos += length*itemsize + pad(length*itemsize)
+                if sys.byteorder == 'big':
+                    data = array(typecode, data)
+                    data.byteswap()
+                else:
+                    data = data.cast(typecode)
+            self._views.append(data)
+            return data
+
+        headings = section('i', width)
+        dtypes = section(None, width)
+        self.ids = section('I', count)
+        self.parents = section('i', count)
+        self.counts = section('i', count)
+        self.names = section('i', count)
+        self.cells = section('i', count * width)
+        self.tags = section(None, size)
+        self.offsets = section('Q', size + 1)
+        self.data = section(None, self.offsets[-1] if size else 0)
+        self._views.append(view)
+
+        self.headings = [self.value(idx) for idx in headings]
+        self.dtypes = {idx+1: chr(code) for idx, code in enumerate(dtypes) if code}
+        self.label = self.value(label) or ''
+
+    def __repr__(self):
+        return f'Snapshot(items={self.count}, headings={self.headings!r})'
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        # Views into the map have to be released before it can be closed.
+        for view in reversed(self._views):
+            if isinstance(view, memoryview):
+                view.release()
+        self._views = []
+        self.map.close()
+
+    def value(self, idx):
+        if idx < 0:
+            return
+        value = self._values[idx]
+        if value is self:
+            start, end = self.offsets[idx], self.offsets[idx+1]
+            value = self._values[idx] = decode(self.tags[idx], self.data[start:end])
+        return value
+
+    def table(self):
+        # Every value decoded, followed by None so that the -1 reference reads as None.
+        values = [self.value(idx) for idx in range(len(self._values))]
+        values.append(None)
+        return values
+
+    def name(self, row):
+        return self.value(self.names[row])
+
+    def is_node(self, row):
+        return self.counts[row] >= 0
+
+    def columns(self, row):
+        start = row * self.width
+        return [self.value(idx) for idx in self.cells[start:start+self.width]]
+
+    def children(self, row=-1):
+        # Rows of the direct children of a row, -1 for the top level.
+        rows = []
+        pos = row + 1
+        total = self.counts[row] if row >= 0 else None
+        parents = self.parents
+        while pos < self.count and parents[pos] >= row and (total is None or len(rows) < total):
+            if parents[pos] == row:
+                rows.append(pos)
+            pos += 1
+        return rows
@@ -0,0 +1,291 @@
+import json
+import sqlite3
+from collections import OrderedDict
+
+from tree import Tree, Node, LoaderChildren
+
+BUDGET = 100000
+BATCH = 1000
+CHUNK = 500
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    parent INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    node INTEGER NOT NULL,
+    name TEXT,
+    columns TEXT
+);
+CREATE INDEX IF NOT EXISTS items_parent ON items (parent, position);
+CREATE INDEX IF NOT EXISTS items_path ON items (path);
+'''
+
+
+def path(item):
+    # The ids from the top of the tree down to the item, as '/4/9/12/'.
+    ids = []
+    while item is not None and item.parent is not None:
+        ids.append(item.id)
+        item = item.parent
+    return '/' + ''.join(f'{_id}/' for _id in reversed(ids))
+
+
+def below(prefix):
+    # The range of paths that start with prefix, for the path index.
+    return prefix, prefix[:-1] + '0'
+
+
+class Storage:
+    # Reads the children of a node from the file, and writes every change
+    # the tree reports, committing once per batch of writes.
+    def __init__(self, tree, file, batch=BATCH):
+        self.tree = tree
+        self.file = file
+        self.batch = batch
+        self.writes = 0
+        self.db = sqlite3.connect(file)
+        self.db.executescript(SCHEMA)
+
+    def meta(self):
+        return {key: json.loads(value) for key, value in self.db.execute('SELECT key, value FROM meta')}
+
+    def read(self, node):
+        rows = self.db.execute(
+            'SELECT id, node, name, columns FROM items WHERE parent = ? ORDER BY position', (node.id, ))
+        entries = []
+        for _id, is_node, name, columns in rows:
+            entry = {'id': _id, 'name': name, 'columns': json.loads(columns)}
+            if is_node:
+                entry['loader'] = self.read
+            entries.append(entry)
+        return entries
+
+    def write(self, sql, rows):
+        self.db.executemany(sql, rows)
+        self.writes += len(rows)
+        if self.writes >= self.batch:
+            self.flush()
+
+    def flush(self):
+        tree = self.tree
+        self.db.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', [
+            ('headings', json.dumps(tree.headings)),
+            ('unique', json.dumps(tree.unique)),
+            ('label', json.dumps(tree.label)),
+            ('items', json.dumps(tree.items)),
+        ])
+        self.db.commit()
+        self.writes = 0
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    def added(self, item):
+        parent = item.parent
+        idx = len(parent) - 1 if parent[-1] is item else parent.index(item)
+        self.write('UPDATE items SET position = position + 1 WHERE parent = ? AND position >= ?', [(parent.id, idx)])
+
+        rows = []
+        stack = [(item, idx, path(parent))]
+        while stack:
+            item, idx, prefix = stack.pop()
+            prefix += f'{item.id}/'
+            is_node = item.is_node()
+            rows.append((item.id, item.parent.id, idx, prefix, is_node, item.name, json.dumps(item.columns)))
+            if is_node:
+                stack.extend((child, pos, prefix) for pos, child in enumerate(item))
+        self.write('INSERT INTO items (id, parent, position, path, node, name, columns) VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        self.tree.count(item)
+
+    def removed(self, item, parent, idx):
+        self.write('DELETE FROM items WHERE path >= ? AND path < ?', [below(path(parent) + f'{item.id}/')])
+        self.write('UPDATE items SET position = position - 1 WHERE parent = ? AND position > ?', [(parent.id, idx)])
+        self.tree.grow(parent, -1)
+
+    def moved(self, item, parent, idx):
+        old = path(parent) + f'{item.id}/'
+        new = path(item.parent) + f'{item.id}/'
+        position = item.parent.index(item)
+
+        # Park the item while the siblings on either side close and open the gap.
+        self.write('UPDATE items SET parent = ?, position = -1 WHERE id = ?', [(item.parent.id, item.id)])
+        self.write('UPDATE items SET position = position - 1 WHERE parent = ? AND position > ?', [(parent.id, idx)])
+        self.write('UPDATE items SET position = position + 1 WHERE parent = ? AND position >= ?',
+                   [(item.parent.id, position)])
+        self.write('UPDATE items SET position = ? WHERE id = ?', [(position, item.id)])
+        if old != new:
+            self.write('UPDATE items SET path = ? || substr(path, ?) WHERE path >= ? AND path < ?',
+                       [(new, len(old)+1, *below(old))])
+        self.tree.grow(parent, -1)
+        self.tree.grow(item.parent, 1)
+
+    def renamed(self, item, name):
+        self.write('UPDATE items SET name = ? WHERE id = ?', [(item.name, item.id)])
+
+    def changed(self, item, column, old, value):
+        self.write('UPDATE items SET columns = ? WHERE id = ?', [(json.dumps(item.columns), item.id)])
+
+
+class StoredChildren(LoaderChildren):
+    # Stands in for the children of a node added to the tree, once they are
+    # unloaded, and reads them back from the file when they are next used.
+    __slots__ = ('storage', )
+
+    def __init__(self, node, storage):
+        super().__init__(node)
+        self.storage = storage
+
+    def __repr__(self):
+        return f'StoredChildren({self.node!r})'
+
+    def read(self, node):
+        return self.storage.read(node)
+
+    def hold(self, node, tree, items):
+        tree.stored[id(node)] = node
+        tree._held += len(node._children)
+
+
+class SQLiteTree(Tree):
+    # A tree kept in a SQLite file. Nodes are read from the file as lazy nodes,
+    # held in memory within the tree's budget, and every change is written back.
+    # Nodes added to the tree count their children against the budget too,
+    # and are unloaded in turn once their rows are written. An existing file
+    # keeps the headings, unique and label it was created with.
+    __slots__ = ('storage', 'stored')
+
+    def __init__(self, file, **kwargs):
+        storage = Storage(self, file, kwargs.get('batch', BATCH))
+        meta = storage.meta()
+        for key in ('headings', 'unique', 'label'):
+            if key in meta:
+                kwargs[key] = meta[key]
+        kwargs.setdefault('budget', BUDGET)
+        super().__init__(**kwargs)
+
+        self.storage = storage
+        self.stored = OrderedDict()
+        last = storage.db.execute('SELECT max(id) FROM items').fetchone()[0]
+        self.items = max(meta.get('items', 0), last or 0)
+        self._bulk_load(storage.read(self), parent=self)
+        self.observe(storage)
+        if not meta:
+            storage.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def fetch(self, _id):
+        # Items that are not loaded are found by their path, loading the nodes above them.
+        item = self._ids.get(_id)
+        if item is not None or not isinstance(_id, int):
+            return item
+
+        row = self.storage.db.execute('SELECT path FROM items WHERE id = ?', (_id, )).fetchone()
+        if row is None:
+            return
+
+        node = self
+        for part in row[0].strip('/').split('/'):
+            if not node.is_loaded():
+                node._children.load()
+            node = self._ids.get(int(part))
+            if node is None:
+                return
+        return node
+
+    def taken(self, ids):
+        # Items not loaded hold their ids too, so the file is asked for them.
+        taken = super().taken(ids)
+        ids = [_id for _id in ids if _id not in taken]
+        for start in range(0, len(ids), CHUNK):
+            part = ids[start:start+CHUNK]
+            rows = self.storage.db.execute(f'SELECT id FROM items WHERE id IN ({", ".join("?" * len(part))})', part)
+            taken.update(_id for _id, in rows)
+        return taken
+
+    def count(self, item):
+        # An item added, with the plain nodes it brings, each holding its children within the budget.
+        self.grow(item.parent, 1)
+        stored = self.stored
+        stack = [item]
+        while stack:
+            node = stack.pop()
+            if node.__class__ is Node and node._children.__class__ in (list, type(None)):
+                stored[id(node)] = node
+                self._held += len(node._children or ())
+                stack.extend(node._children or ())
+        if self.budget is not None and self._held > self.budget and self._batch is None:
+            self.evict(keep=item)
+
+    def grow(self, node, count):
+        # Items coming and going below a node held within the budget.
+        if id(node) in self.stored:
+            self._held += count
+            self.stored.move_to_end(id(node))
+        elif id(node) in self._loaded:
+            node.size += count
+            self._held += count
+
+    def evict(self, keep=None):
+        # Lazy nodes first, then the nodes added, those changed least recently
+        # first. Not within a batch, that may have to undo changes to them.
+        super().evict(keep)
+        budget = self.budget or 0
+        if self._held <= budget or self._batch is not None:
+            return
+
+        spared = set()
+        while keep is not None:
+            spared.add(id(keep))
+            keep = keep.parent
+        stored = self.stored
+        for _ in range(len(stored)):
+            if self._held <= budget:
+                break
+            key = next(iter(stored))
+            node = stored[key]
+            if key in spared or not node._children:
+                stored.move_to_end(key)
+            else:
+                self.release(node)
+
+    def release(self, node):
+        # Unload the children of a node added to the tree, as LazyNode.unload does.
+        if self._pending:
+            self._unshare(node, structure=True)
+        if self._observers:
+            self.announce('unloaded', node)
+        for child in node._children:
+            self.unregister(child)
+        del self.stored[id(node)]
+        self._held -= len(node._children)
+        node._children = StoredChildren(node, self.storage)
+        node._names = None
+
+    def unregister(self, item):
+        stored = self.stored
+        stack = [item] if stored else []
+        while stack:
+            node = stack.pop()
+            if stored.pop(id(node), None) is not None:
+                self._held -= len(node._children or ())
+            if isinstance(node, Node) and node._children.__class__ is list:
+                stack.extend(node._children)
+        super().unregister(item)
+
+    def flush(self):
+        self.storage.flush()
+
+    def close(self):
+        self.storage.close()
+
+    def reindex(self, start=0):
+        raise TypeError('the ids of a SQLiteTree are its row keys, and cannot be renumbered.')
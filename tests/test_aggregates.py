@@ -0,0 +1,146 @@
+import random
+import unittest
+from tree import Tree, Leaf, Node, LazyNode
+from config import data
+
+
+class TestAggregates(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.t = Tree(headings=['Type', 'Size', 'Path'])
+        self.t.populate(data=data, fast=True)
+        for idx, item in enumerate(self.t.iter_preorder()):
+            item.set(2, idx)
+        self.a = self.t.aggregates(total=('Size', sum), smallest=('Size', min), largest=(2, max))
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        self.a.close()
+
+    def height(self, item):
+        return max((self.height(child) + 1 for child in item), default=0) if item.is_node() else 0
+
+    def check(self):
+        # Compare every item against a walk of its subtree.
+        a = self.a
+        for item, level in [(self.t, -1)] + list(self.t.walk()):
+            below = list(item.iter_preorder()) if item.is_node() else []
+            sizes = [item.get(2) for item in below + ([item] if item is not self.t else [])]
+            sizes = [size for size in sizes if size is not None]
+            self.assertEqual(len(below), a.count(item))
+            self.assertEqual(level, a.depth(item))
+            self.assertEqual(self.height(item), a.height(item))
+            self.assertEqual(sum(sizes), a.value(item, 'total'))
+            self.assertEqual(min(sizes, default=None), a.value(item, 'smallest'))
+            self.assertEqual(max(sizes, default=None), a.value(item, 'largest'))
+
+    def test_aggregates(self):
+        # Asert, that the aggregates are built for every item.
+        a = self.a
+        t = self.t
+        self.assertEqual(12, a.count(t))
+        self.assertEqual(7, a.count(t.query('Node Three')))
+        self.assertEqual(0, a.depth(t.query('Node One')))
+        self.assertEqual(5, a.depth(t.query('Leaf Six')))
+        self.assertEqual(5, a.height(t.query('Node One')))
+        self.assertEqual(0, a.height(t.query('Leaf Six')))
+        self.assertEqual(sum(range(12)), a.value(t, 'total'))
+        self.check()
+
+    def test_changes(self):
+        # Action, append, insert, set, move and delete.
+        t = self.t
+        a = self.a
+        node = t.query('Node Five').append(Node(name='Node New', columns=['Node', 100]))
+        node.append(Leaf(name='Leaf New', columns=['Leaf', -5]))
+        t.insert(0, Leaf(name='Leaf First', columns=['Leaf', 7]))
+
+        # Asert, that ancestors take in the new items.
+        self.assertEqual(13, a.count(t.query('Node One')))
+        self.assertEqual(5, a.height(t.query('Node One')))
+        self.assertEqual(-5, a.value(t, 'smallest'))
+        self.assertEqual(100, a.value(t.query('Node Three'), 'largest'))
+        self.check()
+
+        # Action, change the extremes and move a subtree up.
+        node[0].set(2, 50)
+        node.set(2, None)
+        t.query('Node Four').move(t)
+        t.query('Leaf First').set((1, 2), ('Leaf', 3))
+
+        # Asert, that the old and new ancestors follow.
+        self.assertEqual(0, a.depth(t.query('Node Four')))
+        self.assertEqual(2, a.depth(t.query('Node Four/Node Five/Node New')))
+        self.assertEqual(50, a.value(t, 'largest'))
+        self.check()
+
+        # Action, delete the deepest items.
+        t.query('Node Four').delete()
+        t.query('Leaf First').delete()
+
+        # Asert, that the removed items are taken away.
+        self.assertEqual(6, a.count(t))
+        self.assertEqual(2, a.height(t.query('Node One')))
+        self.check()
+
+    def test_random(self):
+        # Action, make random changes.
+        rnd = random.Random(7)
+        t = self.t
+        for step in range(300):
+            items = list(t.iter_preorder())
+            nodes = [t] + [item for item in items if item.is_node()]
+            action = rnd.randrange(5)
+            if action == 0 or not items:
+                cls = rnd.choice((Node, Leaf))
+                rnd.choice(nodes).append(cls(name=f'Item {step}', columns=[None, rnd.randrange(-50, 50)]))
+            elif action == 1:
+                rnd.choice(items).set(2, rnd.choice((None, rnd.randrange(-50, 50))))
+            elif action == 2:
+                item = rnd.choice(items)
+                dst = parent = rnd.choice(nodes)
+                while parent is not None and parent is not item:
+                    parent = parent.parent
+                if parent is None:
+                    item.move(dst, rnd.choice((None, 0)))
+            elif action == 3 and len(items) > 5:
+                rnd.choice(items).delete()
+            else:
+                rnd.choice(nodes).insert(0, Leaf(name=f'Item {step}', columns=[None, step]))
+
+        # Asert, that the aggregates match a walk of the tree.
+        self.check()
+
+    def test_lazy(self):
+        # Action, read in a lazy node's children, and change one.
+        t = self.t
+        a = self.a
+
+        def loader(node):
+            return [{'name': 'Leaf Five', 'columns': ['Leaf', 5]}, {'name': 'Leaf Seven', 'columns': ['Leaf', 7]}]
+
+        lazy = t.query('Node Two').append(LazyNode(name='Lazy', loader=loader, columns=['Node', -1]))
+        self.assertEqual(0, a.count(lazy))
+        self.assertEqual(2, len(lazy))
+        lazy[0].set(2, 100)
+
+        # Asert, that the node and its ancestors take in the items.
+        self.assertEqual(2, a.count(lazy))
+        self.assertEqual(1, a.height(lazy))
+        self.assertEqual(66 - 1 + 100 + 7, a.value(t, 'total'))
+        self.assertEqual(100, a.value(t, 'largest'))
+        self.check()
+
+        # Action, unload the node.
+        lazy.unload()
+
+        # Asert, that its items are taken away again.
+        self.assertEqual(0, a.count(lazy))
+        self.assertEqual(0, a.height(lazy))
+        self.assertEqual(-1, a.value(lazy, 'largest'))
+        self.assertEqual(66 - 1, a.value(t, 'total'))
+        self.assertEqual(11, a.value(t, 'largest'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+import random
+import unittest
+from tree import Tree, Leaf, Node
+from config import data
+from copy import deepcopy
+from test_journal import Replica
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.t = Tree(headings=['Type', 'Size', 'Path'])
+        self.t.populate(data=deepcopy(data))
+        for idx, item in enumerate(self.t.iter_preorder()):
+            item.set(2, idx)
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+
+    def entries(self, item):
+        entry = {'id': item.id, 'name': item.name, 'columns': item.columns}
+        if item.is_node():
+            entry['children'] = [self.entries(child) for child in item]
+        return entry
+
+    def state(self):
+        return self.t.to_list(), [(item.id, item.name) for item in self.t.iter_preorder()], self.t.items
+
+    def edit(self, rnd, step):
+        t = self.t
+        items = list(t.iter_preorder())
+        nodes = [t] + [item for item in items if item.is_node()]
+        action = rnd.randrange(5)
+        if action == 0 or len(items) < 5:
+            dst = rnd.choice(nodes)
+            dst.insert(rnd.randrange(len(dst) + 1), rnd.choice((Node, Leaf))(name=f'Item {step}'))
+        elif action == 1:
+            item = rnd.choice(items)
+            dst = parent = rnd.choice(nodes)
+            while parent is not None and parent is not item:
+                parent = parent.parent
+            if parent is None:
+                item.move(dst, rnd.choice((None, 0)))
+        elif action == 2:
+            rnd.choice(items).delete()
+        elif action == 3:
+            rnd.choice(items).set(rnd.randrange(1, 4), rnd.randrange(3))
+        else:
+            rnd.choice(items).rename(f'Item {step}')
+
+    def test_commit(self):
+        # Action, swap two names and edit the tree, with an index and aggregates.
+        t = self.t
+        index = t.create_index('Size', kind='sorted')
+        totals = t.aggregates(size=('Size', sum))
+        with t.batch():
+            t.query('Leaf Two').rename('Node Two')
+            t.query('Node Two').rename('Leaf Two')
+            t.query('Node Two').rename('Node 2')
+            t.append(Leaf(name='Leaf New', columns=['Leaf', 100]))
+            t.query('Node Three').delete()
+
+        # Asert, that the changes are kept, and the index and aggregates refreshed.
+        self.assertEqual(['Node One', 'Leaf New'], [item.name for item in t])
+        self.assertEqual(['Leaf One', 'Leaf Two', 'Node 2'], [item.name for item in t.query('Node One')])
+        self.assertEqual(['Leaf One', 'Leaf Two', 'Node 2', 'Leaf New'], [item.name for item in t.range('Size', 1)])
+        self.assertEqual(106, totals.value(t, 'size'))
+        self.assertIsNone(t._batch)
+        self.assertEqual([index, totals], t._observers)
+
+    def test_rollback(self):
+        # Action, make random edits, with subscribers and an index, and then fail.
+        rnd = random.Random(5)
+        t = self.t
+        index = t.create_index('Size', kind='sorted')
+        expected = self.state()
+        replica = Replica(self.entries(t)['children'])
+        t.subscribe(replica)
+        with self.assertRaises(KeyError):
+            with t.batch():
+                for step in range(200):
+                    self.edit(rnd, step)
+                raise KeyError('failed')
+
+        # Asert, that the tree, its ids and index are as they were, and subscribers are told of the undoing.
+        self.assertEqual(expected, self.state())
+        self.assertEqual([item for item in t.iter_preorder()], [t.fetch(item.id) for item in t.iter_preorder()])
+        self.assertEqual(t.range('Size', 1), index.range(1))
+        t.flush_events()
+        self.assertEqual(t.to_list(), replica.to_list())
+
+        # Action, commit the same edits.
+        rnd = random.Random(5)
+        with t.batch():
+            for step in range(200):
+                self.edit(rnd, step)
+        items = [item for item in t.iter_preorder() if item.get(2) is not None]
+        t.flush_events()
+
+        # Asert, that the index and the replica match the tree.
+        self.assertEqual(sorted(items, key=lambda item: item.get(2)), index.range())
+        self.assertEqual(t.to_list(), replica.to_list())
+
+    def test_duplicate(self):
+        # Action, leave a duplicate name at the end of the batch.
+        t = self.t
+        expected = self.state()
+        with self.assertRaises(ValueError):
+            with t.batch():
+                t.query('Leaf Two').set(1, 'File')
+                t.query('Node One').append(Leaf(name='Leaf Two'))
+
+        # Asert, that nothing is kept.
+        self.assertEqual(expected, self.state())
+        self.assertIsNone(t._batch)
+
+    def test_not_unique(self):
+        # Action, add a second item by the same name to a tree that allows it.
+        t = Tree(headings=['Type', 'Size'], unique=False)
+        t.append(Leaf(name='Leaf'))
+        with t.batch():
+            t.append(Leaf(name='Leaf'))
+
+        # Asert, that both are kept.
+        self.assertEqual(['Leaf', 'Leaf'], [item.name for item in t])
+
+    def test_nested(self):
+        # Action, fail within a batch within a batch.
+        t = self.t
+        with t.batch():
+            t.query('Leaf One').set(1, 'File')
+            try:
+                with t.batch():
+                    t.query('Leaf Two').set(1, 'File')
+                    t.append(Leaf(name='Leaf New'))
+                    raise KeyError('failed')
+            except KeyError:
+                pass
+            t.append(Leaf(name='Leaf Last'))
+
+        # Asert, that only the inner batch is undone.
+        self.assertEqual('File', t.query('Leaf One').get(1))
+        self.assertIsNone(t.query('Leaf Two').get(1))
+        self.assertIsNone(t.query('Leaf New'))
+        self.assertEqual(13, t.query('Leaf Last').id)
+
+    def test_fresh(self):
+        # Action, edit items added in the batch, and one removed and added again, and fail.
+        t = self.t
+        expected = t.to_list()
+        leaf = t.query('Leaf Two')
+        with self.assertRaises(KeyError):
+            with t.batch() as batch:
+                new = t.append(Leaf(name='Leaf New'))
+                new.set(2, 5)
+                new.rename('Leaf Newer')
+                leaf.delete()
+                t.append(leaf)
+                leaf.set(2, 5)
+                logged = len(batch.log)
+                raise KeyError('failed')
+
+        # Asert, that only the changes to the item kept by the undo are logged, and it is put back.
+        self.assertEqual(4 * 4, logged)
+        self.assertEqual(expected, t.to_list())
+
+        # Action, edit an item of the outer batch in an inner batch that fails.
+        with t.batch():
+            new = t.append(Leaf(name='Leaf New'))
+            new.set(2, 5)
+            try:
+                with t.batch():
+                    new.set(2, 6)
+                    newer = t.append(Leaf(name='Leaf Newer'))
+                    newer.set(2, 6)
+                    raise KeyError('failed')
+            except KeyError:
+                pass
+            new.set(2, 7)
+            try:
+                with t.batch():
+                    new.set(2, 8)
+                    raise KeyError('failed')
+            except KeyError:
+                pass
+
+        # Asert, that the inner batches undo their changes to it.
+        self.assertEqual(7, new.get(2))
+        self.assertIsNone(t.query('Leaf Newer'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+from tree import Tree, Leaf, Node
+from columns import Column, ColumnStore
+
+
+class TestColumns(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.t = Tree(headings=['Type', 'Size', 'Path'], columnar=True, dtypes={'Size': 'q'})
+        node = self.t.append(Node(name='Node 1', columns=['Node']))
+        for idx in range(1, 6):
+            node.append(Leaf(name=f'Leaf {idx}', columns=['Leaf', idx * 10]))
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+
+    def test_column(self):
+        # Action, get the numeric and object columns.
+        t = self.t
+        size = t.column('Size')
+        kind = t.column(1)
+
+        # Asert, that the columns are backed by the store, numeric ones by an array.
+        self.assertIs(size, t.store.column(2))
+        self.assertEqual('q', size.data.typecode)
+        self.assertIsInstance(kind.data, list)
+
+        # Asert, that the vectorized helpers skip unset values.
+        self.assertEqual(150, size.sum())
+        self.assertEqual(5, size.count())
+        self.assertEqual(10, size.min())
+        self.assertEqual(50, size.max())
+        self.assertEqual(30, size.mean())
+        self.assertEqual(6, kind.count())
+
+        # Action, filter the rows of a column.
+        ids = size.where(lambda value: value > 25)
+
+        # Asert, that the rows are item ids.
+        self.assertEqual(['Leaf 3', 'Leaf 4', 'Leaf 5'], [t.query(_id).name for _id in ids])
+        self.assertEqual(ids, kind.where(lambda value: value == 'Leaf')[2:])
+
+    def test_get_set(self):
+        # Action, get tree and an item.
+        t = self.t
+        leaf = t.query('Leaf 2')
+
+        # Asert, that values are read from the store, not the item.
+        self.assertIsNone(leaf._columns)
+        self.assertEqual(('Leaf 2', 'Leaf', 20, None), leaf.get())
+        self.assertEqual(['Leaf', 20, None], leaf.columns)
+
+        # Action, write cells through set, set_cell and the columns property.
+        leaf.set((2, 3), (25, leaf.path()))
+        t.set_cell(leaf.id, 1, 'File')
+
+        # Asert, that the store sees the new values.
+        self.assertEqual(155, t.column(2).sum())
+        self.assertEqual('/Node 1/Leaf 2', t.column(3)[leaf.id])
+        self.assertEqual('File', t.get_cell(leaf.id, 1))
+
+        leaf.columns = ['Leaf', None, None]
+        self.assertEqual(130, t.column(2).sum())
+
+    def test_delete(self):
+        # Action, delete an item.
+        t = self.t
+        leaf = t.query('Leaf 5')
+        leaf.delete()
+
+        # Asert, that its row is cleared and the item keeps its values.
+        self.assertEqual(100, t.column('Size').sum())
+        self.assertEqual(['Leaf', 50, None], leaf.columns)
+
+        # Action, renumber the tree.
+        t.reindex()
+
+        # Asert, that rows follow the new ids.
+        self.assertEqual([(2, 10), (3, 20), (4, 30), (5, 40)], t.column('Size').items())
+
+    def test_detached_column(self):
+        # Action, create a tree without a column store.
+        t = Tree(headings=['Type', 'Size'])
+        t.append(Leaf(name='Leaf 1', columns=['Leaf', 1]))
+        t.append(Leaf(name='Leaf 2', columns=['Leaf', 2]))
+
+        # Asert, that the column is gathered from the items.
+        self.assertIsNone(t.store)
+        self.assertEqual(3, t.column('Size').sum())
+        self.assertRaises(IndexError, t.column, 3)
+
+    def test_store(self):
+        # Action, create a store with a numeric and an object column.
+        store = ColumnStore(['Name', 'Size'], {2: 'd'})
+        store.put(3, ['Three', 1.5])
+        store.set(7, 1, 2.5)
+
+        # Asert, that rows grow on demand and unset cells read as None.
+        self.assertEqual(['Three', 1.5], store.row(3))
+        self.assertEqual([None, 2.5], store.row(7))
+        self.assertEqual([None, None], store.row(1000))
+        self.assertEqual(4.0, store.column('Size').sum())
+        self.assertEqual([None, 2.5], store.pop(7))
+        self.assertEqual(1, store.column(2).count())
+
+        # Asert, that an unknown column is reported.
+        self.assertRaises(KeyError, store.column, 'Path')
+        self.assertRaises(IndexError, store.column, 3)
+
+        # Action, fill a numeric column with a gap.
+        column = Column('Size', 'b')
+        column.grow(3)
+        column[1] = 5
+        column[2] = 0
+
+        # Asert, that the mask only marks rows that hold a matching value.
+        self.assertEqual(bytearray(b'\x00\x01\x01'), column.mask(lambda value: value >= 0))
+        self.assertEqual([2], column.where(lambda value: value == 0))
@@ -0,0 +1,114 @@
+import unittest
+from datetime import datetime
+from tree import Tree, Leaf, Node, LazyNode
+from config import data
+
+
+class TestIndexes(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.t = Tree(headings=['Type', 'Size', 'Modified'])
+        self.t.populate(data=data, fast=True)
+        for idx, item in enumerate(self.t.iter_preorder()):
+            item.columns = [item.type, idx * 10, datetime(2020, 1, idx+1)]
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+
+    def names(self, items):
+        return [item.name for item in items]
+
+    def test_hash(self):
+        # Action, index the type column, then edit the tree.
+        t = self.t
+        index = t.create_index('Type')
+        self.assertEqual(6, len(t.lookup('Type', 'Leaf')))
+        t.query('Node Two').append(Leaf(name='Leaf New', columns=['Leaf']))
+        t.insert(0, Node(name='Node First', columns=['Node']))
+        t.query('Leaf One').set(1, 'File')
+        t.set_cell(t.query('Leaf Two').id, 1, 'File')
+        t.query('Node Four').delete()
+
+        # Asert, that lookups follow the changes.
+        self.assertEqual('hash', index.kind)
+        self.assertEqual(['Leaf Three', 'Leaf New'], self.names(t.lookup('Type', 'Leaf')))
+        self.assertEqual(['Leaf One', 'Leaf Two'], self.names(t.lookup('Type', 'File')))
+        self.assertEqual(['Node One', 'Node Two', 'Node Three', 'Node First'], self.names(t.lookup(1, 'Node')))
+        self.assertEqual([], t.lookup('Type', 'Missing'))
+        self.assertNotIn('Node Five', index.buckets['Node'])
+
+        # Action, drop the index.
+        t.drop_index('Type')
+
+        # Asert, that lookups walk the tree.
+        self.assertNotIn(index, t._observers)
+        self.assertEqual(['Leaf Two', 'Leaf One'], self.names(t.lookup('Type', 'File'))[::-1])
+
+    def test_sorted(self):
+        # Action, index the size and modified columns.
+        t = self.t
+        t.create_index('Size', kind='sorted')
+        t.create_index('Modified', kind='sorted')
+        t.query('Leaf Six').set(2, 5)
+        t.query('Leaf One').set(2, None)
+        t.query('Leaf Five').delete()
+
+        # Asert, that ranges come back in value order.
+        self.assertEqual(['Node One', 'Leaf Six', 'Node Two', 'Leaf Two'], self.names(t.range('Size', hi=31)))
+        self.assertEqual(['Node Four', 'Leaf Four'], self.names(t.range('Size', 60, 80)))
+        self.assertEqual(['Leaf Four'], self.names(t.lookup('Size', 70)))
+        self.assertEqual(['Leaf Four', 'Node Five', 'Node Six', 'Leaf Six'],
+                         self.names(t.range('Modified', datetime(2020, 1, 8), datetime(2020, 1, 13))))
+        self.assertRaises(ValueError, t.create_index, 'Size', 'tree')
+
+    def test_names(self):
+        # Action, index names and move and rename items.
+        t = self.t
+        t.create_index(0)
+        node = t.query('Node Four')
+        node.move(t)
+        node.rename('Node 4')
+        t.query('Node One').clone(t.query('Node 4')).rename('Node Copy')
+
+        # Asert, that names are looked up across the tree.
+        self.assertEqual([node], t.lookup(0, 'Node 4'))
+        self.assertEqual([], t.lookup(0, 'Node Four'))
+        self.assertEqual(2, len(t.lookup(0, 'Leaf One')))
+        self.assertEqual(t.lookup(0, 'Leaf Three'), [item for item in t.iter_preorder() if item.name == 'Leaf Three'])
+
+    def test_walk(self):
+        # Asert, that without an index the same items are found.
+        t = self.t
+        expected = t.range('Size', 20, 50), t.lookup('Type', 'Leaf')
+        t.create_index('Size', kind='sorted')
+        t.create_index('Type')
+        self.assertEqual(expected, (t.range('Size', 20, 50), t.lookup('Type', 'Leaf')))
+
+    def test_lazy(self):
+        # Action, index a tree that holds five items of its lazy nodes, then load and unload them.
+        t = Tree(headings=['Type', 'Size'], budget=5)
+
+        def loader(node):
+            return [{'name': f'{node.name}-{idx}', 'columns': ['Lazy', idx], 'loader': loader} for idx in range(3)]
+
+        t.append(LazyNode(name='Lazy', columns=['Lazy', 0], loader=loader))
+        index = t.create_index('Type')
+        ranges = t.create_index('Size', kind='sorted')
+        node = t[0]
+        first = node[0]
+        loaded = t.lookup('Type', 'Lazy')
+        len(first)
+        len(node[1])
+
+        # Asert, that loaded items are found, and unloaded ones are not.
+        self.assertEqual(4, len(loaded))
+        self.assertFalse(first.is_loaded())
+        found = [item for item, _ in t.walk(load=False) if item.get(1) == 'Lazy']
+        self.assertEqual(7, len(found))
+        self.assertEqual(sorted(map(id, found)), sorted(map(id, index.lookup('Lazy'))))
+        self.assertEqual(sorted(map(id, found)), sorted(map(id, ranges.range())))
+        self.assertTrue(all(item.tree is t for item in index.lookup('Lazy')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import random
+import unittest
+from tree import Tree, Leaf, Node
+from config import data
+from copy import deepcopy
+
+
+class Replica:
+    # A copy of a tree, kept by ids, built from nothing but the events.
+    def __init__(self, entries):
+        self.items = {0: {'children': []}}
+        self.add(0, 0, entries)
+
+    def add(self, parent, idx, entries):
+        children = self.items[parent]['children']
+        for entry in entries:
+            item = {'name': entry['name'], 'columns': list(entry['columns'])}
+            if 'children' in entry:
+                item['children'] = []
+            self.items[entry['id']] = item
+            children.insert(idx, entry['id'])
+            idx += 1
+            if 'children' in entry:
+                self.add(entry['id'], 0, entry['children'])
+
+    def __call__(self, events):
+        items = self.items
+        for event in events:
+            kind, _id = event[:2]
+            if kind == 'added':
+                self.add(event[2], event[3], [event[4]])
+            elif kind == 'removed':
+                del items[event[2]]['children'][event[3]]
+            elif kind == 'moved':
+                del items[event[2]]['children'][event[3]]
+                items[event[4]]['children'].insert(event[5], _id)
+            elif kind == 'renamed':
+                items[_id]['name'] = event[3]
+            else:
+                items[_id]['columns'][event[2]-1] = event[4]
+
+    def to_list(self, parent=0):
+        data = []
+        for _id in self.items[parent]['children']:
+            item = self.items[_id]
+            entry = {'name': item['name'], 'columns': item['columns']}
+            if 'children' in item:
+                entry['children'] = self.to_list(_id)
+            data.append(entry)
+        return data
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.t = Tree(headings=['Type', 'Size', 'Path'])
+        self.t.populate(data=deepcopy(data))
+        self.batches = []
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+
+    def entries(self):
+        def entry(item):
+            result = {'id': item.id, 'name': item.name, 'columns': item.columns}
+            if item.is_node():
+                result['children'] = [entry(child) for child in item]
+            return result
+        return [entry(item) for item in self.t]
+
+    def test_events(self):
+        # Action, subscribe and edit the tree.
+        t = self.t
+        t.subscribe(self.batches.append)
+        node = t.query('Node Two').append(Node(name='Node New'))
+        leaf = node.append(Leaf(name='Leaf New'))
+        leaf.set(1, 'Leaf')
+        node.rename('Node 2')
+        t.query('Leaf One').set(2, 1)
+        t.query('Leaf One').set(2, 2)
+        t.query('Leaf Two').rename('Leaf 2')
+        t.query('Leaf 2').rename('Leaf Two')
+        t.query('Leaf Four').move(t, 0)
+        t.query('Leaf Three').delete()
+
+        # Asert, that nothing is sent before a flush.
+        self.assertEqual([], self.batches)
+        t.flush_events()
+
+        # Asert, that changes to new items and repeated changes are folded.
+        self.assertEqual([[
+            ('added', node.id, 3, 0, {'id': node.id, 'name': 'Node 2', 'columns': [None, None, None],
+                                      'children': []}),
+            ('added', leaf.id, node.id, 0, {'id': leaf.id, 'name': 'Leaf New', 'columns': ['Leaf', None, None]}),
+            ('changed', 2, 2, None, 2),
+            ('moved', 8, 7, 0, 0, 0),
+            ('removed', 6, 5, 0),
+        ]], self.batches)
+
+    def test_replica(self):
+        # Action, keep a replica from the events of random edits, in small batches.
+        rnd = random.Random(3)
+        t = self.t
+        replica = Replica(self.entries())
+        t.subscribe(replica, batch=7)
+        for step in range(400):
+            items = list(t.iter_preorder())
+            nodes = [t] + [item for item in items if item.is_node()]
+            action = rnd.randrange(6)
+            if action == 0 or not items:
+                dst = rnd.choice(nodes)
+                dst.insert(rnd.randrange(len(dst) + 1), rnd.choice((Node, Leaf))(name=f'Item {step}'))
+            elif action == 1:
+                item = rnd.choice(items)
+                dst = parent = rnd.choice(nodes)
+                while parent is not None and parent is not item:
+                    parent = parent.parent
+                if parent is None and not dst.named(item.name):
+                    item.move(dst, rnd.choice((None, 0)))
+            elif action == 2 and len(items) > 5:
+                rnd.choice(items).delete()
+            elif action == 3:
+                rnd.choice(items).set(rnd.randrange(1, 4), rnd.randrange(3))
+            elif action == 4:
+                item = rnd.choice(items)
+                name = rnd.choice((item.name, f'Item {step}'))
+                if not item.parent.named(name):
+                    item.rename(name)
+            else:
+                t.bulk_load([{'name': f'Bulk {step}', 'children': [{'name': 'Leaf'}]}, {'name': f'Leaf {step}'}],
+                            parent=rnd.choice(nodes))
+        t.flush_events()
+
+        # Asert, that the replica matches the tree.
+        self.assertEqual(t.to_list(), replica.to_list())
+
+    def test_unsubscribe(self):
+        # Action, subscribe twice, then unsubscribe both.
+        t = self.t
+        other = []
+        t.subscribe(self.batches.append)
+        t.subscribe(other.append)
+        t.query('Leaf One').set(1, 'Leaf')
+        t.unsubscribe(other.append)
+        t.query('Leaf One').set(1, 'File')
+        t.unsubscribe(self.batches.append)
+        t.query('Leaf One').set(1, 'Other')
+
+        # Asert, that the last to leave gets what is pending, and the tree stops recording.
+        self.assertEqual([], other)
+        self.assertEqual([[('changed', 2, 1, None, 'File')]], self.batches)
+        self.assertEqual([], t._observers)
+        self.assertIsNone(t._journal)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from io import StringIO, BytesIO
+from json import dumps, loads, JSONDecodeError
+from tree import Tree, Leaf
+from jsonstream import Tokens
+from config import data
+
+
+class Trickle(BytesIO):
+    # A stream that hands out a byte at a time, whatever is asked for.
+    def read(self, size=-1):
+        return super().read(1)
+
+
+class TestJsonStream(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.t = Tree(headings=['Type', 'Size', 'Path'])
+        self.t.populate(data=data, fast=True)
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+
+    def test_dump_json(self):
+        # Action, write the tree and a node as JSON.
+        t = self.t
+        t.query('Leaf Two').set((1, 2), ('Léaf "2"', {'size': [1, 2.5, None]}))
+        stream = StringIO()
+        t.dump_json(stream)
+        node = StringIO()
+        t.query('Node Three').dump_json(node)
+        empty = StringIO()
+        t.query('Node Two').dump_json(empty)
+
+        # Asert, that the JSON matches to_list.
+        self.assertEqual(dumps(t.to_list()), dumps(loads(stream.getvalue())))
+        self.assertEqual(t.query('Node Three').to_list(), loads(node.getvalue()))
+        self.assertEqual('[]', empty.getvalue())
+
+    def test_load_json(self):
+        # Action, load the tree back from JSON, a byte at a time.
+        t = self.t
+        t.query('Leaf Two').set((1, 2, 3), ('Léaf 😀', -1.5e3, [True, False, {'a': None}]))
+        t.query('Leaf Six').set(2, 12345678901234567890)
+        stream = StringIO()
+        t.dump_json(stream)
+        loaded = Tree.load_json(Trickle(stream.getvalue().encode()), headings=t.headings)
+
+        # Asert, that the loaded tree matches, and is indexed.
+        self.assertEqual(t.to_list(), loaded.to_list())
+        leaf = loaded.query('Leaf Six')
+        self.assertIs(leaf, loaded.query(leaf.id))
+        self.assertEqual('/Node One/Node Three/Node Four/Node Five/Node Six/Leaf Six', leaf.path())
+
+        # Action, load JSON with keys after the children, and children set to null.
+        text = '[{"children": [{"name": "Leaf"}], "name": "Node", "columns": ["Node"]}, {"name": "Empty", "children": null}]'
+        loaded = Tree.load_json(StringIO(text), headings=['Type'])
+
+        # Asert, that the late keys are applied to the node.
+        self.assertEqual([
+            {'name': 'Node', 'columns': ['Node'], 'children': [{'name': 'Leaf', 'columns': [None]}]},
+            {'name': 'Empty', 'columns': [None], 'children': []},
+        ], loaded.to_list())
+        self.assertIsInstance(loaded.query('Node/Leaf'), Leaf)
+
+    def test_errors(self):
+        # Asert, that malformed JSON and input populate would refuse are reported.
+        for text in ('{}', '[{"name": "Leaf"},]', '[{"name": "Leaf"}', '[1]', '[{"children": 1}]',
+                     '[{"name": tru}]', '[] []'):
+            self.assertRaises(JSONDecodeError, Tree.load_json, StringIO(text))
+        self.assertRaises(ValueError, Tree.load_json, StringIO('[{"name": "Leaf"}, {"name": "Leaf"}]'))
+
+    def test_tokens(self):
+        # Action, read tokens split across chunk boundaries.
+        tokens = Tokens(StringIO('[-12.5e1, true, "a\\"b", {"c": [null]}]'), size=1)
+
+        # Asert, that values are read whole.
+        self.assertEqual('[', tokens.next())
+        self.assertEqual((-125.0, ), tokens.next())
+        self.assertEqual(',', tokens.next())
+        self.assertEqual((True, ), tokens.next())
+        tokens.expect(',')
+        self.assertEqual('a"b', tokens.value())
+        tokens.expect(',')
+        self.assertEqual({'c': [None]}, tokens.value())
+        self.assertEqual(']', tokens.next())
+        self.assertIsNone(tokens.next())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import io
+import sys
+import unittest
+from threading import Thread, Event
+from tree import Tree, Leaf, Node, LazyNode
+from locks import RWLock
+from config import data
+
+
+class TestLocks(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.t = Tree(headings=['Type', 'Size'], concurrent=True)
+        self.t.populate(data=data, fast=True)
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+
+    def run_threads(self, *targets):
+        errors = []
+
+        def run(target):
+            try:
+                target()
+            except Exception as error:
+                errors.append(error)
+
+        threads = [Thread(target=run, args=(target, )) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def test_lock(self):
+        # Action, hold the read lock while another reader and a writer come.
+        lock = RWLock()
+        steps = []
+        reading = Event()
+        lock.acquire_read()
+        lock.acquire_read()
+
+        def reader():
+            with lock.read():
+                steps.append('read')
+                reading.set()
+
+        def writer():
+            with lock.write():
+                with lock.write(), lock.read():
+                    steps.append('write')
+
+        thread = Thread(target=reader)
+        thread.start()
+        reading.wait(5)
+        thread.join()
+        thread = Thread(target=writer)
+        thread.start()
+        thread.join(0.1)
+
+        # Asert, that readers share the lock, and the writer waits for them.
+        self.assertEqual(['read'], steps)
+        self.assertRaises(RuntimeError, lock.acquire_write)
+        lock.release_read()
+        lock.release_read()
+        thread.join()
+        self.assertEqual(['read', 'write'], steps)
+        self.assertIsNone(lock.owner)
+        self.assertEqual(0, lock.readers)
+
+    def test_snapshot(self):
+        # Action, start walking, then change the tree.
+        t = self.t
+        items = t.iter_preorder()
+        first = next(items)
+        t.query('Node Three').delete()
+        t.append(Leaf(name='Leaf New'))
+
+        # Asert, that the walk goes on over the tree as it was.
+        self.assertEqual('Node One', first.name)
+        self.assertEqual(11, len(list(items)))
+        self.assertEqual(5, len(list(t.iter_preorder())))
+
+    def test_threads(self):
+        # Action, read while a writer keeps the number of items the same.
+        t = self.t
+        done = Event()
+        counts = []
+        work = t.append(Node(name='Work'))
+        work.append(Node(name='Start')).append(Leaf(name='Leaf'))
+
+        def writer():
+            try:
+                for step in range(300):
+                    with t.batch():
+                        work.append(Node(name=f'Node {step}')).append(Leaf(name='Leaf'))
+                        work[0].delete()
+                    work[-1].set(2, step)
+            finally:
+                done.set()
+
+        def reader():
+            while not done.is_set():
+                with t.reading():
+                    counts.append(len(list(t.iter_preorder())) + len(t.to_list()[0]['children']))
+                t.find_all('**/Leaf', recursive=True)
+                t.render(io.StringIO(), format='csv')
+                t.get_cell(1, 2)
+
+        # Switch threads often, for readers to come in the middle of changes.
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        try:
+            errors = self.run_threads(writer, reader, reader, reader)
+        finally:
+            sys.setswitchinterval(interval)
+
+        # Asert, that no reader failed or saw a change half made.
+        self.assertEqual([], errors)
+        self.assertEqual({19}, set(counts))
+
+    def test_loads(self):
+        # Action, use a lazy node from many readers at once.
+        t = self.t
+        calls = []
+
+        def loader(node):
+            calls.append(node.name)
+            return [{'name': f'Leaf {idx}'} for idx in range(500)]
+
+        node = t.append(LazyNode(name='Lazy', loader=loader))
+        sizes = []
+        errors = self.run_threads(*[lambda: sizes.append(len(t.query('Lazy').to_list()))] * 4)
+
+        # Asert, that it is loaded once, and every reader sees all of it.
+        self.assertEqual([], errors)
+        self.assertEqual(['Lazy'], calls)
+        self.assertEqual([500] * 4, sizes)
+        self.assertEqual(500, len(node))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from operator import add
+from tree import Tree, Leaf
+from parallel import chunks, expand
+from config import data
+
+
+def path_of(row):
+    return row.path
+
+
+def sizes(row):
+    return len(row.path), row.depth
+
+
+def size_of(row):
+    return row.columns[1] or 0
+
+
+def fail(row):
+    raise KeyError(row.name)
+
+
+class TestParallel(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.t = Tree(headings=['Type', 'Size', 'Path', 'Depth'])
+        self.t.populate(data=data, fast=True)
+        for idx, item in enumerate(self.t.iter_preorder()):
+            item.set(2, idx)
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+
+    def test_chunks(self):
+        # Action, cut the tree into runs of 5 items, and expand them again.
+        t = self.t
+        parts = list(chunks(t, 2, 5))
+        rows = [row for part in parts for row in expand(part)]
+
+        # Asert, that the runs cover the tree in order, with the same paths and depths.
+        self.assertEqual([5, 5, 2], [len(part[1]) for part in parts])
+        self.assertEqual([(item.id, item.path(), depth) for item, depth in t.walk()],
+                         [(row.id, row.path, row.depth) for row in rows])
+        self.assertEqual([item.type for item in t.iter_preorder()], [row.type for row in rows])
+
+    def test_map(self):
+        # Action, fill in the paths, and the lengths of the paths and depths, from two workers.
+        t = self.t
+        t.parallel_map(path_of, 'Path', workers=2, size=3)
+        t.parallel_map(sizes, ('Size', 'Depth'), workers=2, size=3)
+
+        # Asert, that every item has its own values.
+        for item, depth in t.walk():
+            self.assertEqual(item.path(), item.get(3))
+            self.assertEqual((len(item.path()), depth), (item.get(2), item.get(4)))
+
+    def test_columnar(self):
+        # Action, fill in a column of a columnar tree with an index, in this process.
+        t = Tree(headings=['Type', 'Size', 'Path'], columnar=True)
+        t.populate(data=data, fast=True)
+        index = t.create_index('Path')
+        t.parallel_map(path_of, 3, workers=1)
+
+        # Asert, that the index found the new values.
+        self.assertEqual([t.query('Node One/Node Three/Leaf Three')], index.lookup('/Node One/Node Three/Leaf Three'))
+
+    def test_reduce(self):
+        # Action, add up the sizes, with and without an initial value.
+        t = self.t
+        total = sum(range(12))
+
+        # Asert, that the runs are combined in order.
+        self.assertEqual(total, t.parallel_reduce(size_of, add, workers=2, size=5))
+        self.assertEqual(total + 100, t.parallel_reduce(size_of, add, 100, workers=2, size=5))
+        self.assertEqual('/Node One' + ''.join(item.path() for item in list(t.iter_preorder())[1:]),
+                         t.parallel_reduce(path_of, add, workers=3, size=2))
+        self.assertIsNone(Tree().parallel_reduce(size_of, add, workers=1))
+
+    def test_fail(self):
+        # Action, fail in a worker.
+        t = self.t
+        t.append(Leaf(name='Leaf New'))
+        expected = t.to_list()
+        with self.assertRaises(KeyError):
+            t.parallel_map(fail, 'Path', workers=2, size=5)
+
+        # Asert, that nothing is changed.
+        self.assertEqual(expected, t.to_list())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from tree import Tree, Leaf, LazyNode
+from query import Eq, In, Range, Depth, Under, Id
+from config import data
+
+
+class TestQuery(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.t = Tree(headings=['Type', 'Size', 'Path'])
+        self.t.populate(data=data, fast=True)
+        for idx, item in enumerate(self.t.iter_preorder()):
+            item.columns = [item.type, idx * 10, item.path()]
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+
+    def names(self, items):
+        return [item.name for item in items]
+
+    def test_scan(self):
+        # Asert, that predicates combine, and the walk stays within depth and scope.
+        t = self.t
+        self.assertEqual(['Leaf One', 'Leaf Two', 'Leaf Three'],
+                         self.names(t.select(Eq('Type', 'Leaf') & Range('Size', hi=60))))
+        self.assertEqual(['Node One', 'Leaf Six'], self.names(t.select(Eq(0, 'Node One') | Eq('Size', 110))))
+        self.assertEqual(['Node One', 'Node Two', 'Node Three'],
+                         self.names(t.select(~Eq('Type', 'Leaf') & Depth(hi=1))))
+        self.assertEqual(['Node Two', 'Node Three'], self.names(t.query('Node One').select(type='Node', depth=0)))
+        self.assertEqual(['Leaf One', 'Node Two'], self.names(t.select(lambda item: item.get(2) in (10, 20))))
+        self.assertEqual(['Node Five', 'Node Six'], self.names(t.select({'Type': 'Node', 2: 80})
+                                                                + t.select({'Type': 'Node', 2: 100})))
+        self.assertEqual(['Node Four', 'Leaf Four', 'Node Five'],
+                         self.names(t.select(Under('Node Four') & Depth(hi=3))))
+
+        # Asert, that the plans say how far the walk went.
+        self.assertEqual('scan, 12 visited', t.explain(Eq('Type', 'Leaf')))
+        self.assertEqual('scan, depth 1, 5 visited', t.explain(type='Leaf', depth=1))
+        self.assertEqual('scan, 2 visited', t.explain(type='Leaf', limit=1))
+        self.assertEqual('scan below /Node One/Node Three/Node Four, 6 visited',
+                         t.explain(Under('Node Four') & Eq('Type', 'Leaf')))
+
+    def test_index(self):
+        # Action, index the columns.
+        t = self.t
+        t.create_index('Type')
+        t.create_index('Size', kind='sorted')
+        t.create_index(0)
+
+        # Asert, that the smallest set of candidates is checked.
+        self.assertEqual(['Leaf Two', 'Leaf Three'],
+                         self.names(t.select(Eq('Type', 'Leaf') & Range('Size', 30, 60))))
+        self.assertEqual('sorted index on Size, 3 visited', t.explain(Eq('Type', 'Leaf') & Range('Size', 30, 60)))
+        self.assertEqual('hash index on 0, 1 visited', t.explain(Eq(0, 'Leaf Four')))
+        self.assertEqual(['Leaf Four', 'Node Five'], self.names(t.select(In(0, ('Leaf Four', 'Node Five')))))
+        self.assertEqual('ids, 2 visited', t.explain(Id(4, 5) & Eq('Type', 'Leaf')))
+        self.assertEqual('hash index on Type or sorted index on Size, 7 visited',
+                         t.explain(Eq('Type', 'Leaf') | Range('Size', 100)))
+
+        # Asert, that candidates outside the node, or too deep, are left out.
+        node = t.query('Node Three')
+        self.assertEqual(['Leaf Three', 'Leaf Four', 'Leaf Five'],
+                         self.names(node.select(Eq('Type', 'Leaf'), depth=2)))
+        self.assertEqual(['Leaf Three'], self.names(node.select(Eq('Type', 'Leaf'), limit=1)))
+
+    def test_detached(self):
+        # Action, select from a tree with a budget for its lazy nodes, and from an index holding a detached item.
+        t = Tree(headings=['Type'], budget=5)
+
+        def loader(node):
+            return [{'name': f'{node.name}-{idx}', 'columns': ['Lazy'], 'loader': loader} for idx in range(3)]
+
+        t.append(LazyNode(name='Lazy', columns=['Lazy'], loader=loader))
+        index = t.create_index('Type')
+        node = t[0]
+        len(node[0])
+        len(node[1])
+        gone = Leaf(name='Gone', columns=['Lazy'])
+        gone.parent = node
+        index.add(gone, 'Lazy')
+
+        # Asert, that only the items in the tree are found.
+        expected = [item for item, _ in t.walk(load=False)]
+        self.assertEqual(sorted(map(id, expected)), sorted(map(id, t.select({'Type': 'Lazy'}, load=False))))
+        self.assertEqual('hash index on Type, 8 visited', t.explain({'Type': 'Lazy'}))
+
+    def test_order(self):
+        # Asert, that results are sorted before the limit.
+        t = self.t
+        t.query('Leaf Six').set(2, None)
+        self.assertEqual(['Leaf Five', 'Leaf Four'], self.names(t.select(type='Leaf', order_by='-Size', limit=2)))
+        self.assertEqual(['Leaf One', 'Leaf Two'], self.names(t.select(type='Leaf', order_by='Size', limit=2)))
+        self.assertEqual('Leaf Six', t.select(type='Leaf', order_by=2)[-1].name)
+        self.assertEqual(['Leaf Five', 'Leaf Four', 'Leaf One'],
+                         self.names(t.select(type='Leaf', order_by=lambda item: item.name, limit=3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import csv
+import unittest
+from io import StringIO
+from contextlib import redirect_stdout
+from tree import Tree
+from config import data
+
+
+class TestRender(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.t = Tree(headings=['Type', 'Size', 'Path'])
+        self.t.populate(data=data, fast=True)
+        self.t.query('Leaf Two').set((1, 2), ('Leaf', 2048))
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+
+    def test_show(self):
+        # Action, show the tree and a node.
+        t = self.t
+        out = StringIO()
+        with redirect_stdout(out):
+            t.show(label='Files')
+            t.show(parent=t.query('Leaf Two'))
+        lines = out.getvalue().splitlines()
+
+        # Asert, that show prints a header and one line per item.
+        self.assertEqual('-----------------------------------------------------', lines[0])
+        self.assertEqual(' Files', lines[1])
+        self.assertEqual("   ID: Name, Columns: ['Type', 'Size', 'Path']", lines[2])
+        self.assertEqual(" 01: Node One, [None, None, None]", lines[4])
+        self.assertEqual(" 04:   Leaf Two, ['Leaf', 2048, None]", lines[7])
+        self.assertEqual(" 12:           Leaf Six, [None, None, None]", lines[15])
+        self.assertEqual(19, len(lines))
+
+    def test_tree(self):
+        # Action, write selected columns down to a depth, without the header.
+        t = self.t
+        out = StringIO()
+        t.render(out, columns=['Size', 1], depth=1, header=False, indent=1)
+
+        # Asert, that only the selected columns and levels are written.
+        lines = out.getvalue().splitlines()
+        self.assertEqual([' 01: Node One, [None, None]', ' 02:  Leaf One, [None, None]'], lines[:2])
+        self.assertEqual(' 04:  Leaf Two, [2048, \'Leaf\']', lines[3])
+        self.assertEqual(5, len(lines))
+
+    def test_csv(self):
+        # Action, write the tree as CSV and a node as TSV.
+        t = self.t
+        t.query('Leaf Three').set(3, 'a, "b"')
+        out = StringIO()
+        t.render(out, 'csv')
+        tsv = StringIO()
+        t.query('Node Three').render(tsv, 'tsv', columns=[3])
+
+        # Asert, that the rows read back.
+        rows = list(csv.reader(StringIO(out.getvalue())))
+        self.assertEqual(['ID', 'Depth', 'Name', 'Type', 'Size', 'Path'], rows[0])
+        self.assertEqual(['4', '1', 'Leaf Two', 'Leaf', '2048', ''], rows[4])
+        self.assertEqual(['6', '2', 'Leaf Three', '', '', 'a, "b"'], rows[6])
+        self.assertEqual(13, len(rows))
+        rows = list(csv.reader(StringIO(tsv.getvalue()), delimiter='\t'))
+        self.assertEqual([['ID', 'Depth', 'Name', 'Path'], ['6', '0', 'Leaf Three', 'a, "b"']], rows[:2])
+        self.assertEqual(8, len(rows))
+
+    def test_fixed(self):
+        # Action, write fixed width fields.
+        t = self.t
+        out = StringIO()
+        t.render(out, 'fixed', columns=['Type', 'Size'], widths=[3, 10, 4, 4], depth=1)
+
+        # Asert, that fields are padded and cut to their widths.
+        lines = out.getvalue().splitlines()
+        self.assertEqual('ID  Name       Type Size', lines[0])
+        self.assertEqual('1   Node One' + ' ' * 12, lines[1])
+        self.assertEqual('4     Leaf Two Leaf 2048', lines[4])
+        self.assertEqual('5     Node Thr' + ' ' * 10, lines[5])
+        self.assertRaises(ValueError, t.render, out, 'xml')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import random
+import unittest
+from tree import Tree, Leaf, Node, LazyNode
+from rows import RowIndex
+from config import data
+
+
+class TestRowIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.t = Tree(headings=['Type', 'Size', 'Path'])
+        self.t.populate(data=data, fast=True)
+        self.r = RowIndex(self.t, load=2)
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        self.r.close()
+
+    def check(self):
+        # Compare every row against a walk of the loaded items.
+        items = list(self.t.iter_preorder(load=False))
+        self.assertEqual(len(items), len(self.r))
+        for row, item in enumerate(items):
+            self.assertIs(item, self.r.item_at(row))
+            self.assertEqual(row, self.r.row_of(item))
+
+    def test_rows(self):
+        # Asert, that rows follow the display order.
+        t = self.t
+        r = self.r
+        self.assertEqual(0, r.row_of(t.query('Node One')))
+        self.assertEqual(11, r.row_of(t.query('Leaf Six')))
+        self.assertEqual('Node Three', r.item_at(4).name)
+        self.assertEqual('Leaf Six', r.item_at(-1).name)
+        self.assertRaises(IndexError, r.item_at, 12)
+        self.assertIsNone(r.row_of(Leaf(name='Leaf')))
+        self.check()
+
+    def test_changes(self):
+        # Action, insert, append, move and delete, without reindexing.
+        t = self.t
+        r = self.r
+        ids = [item.id for item in t.iter_preorder()]
+        node = t.query('Node Two').append(Node(name='Node New'))
+        node.append(Leaf(name='Leaf New'))
+        t.query('Node One').insert(0, Leaf(name='Leaf First'))
+
+        # Asert, that the new items take their rows and the others move down.
+        self.assertEqual(1, r.row_of(t.query('Leaf First')))
+        self.assertEqual(4, r.row_of(node))
+        self.assertEqual(14, r.row_of(t.query('Leaf Six')))
+        self.assertEqual(ids, [item.id for item in t.iter_preorder() if item.id in ids])
+        self.check()
+
+        # Action, move a subtree up and delete another.
+        t.query('Node Four').move(t, 0)
+        node.delete()
+
+        # Asert, that the rows close up.
+        self.assertEqual(0, r.row_of(t.query('Node Four')))
+        self.assertEqual('Node One', r.item_at(6).name)
+        self.check()
+
+    def test_random(self):
+        # Action, make random changes.
+        rnd = random.Random(11)
+        t = self.t
+        for step in range(300):
+            items = list(t.iter_preorder())
+            nodes = [t] + [item for item in items if item.is_node()]
+            action = rnd.randrange(4)
+            if action == 0 or not items:
+                cls = rnd.choice((Node, Leaf))
+                dst = rnd.choice(nodes)
+                dst.insert(rnd.randrange(len(dst) + 1), cls(name=f'Item {step}'))
+            elif action == 1:
+                item = rnd.choice(items)
+                dst = parent = rnd.choice(nodes)
+                while parent is not None and parent is not item:
+                    parent = parent.parent
+                if parent is None and not dst.named(item.name):
+                    item.move(dst, rnd.choice((None, 0)))
+            elif action == 2 and len(items) > 5:
+                rnd.choice(items).delete()
+            else:
+                item = rnd.choice(items)
+                if not t.named(item.name):
+                    item.clone(t)
+
+        # Asert, that the rows match a walk of the tree, wide nodes keeping their children in blocks.
+        self.check()
+        self.assertTrue(self.r.siblings)
+
+    def test_lazy(self):
+        # Action, read a lazy node's children, add to them, and unload them.
+        t = self.t
+
+        def loader(node):
+            return [{'name': 'a', 'columns': ['Leaf']}, {'name': 'b', 'loader': loader, 'columns': ['Node']}]
+
+        lazy = t.query('Node Two').append(LazyNode(name='Lazy', loader=loader))
+        self.assertEqual(2, len(lazy))
+        lazy.append(Leaf(name='c'))
+        self.assertEqual(2, len(lazy.find('b')))
+        lazy.insert(0, Leaf(name='d'))
+
+        # Asert, that the items read in take their rows below the node.
+        self.assertEqual(['Lazy', 'd', 'a', 'b', 'a', 'b', 'c'], [self.r.item_at(row).name for row in range(3, 10)])
+        self.check()
+
+        # Action, unload the node.
+        leaf = lazy.find('a')
+        lazy.unload()
+
+        # Asert, that its items leave the rows.
+        self.assertIsNone(self.r.row_of(leaf))
+        self.assertEqual(13, len(self.r))
+        self.check()
+
+if __name__ == '__main__':
+    unittest.main()
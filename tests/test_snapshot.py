@@ -0,0 +1,99 @@
+import os
+import unittest
+import tempfile
+from tree import Tree, Leaf, Node
+from snapshot import Snapshot
+from config import data
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'tree.snap')
+        self.t = Tree(headings=['Type', 'Size', 'Path'], label='Files')
+        self.t.populate(data=data, fast=True)
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        for name in os.listdir(self.folder):
+            os.remove(os.path.join(self.folder, name))
+        os.rmdir(self.folder)
+
+    def test_save_load(self):
+        # Action, save a tree holding values of every supported type, then load it.
+        t = self.t
+        values = ['Text', 10, -2**70, 1.5, True, False, b'\x00\xff', None]
+        for idx, item in enumerate(t.iter_preorder()):
+            item.set((1, 2, 3), (item.type, values[idx % len(values)], item.path()))
+        t.query('Leaf Two').delete()
+        t.save(self.path)
+        loaded = Tree.load(self.path)
+
+        # Asert, that the items, ids and tree settings come back as they were.
+        self.assertEqual(t.to_list(), loaded.to_list())
+        self.assertEqual([item.id for item in t.iter_preorder()], [item.id for item in loaded.iter_preorder()])
+        self.assertEqual((t.headings, t.unique, t.label), (loaded.headings, loaded.unique, loaded.label))
+        self.assertIs(True, loaded.query('Node Three').get(2))
+        self.assertEqual(-2**70, loaded.query(3).get(2))
+
+        # Asert, that the loaded tree is indexed and keeps handing out new ids.
+        leaf = loaded.query('Node Four/Leaf Four')
+        self.assertIs(leaf, loaded.query(leaf.id))
+        self.assertEqual('/Node One/Node Three/Node Four/Leaf Four', leaf.path())
+        self.assertEqual(t.items + 1, loaded.append(Leaf(name='Leaf New')).id)
+        self.assertRaises(ValueError, loaded.query('Node One').append, Node(name='Node Two'))
+
+    def test_columnar(self):
+        # Action, save a columnar tree and load it with and without a column store.
+        t = Tree(headings=['Type', 'Size'], unique=False, columnar=True, dtypes={'Size': 'q'})
+        node = t.append(Node(name='Node', columns=['Node']))
+        for idx in range(3):
+            node.append(Leaf(name='Leaf', columns=['Leaf', idx]))
+        t.save(self.path)
+        columnar = Tree.load(self.path)
+        plain = Tree.load(self.path, columnar=False)
+
+        # Asert, that the store and its types come back, and the values either way.
+        self.assertFalse(columnar.unique)
+        self.assertEqual('q', columnar.column('Size').typecode)
+        self.assertEqual(3, columnar.column('Size').sum())
+        self.assertIsNone(plain.store)
+        self.assertEqual(t.to_list(), plain.to_list())
+        self.assertEqual(3, len(plain.find('Leaf', all=True)))
+
+    def test_snapshot(self):
+        # Action, save a tree and open the file without building a tree.
+        t = self.t
+        t.query('Leaf One').set(2, 'Shared')
+        t.query('Leaf Two').set(2, 'Shared')
+        t.save(self.path)
+
+        with Snapshot(self.path) as snapshot:
+            # Asert, that the structure and names can be read in place.
+            self.assertEqual(len(list(t.iter_preorder())), len(snapshot))
+            self.assertEqual([0], snapshot.children())
+            self.assertEqual(['Leaf One', 'Node Two', 'Leaf Two', 'Node Three'], [snapshot.name(row) for row in snapshot.children(0)])
+            self.assertEqual([2, 3, 4, 5], [snapshot.ids[row] for row in snapshot.children(0)])
+            self.assertTrue(snapshot.is_node(0))
+            self.assertFalse(snapshot.is_node(len(snapshot) - 1))
+            self.assertEqual([None, 'Shared', None], snapshot.columns(3))
+
+            # Asert, that repeated values are stored once.
+            self.assertEqual(snapshot.cells[1*3+1], snapshot.cells[3*3+1])
+
+    def test_errors(self):
+        # Action, write files that are not snapshots.
+        with open(self.path, 'wb') as file:
+            file.write(b'not a tree snapshot at all')
+
+        # Asert, that they are refused, and values that cannot be saved are reported.
+        self.assertRaises(ValueError, Tree.load, self.path)
+        self.t.query('Leaf One').set(1, object())
+        self.assertRaises(TypeError, self.t.save, self.path)
+        self.assertRaises(ValueError, Tree.load, self.path)
+        self.assertEqual(['tree.snap'], os.listdir(self.folder))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import sqlite3
+import unittest
+import tempfile
+from tree import Tree, Leaf, Node, LazyNode
+from sqlitetree import SQLiteTree
+from config import data
+from copy import deepcopy
+
+
+class TestSQLiteTree(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.folder = tempfile.mkdtemp()
+        self.file = os.path.join(self.folder, 'tree.db')
+        self.t = SQLiteTree(self.file, headings=['Type', 'Size', 'Path'], label='Files')
+        self.t.populate(data=deepcopy(data))
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        self.t.close()
+        for name in os.listdir(self.folder):
+            os.remove(os.path.join(self.folder, name))
+        os.rmdir(self.folder)
+
+    def reopen(self, **kwargs):
+        self.t.close()
+        self.t = SQLiteTree(self.file, **kwargs)
+        return self.t
+
+    def test_reopen(self):
+        # Action, edit the tree, then open the file again.
+        t = self.t
+        t.query('Leaf Four').set((1, 2), ('Leaf', 4))
+        t.query('Node Two').append(Leaf(name='Leaf New', columns=['Leaf']))
+        t.query('Node One').insert(0, Node(name='Node First'))
+        t.query('Leaf Three').rename('Leaf 3')
+        t.query('Leaf One').delete()
+        t.set_cell(t.query('Node Six').id, 3, '/Six')
+        expected = t.to_list()
+        items = t.items
+        t = self.reopen(headings=['Ignored'])
+
+        # Asert, that only the top level was read, and that the tree is unchanged.
+        self.assertEqual(['Type', 'Size', 'Path'], t.headings)
+        self.assertEqual('Files', t.label)
+        self.assertIsInstance(t[0], LazyNode)
+        self.assertFalse(t[0].is_loaded())
+        self.assertEqual(expected, t.to_list())
+        self.assertEqual(items + 1, t.append(Leaf(name='Leaf Last')).id)
+        self.assertRaises(ValueError, t.query('Node One').append, Leaf(name='Node Two'))
+        self.assertRaises(TypeError, t.reindex)
+
+    def test_move(self):
+        # Action, move a node within its parent and below another node.
+        t = self.t
+        six = t.query('Node Six')
+        six.move(t.query('Node Two'))
+        t.query('Leaf Two').move(t.query('Node One'), 0)
+        expected = t.to_list()
+        t = self.reopen()
+
+        # Asert, that positions and paths were rewritten, the subtree moving with its node.
+        self.assertEqual(expected, t.to_list())
+        rows = dict(sqlite3.connect(self.file).execute('SELECT name, path FROM items').fetchall())
+        self.assertEqual(f'/1/3/{six.id}/{six[0].id}/', rows['Leaf Six'])
+        self.assertEqual('/Node One/Node Two/Node Six/Leaf Six', t.query(six[0].id).path())
+
+    def test_budget(self):
+        # Action, add three nodes of three leaves, then open the file keeping at most
+        # three loaded items, and read every item.
+        for idx in range(3):
+            node = self.t.append(Node(name=f'Node {idx}'))
+            for leaf in range(3):
+                node.append(Leaf(name=f'Leaf {leaf}'))
+        t = self.reopen(budget=3)
+        names = [item.name for item in t.iter_preorder()]
+
+        # Asert, that nodes were unloaded on the way, and items are still found by id and path.
+        self.assertEqual(24, len(names))
+        self.assertLess(len(t._ids), 24)
+        self.assertFalse(t.query('Node 0').is_loaded())
+        leaf = t.query(12)
+        self.assertEqual('Leaf Six', leaf.name)
+        self.assertIs(leaf, t.query(12))
+        self.assertEqual('Leaf Three', t.find('Node Three/Leaf Three').name)
+        self.assertEqual('/Node One/Node Three/Node Four/Node Five/Node Six/Leaf Six', t.query(12).path())
+        self.assertIsNone(t.query(100))
+
+    def test_added_budget(self):
+        # Action, build a tree of 20 nodes of 19 leaves in a session that holds at most 50 of their items.
+        t = self.reopen(budget=50)
+        index = t.create_index('Type')
+        for idx in range(20):
+            node = t.append(Node(name=f'Node {idx}', columns=['Node']))
+            for leaf in range(19):
+                node.append(Leaf(name=f'Leaf {leaf}', columns=['Leaf', idx]))
+        first = t.query('Node 0')
+
+        # Asert, that nodes added were unloaded, and are read back from the file.
+        self.assertLess(len(t._ids), 100)
+        self.assertFalse(first.is_loaded())
+        loaded = [item for item, _ in t.walk(load=False) if item.get(1) == 'Leaf']
+        self.assertEqual(sorted(map(id, loaded)), sorted(map(id, t.lookup('Type', 'Leaf'))))
+        leaf = first.query('Leaf 3')
+        self.assertEqual(('Leaf', 0), leaf.get((1, 2)))
+        self.assertIs(leaf, t.query(leaf.id))
+        leaf.set(2, 'Changed')
+        names = [item.name for item in t.iter_preorder()]
+        self.assertEqual(412, len(names))
+        self.assertLess(len(t._ids), 100)
+
+        # Action, open the file again.
+        t = self.reopen()
+
+        # Asert, that every item and change was written.
+        self.assertEqual(names, [item.name for item in t.iter_preorder()])
+        self.assertEqual('Changed', t.query('Node 0/Leaf 3').get(2))
+
+    def test_batch(self):
+        # Action, write fewer changes than a batch, and read the file from another connection.
+        t = self.reopen(batch=100)
+        t.query('Leaf Two').set(2, 'Pending')
+        db = sqlite3.connect(self.file)
+        before = db.execute("SELECT columns FROM items WHERE name = 'Leaf Two'").fetchone()[0]
+        t.flush()
+        after = db.execute("SELECT columns FROM items WHERE name = 'Leaf Two'").fetchone()[0]
+        db.close()
+
+        # Asert, that changes are committed in batches.
+        self.assertNotIn('Pending', before)
+        self.assertIn('Pending', after)
+
+    def test_move_tree(self):
+        # Action, move a node from a SQLite tree into a tree in memory and back.
+        t = self.t
+        other = Tree(headings=t.headings)
+        node = t.query('Node Four')
+        node.move(other)
+        self.assertEqual(5, len(list(node.iter_preorder())))
+        t.query('Node Two').clone(other)
+        other[0].move(t.query('Node Two'))
+        expected = t.to_list()
+        t = self.reopen()
+
+        # Asert, that the file follows the items out and back in.
+        self.assertEqual(expected, t.to_list())
+        self.assertEqual(['Leaf Four', 'Node Five'], [item.name for item in t.query('Node Two/Node Four')])
+
+    def test_move_reopened(self):
+        # Action, move a node with ids taken by rows not read yet into a file opened again.
+        t = self.reopen()
+        other = Tree(headings=t.headings)
+        node = other.append(Node(name='Node Other'))
+        node.append(Leaf(name='Leaf Other'))
+        node.move(t)
+        expected = t.to_list()
+        ids = [item.id for item in t.iter_preorder()]
+        t = self.reopen()
+
+        # Asert, that the moved items are numbered above the rows, and the file matches.
+        self.assertEqual([13, 14], [node.id, node[0].id])
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(expected, t.to_list())
+
+
+if __name__ == '__main__':
+    unittest.main()
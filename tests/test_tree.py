@@ -1,6 +1,8 @@
 import unittest
+from io import StringIO
 from json import dumps
-from tree import Tree, Leaf, Node
+from contextlib import redirect_stdout
+from tree import Tree, Leaf, Node, LazyNode, TreePath, LazyChildren, compile_path
 from config import data
 from copy import deepcopy
 
@@ -92,6 +94,105 @@ class TestTree(unittest.TestCase):
         self.assertEqual('Node Four', t.find_by_id(_id).get(0))
         self.assertEqual('Node Four', t.find('Node Four').get(0))
 
+    def test_find_by_id(self):
+        # Action, get tree.
+        t = self.t
+
+        # Action, get a leaf and a node and their ids.
+        leaf = t.query('Leaf Four')
+        node = t.query('Node Three')
+
+        # Asert, that ids resolve to the same items, from the root and from a subtree.
+        self.assertIs(leaf, t.find_by_id(leaf.id))
+        self.assertIs(leaf, node.find_by_id(leaf.id))
+
+        # Asert, that an item outside of the subtree is not found.
+        self.assertIsNone(node.find_by_id(t.query('Leaf One').id))
+
+        # Action, delete the node holding the leaf.
+        _id = leaf.id
+        node.delete()
+
+        # Asert, that the deleted items are no longer indexed.
+        self.assertIsNone(t.find_by_id(_id))
+        self.assertIsNone(t.get_cell(_id, 1))
+
+        # Action, renumber the tree.
+        t.reindex()
+
+        # Asert, that every item is found by its new id.
+        for _id in range(1, t.items+1):
+            self.assertEqual(_id, t.find_by_id(_id).id)
+
+    def test_append_ids(self):
+        # Action, append a subtree deleted from another tree, its ids taken here.
+        t = self.t
+        other = Tree(headings=t.headings)
+        other.populate(data=deepcopy(data))
+        node = other.query('Node Three')
+        node.delete()
+        t.append(node)
+        t.insert(0, Node(name='Node First'))
+
+        # Asert, that every item keeps its own id.
+        items = list(t.iter_preorder())
+        self.assertEqual(len(items), len({item.id for item in items}))
+        for item in items:
+            self.assertIs(item, t.find_by_id(item.id))
+
+    def test_tree(self):
+        # Action, get tree.
+        t = self.t
+
+        # Action, build a deep chain of nodes.
+        node = t.query('Node Six')
+        for level in range(100):
+            node = node.append(Node(name=f'Level {level}'))
+        leaf = node.append(Leaf(name='Deep Leaf'))
+
+        # Asert, that items at any depth point to the root.
+        self.assertIs(t, leaf.tree)
+        self.assertIs(t, t.tree)
+
+        # Action, delete a node part way up the chain.
+        t.query('Level 50').delete()
+
+        # Asert, that the removed items no longer point to the tree.
+        self.assertIsNone(node.tree)
+        self.assertIsNone(leaf.tree)
+        self.assertIs(t, t.query('Level 49').tree)
+
+    def test_find_all(self):
+        # Action, create a tree that allows duplicate names.
+        t = Tree(unique=False)
+        Leaf(name='Test 3', parent=t)
+        node = Node(name='Test 1', parent=t)
+        first = Leaf(name='Test 3', parent=node)
+        sub_node = Node(name='Test 2', parent=node)
+        second = Leaf(name='Test 3', parent=sub_node)
+        third = Leaf(name='Test 30', parent=sub_node)
+
+        # Asert, that names are matched whole, at the root or anywhere.
+        self.assertEqual([t[0]], t.find_all('Test 3'))
+        self.assertEqual([t[0], first, second], t.find_all('Test 3', recursive=True))
+        self.assertEqual([first], t.find_all('Test 1/Test 3', recursive=True))
+        self.assertEqual([second], t.find_all('/Test 1/Test 2/Test 3'))
+
+        # Asert, that glob segments match names and '**' matches any number of levels.
+        self.assertEqual([first, sub_node], t.find_all('Test 1/*'))
+        self.assertEqual([second, third], t.find_all('Test 1/*/Test 3*'))
+        self.assertEqual([t[0], first, second, third], t.find_all('**/Test 3*'))
+        self.assertEqual([first, sub_node, second], t.find_all('/Test 1/**/Test ?'))
+        self.assertEqual([third], node.find_all('Test [0-9][0-9]', recursive=True))
+
+        # Action, ask for a lazy search and take only the first match.
+        items = t.find_all('**/Test 3*', lazy=True)
+
+        # Asert, that matches are produced in tree order, one at a time.
+        self.assertEqual(t[0], next(items))
+        self.assertEqual(first, next(items))
+        self.assertEqual([second, third], list(t.iter_find('Test 2/*', recursive=True)))
+
     def test_path(self):
         # Action, get tree
         t = self.t
@@ -101,6 +202,52 @@ class TestTree(unittest.TestCase):
         # Asert, test that both paths are equal.
         self.assertEqual('/Node One/Node Three/Node Four/Leaf Four', item_by_name.path())
 
+    def test_find_path(self):
+        # Action, get tree.
+        t = self.t
+        leaf = t.query('Leaf Four')
+        node = t.query('Node Three')
+
+        # Asert, that absolute and relative paths resolve to the same item.
+        self.assertIs(leaf, t.find('/Node One/Node Three/Node Four/Leaf Four'))
+        self.assertIs(leaf, node.find('Node Four/Leaf Four'))
+        self.assertIs(leaf, node.find('/Node One/Node Three/Node Four/Leaf Four'))
+        self.assertIs(node, leaf.parent.find('../.'))
+        self.assertIs(leaf, node.find('./Node Four/../Node Four/Leaf Four'))
+
+        # Asert, that a relative path may start below the node.
+        self.assertIs(leaf, t.find('Node Four/Leaf Four'))
+
+        # Action, add an item whose name is part of another item's name.
+        t.query('Node Two').append(Leaf(name='Leaf'))
+
+        # Asert, that names are matched whole, not as substrings.
+        self.assertIsNone(t.find('/Node One/Node Three/Leaf'))
+        self.assertIsNone(t.find('/Node/Node Three'))
+        self.assertIsNone(t.find('/Node One/Node Four'))
+        self.assertEqual('/Node One/Node Two/Leaf', t.find('/Node One/Node Two/Leaf').path())
+
+        # Action, compile a path once and reuse it.
+        path = compile_path('Node Four/Leaf Four')
+
+        # Asert, that the compiled path resolves from any node and is cached.
+        self.assertIsInstance(path, TreePath)
+        self.assertIs(path, compile_path('Node Four/Leaf Four'))
+        self.assertIs(leaf, node.query(path))
+        self.assertIs(leaf, path.resolve(node))
+        self.assertIsNone(path.resolve(t))
+
+    def test_find_path_duplicates(self):
+        # Action, create a tree that allows duplicate names.
+        t = Tree(unique=False)
+        Node(name='Test 1', parent=t)
+        node = Node(name='Test 1', parent=t)
+        leaf = Leaf(name='Test 3', parent=Node(name='Test 2', parent=node))
+
+        # Asert, that the resolver backtracks past the first 'Test 1'.
+        self.assertIs(leaf, t.find('/Test 1/Test 2/Test 3'))
+        self.assertEqual([leaf], list(compile_path('/Test 1/Test 2/Test 3').resolve_all(t)))
+
     def test_query(self):
         # Action, get tree.
         t = self.t
@@ -142,6 +289,277 @@ class TestTree(unittest.TestCase):
 
         # Action, get node.
 
+    def test_move(self):
+        # Action, get tree and the items to move.
+        t = self.t
+        node = t.query('Node Four')
+        leaf = t.query('Leaf Five')
+        ids = [(item, item.id) for item in node.iter_preorder()]
+        dst = t.query('Node Two')
+
+        # Action, move a node and a leaf within the tree.
+        self.assertIs(node, node.move(dst))
+        self.assertIs(leaf, leaf.move(t, 0))
+
+        # Asert, that the items kept their identity and ids, and are found at their new paths.
+        self.assertIs(node, t.find('/Node One/Node Two/Node Four'))
+        self.assertIs(leaf, t[0])
+        self.assertIs(t, leaf.parent)
+        self.assertIsNone(t.find('/Node One/Node Three/Node Four'))
+        self.assertNotIn(leaf, t.query('Node Five'))
+        for item, _id in ids:
+            self.assertEqual(_id, item.id)
+            self.assertIs(item, t.query(_id))
+
+        # Asert, that an item cannot be moved below itself or onto a taken name.
+        self.assertRaises(ValueError, node.move, t.query('Node Six'))
+        self.assertRaises(ValueError, t.query('Node One').move, node)
+        self.assertRaises(ValueError, Leaf(name='Leaf Five', parent=Node(name='Tmp', parent=t)).move, t)
+
+    def test_move_tree(self):
+        # Action, get tree and a second tree with columns of its own.
+        t = self.t
+        other = Tree(headings=['Type', 'Size'], columnar=t.store is not None)
+        for idx in range(6):
+            other.append(Leaf(name=f'Leaf {idx}', columns=['Leaf', idx]))
+        node = t.query('Node Three')
+        node.set(1, 'Node')
+        items = [node, *node.iter_preorder()]
+        ids = [item.id for item in items]
+
+        # Action, move a subtree to the other tree.
+        node.move(other)
+
+        # Asert, that only the ids taken in the other tree were renumbered, above the kept ones.
+        self.assertEqual([5, 6], ids[:2])
+        self.assertEqual(ids[2:], [item.id for item in items[2:]])
+        self.assertEqual([max(ids)+1, max(ids)+2], [item.id for item in items[:2]])
+
+        # Asert, that the items now belong to the other tree and keep their columns.
+        for item in items:
+            self.assertIs(other, item.tree)
+            self.assertIs(item, other.query(item.id))
+        self.assertEqual('Node', other.find('Node Three').get(1))
+        self.assertEqual('Leaf 5', other.query(6).name)
+        self.assertIsNone(t.find('Node Three'))
+        self.assertIsNone(t.find_by_id(ids[-1]))
+
+        # Asert, that new ids do not collide with the ids that were kept.
+        self.assertEqual(max(ids)+3, other.append(Leaf(name='New')).id)
+
+    def test_clone(self):
+        # Action, clone a subtree into another tree.
+        t = self.t
+        src = t.query('Node Three')
+        src.set(1, 'Node')
+        other = Tree(headings=t.headings)
+        node = src.clone(other)
+
+        # Asert, that only the top item was copied up front.
+        self.assertIsNot(src, node)
+        self.assertIsInstance(node._children, LazyChildren)
+        self.assertEqual(1, other.items)
+        self.assertEqual('Node', node.get(1))
+
+        # Action, change the source after the clone was made.
+        src.query('Leaf Four').set(1, 'Source')
+        src.query('Node Five').append(Leaf(name='Leaf Added'))
+        src.query('Leaf Three').delete()
+
+        # Asert, that the clone still holds the items as they were when cloned.
+        self.assertIsNotNone(node.find('Leaf Three'))
+        self.assertIsNone(node.find('Leaf Added'))
+        self.assertIsNone(node.find('Leaf Four').get(1))
+        self.assertEqual('Source', src.find('Leaf Four').get(1))
+
+        # Action, change the clone.
+        node.find('Leaf Five').set(1, 'Clone')
+        node.find('Node Six').append(Leaf(name='Leaf Clone'))
+
+        # Asert, that the source does not see the changes, and the clone items are indexed.
+        self.assertIsNone(src.find('Leaf Five').get(1))
+        self.assertIsNone(src.find('Leaf Clone'))
+        leaf = node.find('Leaf Clone')
+        self.assertIs(leaf, other.query(leaf.id))
+        self.assertEqual('/Node Three/Node Four/Node Five/Node Six/Leaf Clone', leaf.path())
+
+    def test_clone_shared(self):
+        # Action, clone a node twice within the same tree.
+        t = self.t
+        src = t.query('Node Four')
+        first = src.clone(t.query('Node Two'))
+        second = src.clone(t)
+
+        # Asert, that unread levels stay pending and the copies share column lists with the source.
+        self.assertIsInstance(second._children, LazyChildren)
+        leaf = first.find('Leaf Four')
+        if t.store is None:
+            self.assertIs(leaf.columns, src.find('Leaf Four').columns)
+
+        # Action, write to the source leaf.
+        src.find('Leaf Four').set(2, 'Source')
+
+        # Asert, that neither clone sees the write.
+        self.assertIsNone(leaf.get(2))
+        self.assertIsNone(second.find('Leaf Four').get(2))
+
+        # Action, delete a clone before it was read.
+        third = src.clone(t.query('Node Six'))
+        third.delete()
+
+        # Asert, that the deleted clone no longer follows the source.
+        self.assertFalse(any(id(src) == key for key in t._pending))
+        self.assertRaises(ValueError, src.clone, t)
+        self.assertEqual('Leaf One', t.query('Leaf One').clone(t.query('Node Two')).name)
+
+    def test_clone_into_itself(self):
+        # Action, clone a node into itself and into one of its descendants.
+        t = self.t
+        src = t.query('Node Four')
+        inner = src.clone(src.find('Node Six'))
+        outer = src.clone(src)
+
+        # Asert, that each clone holds the subtree as it was when cloned.
+        self.assertEqual(['Leaf Four', 'Node Five', 'Leaf Five', 'Node Six', 'Leaf Six'],
+                         [item.name for item in inner.iter_preorder()])
+        self.assertEqual(11, len(list(outer.iter_preorder())))
+        self.assertEqual(30, len(list(t.iter_preorder())))
+        self.assertEqual(t.items, len(t._ids))
+
+    def test_clone_source_leaves(self):
+        # Action, clone two nodes, move one source to another tree and delete the other, then write to both.
+        t = self.t
+        other = Tree(headings=t.headings)
+        moved = t.query('Node Five')
+        deleted = t.query('Node Three')
+        expected = moved.to_list(), deleted.to_list()
+        first = moved.clone(t)
+        second = deleted.clone(other)
+        moved.move(other)
+        moved.find('Node Six/Leaf Six').set(1, 'Moved')
+        moved.append(Leaf(name='Leaf Moved'))
+        deleted.delete()
+        deleted.find('Node Four/Leaf Four').set(1, 'Deleted')
+
+        # Asert, that the clones hold the sources as they were, and nothing is left pending.
+        self.assertEqual(expected, (first.to_list(), second.to_list()))
+        self.assertEqual({}, t._pending)
+        self.assertEqual({}, other._pending)
+
+    def test_lazy_node(self):
+        # Action, add a lazy node whose loader lists three folders and a file per level.
+        t = self.t
+        calls = []
+
+        def loader(node):
+            calls.append(node.name)
+            return [{'name': f'{node.name}-{idx}', 'loader': loader, 'columns': ['Folder']} for idx in range(3)] + \
+                [{'name': f'{node.name}-File', 'columns': ['File']}]
+
+        node = t.query('Node Two').append(LazyNode(name='Lazy', loader=loader))
+        items = t.items
+
+        # Asert, that nothing is loaded until the children are used.
+        self.assertFalse(node.is_loaded())
+        self.assertEqual([], calls)
+        self.assertIsNone(t.find('Lazy-File', load=False))
+        self.assertEqual([], t.find_all('Lazy/*', load=False))
+        self.assertEqual([], t.query('Node One').to_list(load=False)[1]['children'][0]['children'])
+        self.assertEqual([], calls)
+
+        # Action, use the children in the ways that load them.
+        self.assertEqual(4, len(node))
+        self.assertEqual(['Lazy'], calls)
+        self.assertEqual('Lazy-0', node[0].name)
+        self.assertEqual('File', t.find('Lazy/Lazy-File').get(1))
+        self.assertEqual('/Node One/Node Two/Lazy/Lazy-1/Lazy-1-File', t.find('Lazy-1/Lazy-1-File').path())
+        stream = StringIO()
+        with redirect_stdout(stream):
+            t.show(load=False)
+
+        # Asert, that each node is loaded once, and its items are indexed.
+        self.assertEqual(['Lazy', 'Lazy-1'], calls)
+        self.assertTrue(node.is_loaded())
+        self.assertFalse(node[0].is_loaded())
+        self.assertEqual(items + 8, t.items)
+        self.assertIs(node[3], t.query(node[3].id))
+        self.assertIn('Lazy-1-File', stream.getvalue())
+        self.assertNotIn('Lazy-0-File', stream.getvalue())
+
+        # Action, edit and delete the lazy nodes.
+        node[2].append(Leaf(name='Leaf New'))
+        node[0].delete()
+
+        # Asert, that an append loads the node first.
+        self.assertEqual(['Lazy', 'Lazy-1', 'Lazy-2'], calls)
+        self.assertEqual(['Lazy-2-0', 'Lazy-2-1', 'Lazy-2-2', 'Lazy-2-File', 'Leaf New'], [item.name for item in node[1]])
+
+    def test_lazy_budget(self):
+        # Action, load lazy nodes in a tree that holds at most five of their items.
+        t = Tree(headings=['Type'], budget=5)
+
+        def loader(node):
+            return [{'name': f'{node.name}-{idx}', 'loader': loader} for idx in range(3)]
+
+        t.populate([{'name': 'Lazy', 'loader': loader}], fast=True)
+        node = t[0]
+        first = node[0]
+        len(first)
+        len(node[1])
+        ids = len(t._ids)
+
+        # Asert, that the least recently used node was unloaded, and its items forgotten.
+        self.assertFalse(first.is_loaded())
+        self.assertTrue(node[1].is_loaded())
+        self.assertTrue(node.is_loaded())
+        self.assertEqual(7, ids)
+
+        # Action, use the unloaded node again.
+        leaf = first[2]
+
+        # Asert, that it is loaded again, the oldest node unloaded, and items get new ids.
+        self.assertFalse(node[1].is_loaded())
+        self.assertEqual('Lazy-0-2', leaf.name)
+        self.assertIs(leaf, t.query(leaf.id))
+        self.assertEqual(7, len(t._ids))
+
+    def test_observe(self):
+        # Action, record the changes the tree reports.
+        t = self.t
+        events = []
+
+        class Recorder:
+            def __getattr__(self, event):
+                return lambda item, *args: events.append((event, item.name) + args[-2:])
+
+        recorder = Recorder()
+        t.observe(recorder)
+        node = t.query('Node Two')
+        leaf = node.append(Leaf(name='Leaf New'))
+        leaf.set((1, 2), ('Leaf', 10))
+        leaf.rename('Leaf Renamed')
+        leaf.move(t.query('Node Three'), 0)
+        leaf.columns = ['Leaf', 20, None]
+        leaf.delete()
+        t.query('Node Six').clone(node)
+        t.populate([{'name': 'Leaf Bulk'}], fast=True)
+        t.unobserve(recorder)
+        t.append(Leaf(name='Leaf Unobserved'))
+
+        # Asert, that each change was reported once, after it was made.
+        three = t.query('Node Three')
+        self.assertEqual([
+            ('added', 'Leaf New'),
+            ('changed', 'Leaf New', None, 'Leaf'),
+            ('changed', 'Leaf New', None, 10),
+            ('renamed', 'Leaf Renamed', 'Leaf New'),
+            ('moved', 'Leaf Renamed', node, 0),
+            ('changed', 'Leaf Renamed', 10, 20),
+            ('removed', 'Leaf Renamed', three, 0),
+            ('added', 'Node Six'),
+            ('added', 'Leaf Bulk'),
+        ], events)
+
     def test_append(self):
         # Action, get tree.
         t = self.t
@@ -202,6 +620,49 @@ class TestTree(unittest.TestCase):
         self.assertEqual(leaf2, subtree[2])
         self.assertEqual(leaf3, subtree[len(subtree)-1])
 
+    def test_unique_names(self):
+        # Action, get tree.
+        t = self.t
+        node = t.query('Node Three')
+
+        # Asert, that duplicate names are rejected by append, insert and rename.
+        self.assertRaises(ValueError, node.append, Leaf(name='Leaf Three'))
+        self.assertRaises(ValueError, node.insert, 0, Leaf(name='Leaf Three'))
+        self.assertRaises(ValueError, node[1].set, 0, 'Leaf Three')
+
+        # Action, rename an item, then reuse its old name.
+        node[0].set(0, 'Leaf Renamed')
+        node.append(Leaf(name='Leaf Three'))
+
+        # Asert, that lookups by name follow the rename.
+        self.assertIs(node[0], t.find('Node Three/Leaf Renamed'))
+        self.assertIs(node[-1], t.find('Node Three/Leaf Three'))
+
+        # Action, delete an item and reuse its name.
+        node[-1].delete()
+        node.insert(0, Leaf(name='Leaf Three'))
+
+        # Asert, that the name resolves to the inserted item.
+        self.assertIs(node[0], node.find('Leaf Three'))
+
+    def test_duplicate_names(self):
+        # Action, create a tree that allows duplicate names.
+        t = Tree(unique=False)
+        first = t.append(Leaf(name='Test'))
+        last = t.append(Leaf(name='Test'))
+
+        # Asert, that the first item in the node wins.
+        self.assertIs(first, t.find('Test'))
+
+        # Action, insert a duplicate ahead of the others.
+        head = t.insert(0, Leaf(name='Test'))
+
+        # Asert, that lookups follow the order of the node.
+        self.assertIs(head, t.find('Test'))
+        head.delete()
+        first.delete()
+        self.assertIs(last, t.find('Test'))
+
     def test_is_node(self):
         # Action, get tree.
         t = self.t
@@ -218,6 +679,36 @@ class TestTree(unittest.TestCase):
         # Asert, test that the types are equal.
         self.assertEqual(Leaf, type(leaf))
 
+    def test_slots(self):
+        # Action, get tree.
+        t = self.t
+        node = t.query('Node Two')
+        leaf = t.query('Leaf One')
+
+        # Asert, that items carry no instance dictionary and share their type.
+        self.assertFalse(hasattr(leaf, '__dict__'))
+        self.assertFalse(hasattr(node, '__dict__'))
+        self.assertEqual('Leaf', leaf.type)
+        self.assertEqual('Node', node.type)
+        self.assertEqual('Tree', t.type)
+
+        # Asert, that an empty node has no child storage yet, but behaves like an empty node.
+        self.assertIsNone(node._children)
+        self.assertEqual(0, len(node))
+        self.assertEqual([], list(node))
+        self.assertRaises(IndexError, node.__getitem__, 0)
+
+        # Action, add a child and remove it with del.
+        child = node.append(Leaf(name='Child'))
+        self.assertEqual(0, node.index(child))
+        self.assertIn(child, node)
+        del node[0]
+
+        # Asert, that the child is gone from the node and its indexes.
+        self.assertNotIn(child, node)
+        self.assertIsNone(t.find('Node Two/Child'))
+        self.assertIsNone(t.find_by_id(child.id))
+
     def test_populate(self):
         # Action, get config and convert to json string.
         config_data = dumps(self.cfg, sort_keys=True)
@@ -232,6 +723,100 @@ class TestTree(unittest.TestCase):
         # Asert, that the tree contains the populate data.
         self.assertEqual(tree_data, config_data)
 
+    def test_iterators(self):
+        # Action, get tree.
+        t = self.t
+        node = t.query('Node Four')
+
+        # Asert, that each traversal visits the subtree in its own order.
+        self.assertEqual(
+            ['Leaf Four', 'Node Five', 'Leaf Five', 'Node Six', 'Leaf Six'],
+            [item.name for item in node.iter_preorder()])
+        self.assertEqual(
+            ['Leaf Four', 'Leaf Five', 'Leaf Six', 'Node Six', 'Node Five'],
+            [item.name for item in node.iter_postorder()])
+        self.assertEqual(
+            ['Leaf Four', 'Node Five', 'Leaf Five', 'Node Six', 'Leaf Six'],
+            [item.name for item in node.iter_bfs()])
+        self.assertEqual(
+            ['Node Three', 'Leaf Three', 'Node Four', 'Leaf Four', 'Node Five'],
+            [item.name for item in t[0].iter_bfs()][3:8])
+        self.assertEqual(
+            [(0, 'Leaf Four'), (0, 'Node Five'), (1, 'Leaf Five'), (1, 'Node Six'), (2, 'Leaf Six')],
+            [(level, item.name) for item, level in node.walk()])
+
+        # Asert, that an empty node yields nothing.
+        self.assertEqual([], list(t.query('Node Two').iter_preorder()))
+        self.assertEqual([], list(t.query('Node Two').iter_postorder()))
+
+    def test_deep_tree(self):
+        # Action, build a chain of nodes deeper than the recursion limit.
+        t = Tree(headings=['Column1'])
+        node = t
+        for level in range(5000):
+            node = node.append(Node(name=f'Level {level}'))
+        leaf = node.append(Leaf(name='Deep Leaf'))
+
+        # Asert, that traversals, searches and serialization reach the bottom.
+        self.assertIs(leaf, list(t.iter_preorder())[-1])
+        self.assertIs(leaf, next(t.iter_postorder()))
+        self.assertIs(leaf, t.find('Deep Leaf'))
+        self.assertEqual([leaf], t.find_all('Deep Leaf', recursive=True))
+
+        data = t.to_list()
+        copy = Tree(headings=['Column1'])
+        copy.populate(data)
+        copy.reindex()
+        self.assertEqual(5001, copy.items)
+        self.assertEqual('Deep Leaf', copy.query(5001).name)
+
+        out = StringIO()
+        with redirect_stdout(out):
+            t.show()
+        self.assertIn('Deep Leaf', out.getvalue().splitlines()[-1])
+
+    def test_bulk_load(self):
+        # Action, load the same data with both populate paths.
+        t = self.t
+        fast = Tree(headings=t.headings, columnar=t.store is not None)
+        items = fast.populate(self.cfg, fast=True)
+
+        # Asert, that both trees hold the same items, ids and columns.
+        self.assertEqual(dumps(t.to_list(), sort_keys=True), dumps(fast.to_list(), sort_keys=True))
+        self.assertEqual(
+            [(item.id, item.path()) for item in t.iter_preorder()],
+            [(item.id, item.path()) for item in fast.iter_preorder()])
+        self.assertEqual([item.path() for item in Tree().populate(self.cfg)], [item.path() for item in items])
+        self.assertIs(fast.query('Leaf Six'), fast.query(fast.query('Leaf Six').id))
+        self.assertIs(fast, fast.query('Leaf Six').tree)
+        self.assertEqual(3, len(fast.query('Node Two').columns))
+
+        # Action, load into a subtree, then load data with a duplicate name.
+        node = fast.query('Node Two')
+        fast.bulk_load([{'name': 'Leaf A'}, {'name': 'Node A', 'children': [{'name': 'Leaf B'}]}], parent=node)
+        size = fast.items
+
+        # Asert, that the duplicate is rejected and nothing is attached.
+        self.assertRaises(ValueError, node.populate, [{'name': 'Leaf C'}, {'name': 'Leaf A'}], fast=True)
+        self.assertRaises(ValueError, fast.bulk_load, [{'name': 'X', 'children': [{'name': 'Y'}, {'name': 'Y'}]}])
+        self.assertEqual(['Leaf A', 'Node A'], [item.name for item in node])
+        self.assertEqual(size, fast.items)
+        self.assertIs(node[1][0], fast.find('Node Two/Node A/Leaf B'))
+
+        # Asert, that duplicates are indexed when names may repeat.
+        t = Tree(unique=False)
+        t.populate([{'name': 'Test'}, {'name': 'Test'}], fast=True)
+        t.populate([{'name': 'Test'}], fast=True)
+        self.assertEqual(3, len(t.named('Test')))
+
+    def test_column_index(self):
+        # Asert, that columns are found by number or heading, column 0 being the name.
+        t = self.t
+        self.assertEqual(0, t.column_index(0))
+        self.assertEqual(2, t.column_index(2))
+        self.assertEqual(3, t.column_index('Column3'))
+        self.assertRaises(ValueError, t.column_index, 'Missing')
+
     def test_get_cell(self):
         # Action, get tree.
         t = self.t
@@ -306,3 +891,11 @@ class TestTree(unittest.TestCase):
     #
     #     # Asert, names match from query.
     #     self.assertEqual(name, t.query_by_name(name).name)
+
+
+class TestColumnarTree(TestTree):
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.cfg = data
+        self.t = Tree(headings=['Column1', 'Column2', 'Column3'], columnar=True)
+        self.t.populate(data=self.cfg)
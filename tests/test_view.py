@@ -0,0 +1,164 @@
+import random
+import unittest
+from tree import Tree, Leaf, Node, LazyNode
+from view import View
+from config import data
+
+
+class TestView(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.t = Tree(headings=['Type', 'Size', 'Path'])
+        self.t.populate(data=data, fast=True)
+        self.v = self.t.view()
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        self.v.close()
+
+    def shown(self):
+        # The visible rows, from a walk of the tree.
+        rows = []
+        stack = [(item, 0) for item in reversed(list(self.t))]
+        while stack:
+            item, depth = stack.pop()
+            rows.append((item, depth, item.columns))
+            if self.v.is_expanded(item):
+                stack.extend((child, depth+1) for child in reversed(list(item)))
+        return rows
+
+    def check(self):
+        rows = self.shown()
+        self.assertEqual(len(rows), len(self.v))
+        self.assertEqual(rows, self.v.rows(0, len(rows) + 5))
+        for start in range(len(rows)):
+            self.assertEqual(rows[start:start+3], self.v.rows(start, 3))
+
+    def test_rows(self):
+        # Asert, that only the top level shows at first.
+        t = self.t
+        v = self.v
+        self.assertEqual(1, len(v))
+        self.assertEqual([(t[0], 0, t[0].columns)], v.rows(0, 60))
+        self.assertEqual([], v.rows(1, 60))
+
+        # Action, expand down to Node Five, then collapse Node Three.
+        for name in ('Node One', 'Node Three', 'Node Four', 'Node Five'):
+            v.expand(t.query(name))
+
+        # Asert, that the window holds the expanded rows.
+        self.assertEqual(11, len(v))
+        self.assertEqual(['Leaf Four', 'Node Five', 'Leaf Five'], [item.name for item, _, _ in v.rows(7, 3)])
+        self.assertEqual([3, 3, 4], [depth for _, depth, _ in v.rows(7, 3)])
+        self.check()
+        v.collapse(t.query('Node Three'))
+        self.assertEqual(5, len(v))
+        self.assertTrue(v.is_expanded(t.query('Node Four')))
+        self.check()
+
+        # Action, expand Node Three again.
+        v.toggle(t.query('Node Three'))
+
+        # Asert, that the nodes below it kept their state.
+        self.assertEqual(11, len(v))
+        self.check()
+
+    def test_changes(self):
+        # Action, expand every node and edit the tree.
+        t = self.t
+        v = self.v
+        for item in t.iter_preorder():
+            v.expand(item)
+        t.query('Node Two').append(Leaf(name='Leaf New'))
+        t.insert(0, Node(name='Node First'))
+        t.query('Node Four').move(t.query('Node First'))
+        self.check()
+        v.collapse(t.query('Node First'))
+        t.query('Node Four/Node Five').delete()
+        t.query('Leaf One').move(t.query('Node First'), 0)
+
+        # Asert, that only changes below expanded nodes change the rows.
+        self.assertEqual(['Node First', 'Node One', 'Node Two', 'Leaf New', 'Leaf Two', 'Node Three', 'Leaf Three'],
+                         [item.name for item, _, _ in v.rows(0, 60)])
+        self.check()
+
+    def test_random(self):
+        # Action, make random changes and expand and collapse nodes.
+        self.edit(random.Random(5), 300)
+
+        # Asert, that the rows match a walk of the tree.
+        self.check()
+
+    def test_blocks(self):
+        # Action, hold the children of expanded nodes in blocks of two, and make random changes.
+        self.v.close()
+        self.v = View(self.t, load=2)
+        for seed in range(5):
+            self.edit(random.Random(seed), 200, seed * 200)
+
+            # Asert, that the rows match a walk of the tree.
+            self.check()
+
+    def edit(self, rnd, steps, start=0):
+        t = self.t
+        v = self.v
+        for step in range(steps):
+            items = list(t.iter_preorder())
+            nodes = [t] + [item for item in items if item.is_node()]
+            action = rnd.randrange(5)
+            if action == 0:
+                cls = rnd.choice((Node, Leaf))
+                dst = rnd.choice(nodes)
+                dst.insert(rnd.randrange(len(dst) + 1), cls(name=f'Item {start + step}'))
+            elif action == 1 and items:
+                item = rnd.choice(items)
+                dst = parent = rnd.choice(nodes)
+                while parent is not None and parent is not item:
+                    parent = parent.parent
+                if parent is None and not dst.named(item.name):
+                    item.move(dst, rnd.choice((None, 0)))
+            elif action == 2 and len(items) > 5:
+                rnd.choice(items).delete()
+            else:
+                v.toggle(rnd.choice(nodes))
+
+    def test_lazy(self):
+        # Action, expand a lazy node and one of its children, in a tree that holds at most 4 items of lazy nodes.
+        t = Tree(headings=['Type'], budget=4)
+        v = self.v = t.view()
+
+        def loader(node):
+            return [{'name': f'{node.name}-{idx}', 'loader': loader, 'columns': ['Node']} for idx in range(2)]
+
+        first = t.append(LazyNode(name='First', loader=loader))
+        second = t.append(LazyNode(name='Second', loader=loader))
+        v.expand(first)
+        v.expand(first[0])
+        self.t = t
+
+        # Asert, that the children show.
+        self.assertEqual(6, len(v))
+        self.check()
+
+        # Action, unload the node.
+        first.unload()
+
+        # Asert, that it shows collapsed.
+        self.assertEqual(2, len(v))
+        self.check()
+
+        # Action, expand it again, then the other node, over the budget.
+        v.expand(first)
+        v.expand(first[1])
+        v.expand(second)
+        v.expand(second[0])
+
+        # Asert, that the nodes unloaded to make room show collapsed.
+        self.assertFalse(first.is_loaded())
+        self.assertFalse(v.is_expanded(first))
+        self.assertEqual(6, len(v))
+        self.check()
+
+
+if __name__ == '__main__':
+    unittest.main()
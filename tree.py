@@ -1,41 +1,323 @@
+import re
+import gc
 from enum import IntEnum
+from fnmatch import translate
 from datetime import datetime
-from collections import deque
+from functools import lru_cache
+from contextlib import nullcontext
+from collections import deque, OrderedDict
+
+from columns import Column, ColumnStore
+from aggregates import Aggregates
+from rows import RowIndex
+from view import View
+from indexes import INDEXES
+from query import Query
+from journal import Journal
+from batch import Batch
+from locks import RWLock, reads, writes, moves, snapshot
+from snapshot import Snapshot, save as save_snapshot
+from jsonstream import read as read_json, write as write_json
+from render import write as write_rows
+from parallel import parallel_map, parallel_reduce
 
 const = IntEnum('Constants', 'END START', start=-1)
+glob = re.compile(r'[*?[]')
+
+
+def matcher(part):
+    # None stands for '**', plain names compare equal, wildcards become regex matchers.
+    if part == '**':
+        return None
+    elif glob.search(part):
+        return re.compile(translate(part)).match
+    return part
+
+
+class TreePath:
+    def __init__(self, query):
+        self.query = query
+        self.absolute = query.startswith('/')
+        self.parts = tuple(part for part in query.split('/') if part and part != '.')
+        self.matchers = tuple(matcher(part) for part in self.parts)
+
+    def __repr__(self):
+        return f'TreePath({self.query!r})'
+
+    def __len__(self):
+        return len(self.parts)
+
+    def resolve(self, node, start=0, load=True):
+        for item in self.resolve_all(node, start, load):
+            return item
+
+    def resolve_all(self, node, start=0, load=True):
+        # Walk one segment at a time, backtracking over siblings that share a name.
+        parts = self.parts
+        size = len(parts)
+        stack = [(node.tree if self.absolute else node, start)]
+        while stack:
+            item, pos = stack.pop()
+            if pos == size:
+                yield item
+                continue
+
+            part = parts[pos]
+            if part == '..':
+                if item.parent is not None:
+                    stack.append((item.parent, pos+1))
+            elif item.is_node() and (load or item.is_loaded()):
+                stack.extend((child, pos+1) for child in reversed(item.named(part)))
+
+
+@lru_cache(maxsize=1024)
+def compile_path(query):
+    return TreePath(query)
+
+
+class SharedColumns(list):
+    # A column list used by an item and its clones, copied by whichever side writes first.
+    __slots__ = ()
+
+
+class LazyChildren:
+    # Stands in for the children of a cloned node until they are first used,
+    # then copies the source's children one level down.
+    __slots__ = ('node', 'source')
+
+    def __init__(self, node, source):
+        self.node = node
+        self.source = source
+        tree = source.tree
+        if tree is not None:
+            tree._pending.setdefault(id(source), []).append(self)
+
+    def __repr__(self):
+        return f'LazyChildren({self.source!r})'
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __len__(self):
+        return len(self.load())
+
+    def __getitem__(self, idx):
+        return self.load()[idx]
+
+    def __delitem__(self, idx):
+        del self.load()[idx]
+
+    def __reversed__(self):
+        return reversed(self.load())
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+    def cancel(self):
+        tree = self.source.tree
+        pending = tree._pending.get(id(self.source)) if tree is not None else None
+        if not pending:
+            return
+
+        for idx, lazy in enumerate(pending):
+            if lazy is self:
+                del pending[idx]
+                break
+        if not pending:
+            del tree._pending[id(self.source)]
+
+    def load(self):
+        # In a concurrent tree, readers load nodes too, one at a time.
+        tree = self.node.tree
+        lock = tree._lock if tree is not None else None
+        if lock is None:
+            return self.fill()
+        with lock.loading:
+            return self.fill()
+
+    def fill(self):
+        # The children are put in place once they are complete, for other readers.
+        node = self.node
+        if node._children is not self:
+            return node._children
+
+        self.cancel()
+        tree = node.tree
+        staged = Node.__new__(Node)
+        staged._children = None
+        staged._names = None
+        for child in self.source:
+            staged._link(child._copy(node, tree))
+        node._names = staged._names or {}
+        node._children = staged._children or []
+        return node._children
+
+
+class LoaderChildren(LazyChildren):
+    # Stands in for the children of a LazyNode that are not loaded, and
+    # calls the node's loader when they are first used.
+    __slots__ = ()
+
+    def __init__(self, node):
+        self.node = node
+        self.source = None
+
+    def __repr__(self):
+        return f'LoaderChildren({self.node!r})'
+
+    def cancel(self):
+        pass
+
+    def fill(self):
+        node = self.node
+        tree = node.tree
+        if node._children is not self:
+            return node._children
+        elif tree is None:
+            return ()
+
+        staged = Node.__new__(Node)
+        staged.parent = node
+        staged._children = None
+        staged._names = None
+        items = tree._bulk_load(self.read(node) or [], parent=staged)
+        for child in staged._children or ():
+            child.parent = node
+        node._names = staged._names or {}
+        node._children = staged._children or []
+
+        self.hold(node, tree, items)
+        if tree._observers:
+            tree.announce('loaded', node)
+        if tree.budget is not None:
+            tree.evict(keep=node)
+        return node._children
+
+    def read(self, node):
+        return node.loader(node)
+
+    def hold(self, node, tree, items):
+        # Count the items loaded against the tree's budget.
+        node.size = len(items)
+        tree._loaded[id(node)] = node
+        tree._held += node.size
 
 
 class Base:
+    __slots__ = ('id', 'name', 'parent', '_columns', '_tree')
+    type = None
+
     def __init__(self, data=None, **kwargs):
-        self.type = None
+        self._tree = None
         if data:
             self.id = data.get('id')
             self.name = data.get('name')
             self.parent = data.get('parent')
-            self.columns = data.get('columns', [])
+            self._columns = data.get('columns', [])
         else:
             self.id = kwargs.get('id')
             self.name = kwargs.get('name')
             self.parent = kwargs.get('parent')
-            self.columns = kwargs.get('columns', [])
+            self._columns = kwargs.get('columns', [])
 
     @property
     def tree(self):
-        item = self
-        while not isinstance(item, Tree):
-            item = item.parent
-        return item
+        return self._tree
 
+    @property
+    def columns(self):
+        # Items in a columnar tree keep their values in the tree's column store.
+        tree = self._tree
+        if tree is not None and tree.store is not None:
+            return tree.store.row(self.id)
+        return self._columns
+
+    @columns.setter
+    @writes
+    def columns(self, values):
+        tree = self._tree
+        batch = tree._batch if tree is not None else None
+        old = self.columns if tree is not None and (tree._observers or batch is not None) else None
+        if tree is not None and tree._pending:
+            tree._unshare(self)
+        if tree is not None and tree.store is not None:
+            tree.store.put(self.id, values)
+        else:
+            self._columns = values
+
+        if old is not None:
+            new = self.columns
+            for idx in range(max(len(old), len(new))):
+                value = new[idx] if idx < len(new) else None
+                previous = old[idx] if idx < len(old) else None
+                if value is not previous and value != previous:
+                    if batch is not None:
+                        batch.changed(self, idx+1, previous, value)
+                    if tree._observers:
+                        tree.notify('changed', self, idx+1, previous, value)
+
+    @moves
     def clone(self, dst):
-        if isinstance(self, Node):
-            node = Node(name=self.name)
-            items = [node]
-            results = []
-            if isinstance(dst, Node):
-                dst.append(node)
-                results = node.populate(self.to_list())
+        # The copy shares column lists with the source, and its children are
+        # only copied, a level at a time, when they are first used.
+        if not isinstance(dst, Node):
+            return
 
-            return items + results
+        tree = dst.tree
+        if tree.unique and tree._batch is None and dst.named(self.name):
+            raise ValueError(f'duplicate name {self.name} found.')
+        if tree._pending:
+            tree._unshare(dst, structure=True)
+
+        item = self._copy(dst, tree)
+        ancestor = dst
+        while ancestor is not None and ancestor is not self:
+            ancestor = ancestor.parent
+        if ancestor is not None:
+            # Cloned into itself, the copy is made in full before it becomes part of what it copies.
+            stack = [item]
+            while stack:
+                node = stack.pop()
+                if isinstance(node, Node) and node._children.__class__ is LazyChildren:
+                    stack.extend(node._children.load())
+
+        dst._link(item)
+        if tree._batch is not None:
+            tree._batch.added(item)
+        if tree._observers:
+            tree.notify('added', item)
+        return item
+
+    def _copy(self, parent, tree):
+        cls = Node if isinstance(self, Tree) else self.__class__
+        item = cls.__new__(cls)
+        item.name = self.name
+        item.parent = parent
+        item._tree = tree
+        item.id = tree.next_id(item) if tree is not None else None
+
+        columns = self.columns
+        width = len(tree.headings) if tree is not None else len(columns)
+        if tree is not None and tree.store is not None:
+            tree.store.put(item.id, columns)
+            item._columns = None
+        elif columns is self._columns and len(columns) >= width:
+            if columns.__class__ is not SharedColumns:
+                columns = self._columns = SharedColumns(columns)
+            item._columns = columns
+        else:
+            item._columns = list(columns) + [None] * (width - len(columns))
+
+        if isinstance(item, LazyNode):
+            item.loader = self.loader
+            item.size = 0
+        if isinstance(item, Node):
+            item._names = None
+            if isinstance(self._children, LoaderChildren):
+                item._children = LoaderChildren(item)
+            else:
+                item._children = None if self._children is None else LazyChildren(item, self)
+        return item
 
     def get(self, columns=None):
         if columns is None:
@@ -45,18 +327,32 @@ class Base:
         elif not isinstance(columns, tuple):
             return
 
+        tree = self._tree
+        store = tree.store if tree is not None else None
+        width = store.width if store is not None else len(self._columns)
+
         data = []
         for column in columns:
-            if column < 0 or column > len(self.columns):
+            if column < 0 or column > width:
                 continue
             elif not column:
                 data.append(self.name)
-            elif 0 < column < len(self.columns)+1:
-                data.append(self.columns[column-1])
+            elif store is not None:
+                data.append(store.get(self.id, column-1))
+            else:
+                data.append(self._columns[column-1])
 
         return data[0] if len(data) == 1 else tuple(data) if data else None
 
     def set(self, columns, values):
+        # Called for each cell, so the lock is checked here rather than by a wrapper.
+        tree = self._tree
+        if tree is None or tree._lock is None:
+            return self._set(columns, values)
+        with tree._lock.write():
+            return self._set(columns, values)
+
+    def _set(self, columns, values):
         if isinstance(columns, int):
             columns = (columns, )
         elif not isinstance(columns, tuple):
@@ -65,13 +361,55 @@ class Base:
         if not isinstance(values, tuple):
             values = (values, )
 
+        tree = self._tree
+        store = tree.store if tree is not None else None
+        width = store.width if store is not None else len(self._columns)
+        if tree is not None and tree._pending:
+            tree._unshare(self)
+        if self._columns.__class__ is SharedColumns:
+            self._columns = list(self._columns)
+
+        observed = tree is not None and tree._observers
+        batch = tree._batch if tree is not None else None
         for column, value in dict(zip(columns, values)).items():
-            if column < 0 or column > len(self.columns):
+            if column < 0 or column > width:
                 continue
             elif not column:
-                self.name = value
+                self.rename(value)
+                continue
+            elif observed or batch is not None:
+                old = store.get(self.id, column-1) if store is not None else self._columns[column-1]
+
+            if store is not None:
+                store.set(self.id, column-1, value)
             else:
-                self.columns[column-1] = value
+                self._columns[column-1] = value
+            if batch is not None:
+                batch.changed(self, column, old, value)
+            if observed:
+                tree.notify('changed', self, column, old, value)
+
+    @writes
+    def rename(self, name):
+        parent = self.parent
+        if parent is None or name == self.name:
+            self.name = name
+            return
+
+        tree = parent.tree
+        if name in parent._names and tree.unique and tree._batch is None:
+            raise ValueError(f'duplicate name {name} found.')
+        if tree._pending:
+            tree._unshare(self)
+
+        old = self.name
+        parent.unindex_name(self)
+        self.name = name
+        parent.index_name(self, ordered=True)
+        if tree._batch is not None:
+            tree._batch.renamed(self, old)
+        if tree._observers:
+            tree.notify('renamed', self, old)
 
     def path(self):
         uri = []
@@ -81,10 +419,90 @@ class Base:
             item = item.parent
         return '/'.join(list(reversed(uri))).lstrip('.')
 
+    @writes
     def delete(self, item=None):
         node = item if item else self
+        tree = node.tree
+        if tree._pending:
+            tree._unshare(node.parent, structure=True)
         parent = node.parent
-        del parent[parent.index(node)]
+        idx = parent.index(node) if tree._observers or tree._batch is not None else None
+        node._unlink(idx)
+        tree.unregister(node)
+        if tree._batch is not None:
+            tree._batch.removed(node, parent, idx)
+        if tree._observers:
+            tree.notify('removed', node, parent, idx)
+
+    @moves
+    def move(self, dst, idx=None):
+        # Reparent the item, keeping its identity and id. Moving to another
+        # tree renumbers only the items whose ids are taken there.
+        if not isinstance(dst, Node):
+            return
+
+        ancestor = dst
+        while ancestor is not None:
+            if ancestor is self:
+                raise ValueError(f'cannot move {self.name} into itself.')
+            ancestor = ancestor.parent
+
+        tree = dst.tree
+        if tree.unique and tree._batch is None and any(child is not self for child in dst.named(self.name)):
+            raise ValueError(f'duplicate name {self.name} found.')
+
+        if idx is not None and idx == int(const.END):
+            idx = None
+        elif idx is not None and idx < int(const.START):
+            idx = int(const.START)
+
+        src = self._tree
+        parent = self.parent
+        if src is not None and src._pending and parent is not None:
+            src._unshare(parent, structure=True)
+        if tree._pending:
+            tree._unshare(dst, structure=True)
+        batch = src._batch if src is not None else None
+        observed = parent is not None and src is not None and (src._observers or batch is not None)
+        old = parent.index(self) if observed else None
+        if parent is not None:
+            self._unlink(old)
+        if src is not tree:
+            if src is not None:
+                src.unregister(self)
+            tree.adopt(self)
+
+        dst._link(self, idx)
+        self.parent = dst
+        if src is tree and observed:
+            if batch is not None:
+                batch.moved(self, parent, old)
+            if tree._observers:
+                tree.notify('moved', self, parent, old)
+        else:
+            if observed and batch is not None:
+                batch.removed(self, parent, old)
+            if observed and src._observers:
+                src.notify('removed', self, parent, old)
+            if tree._batch is not None:
+                tree._batch.added(self)
+            if tree._observers:
+                tree.notify('added', self)
+        return self
+
+    def _unlink(self, idx=None):
+        # Pass the item's position when it is known, to save searching for it.
+        parent = self.parent
+        children = parent._children
+        if idx is None:
+            try:
+                idx = children.index(self)
+            except ValueError:
+                pass
+        if idx is not None:
+            del children[idx]
+
+        parent.unindex_name(self)
 
     def is_node(self, item=None):
         if item is None:
@@ -93,9 +511,11 @@ class Base:
 
 
 class Leaf(Base):
+    __slots__ = ()
+    type = 'Leaf'
+
     def __init__(self, data=None,  **kwargs):
         super().__init__(data, **kwargs)
-        self.type = 'Leaf'
         if self.parent is not None:
             self.parent.append(self)
 
@@ -103,90 +523,229 @@ class Leaf(Base):
         return None
 
 
-class Node(Base, deque):
+class Node(Base):
+    __slots__ = ('_children', '_names')
+    type = 'Node'
+
     def __init__(self, data=None, **kwargs):
+        # Child storage and the name index are allocated with the first child.
+        self._children = None
+        self._names = None
         Base.__init__(self, data, **kwargs)
-        deque.__init__(self)
-        self.type = 'Node'
         if self.parent is not None:
             self.parent.append(self)
 
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.name!r})'
+
+    def __len__(self):
+        return len(self._children) if self._children else 0
+
+    def __iter__(self):
+        return iter(self._children or ())
+
+    def __reversed__(self):
+        return reversed(self._children or ())
+
+    def __contains__(self, item):
+        return any(child is item for child in self)
+
+    def __getitem__(self, idx):
+        if self._children is None:
+            raise IndexError('index out of range')
+        return self._children[idx]
+
+    def __delitem__(self, idx):
+        if self._children is None:
+            raise IndexError('index out of range')
+        self._children[idx].delete()
+
+    def index(self, item):
+        # Items compare by identity, so the children's own search finds the item.
+        if self._children:
+            try:
+                return self._children.index(item)
+            except ValueError:
+                pass
+        raise ValueError(f'{item!r} is not in node.')
+
     @property
     def children(self):
         return self
 
-    def move(self, dst):
-        if isinstance(dst, Node):
-            node = Node(name=self.name)
-            items = [node]
-            dst.append(node)
-            items += node.populate(self.to_list())
-            self.delete()
-            return items
+    def is_loaded(self):
+        return not isinstance(self._children, LoaderChildren)
+
+    def named(self, name):
+        # The name index holds a single child, or a list once a name repeats.
+        if self._names is None and self._children is not None:
+            self._children.load()
+        found = self._names.get(name) if self._names else None
+        if found is None:
+            return ()
+        return found if found.__class__ is list else (found, )
+
+    def index_name(self, item, ordered=False):
+        names = self._names
+        found = names.get(item.name)
+        if found is None:
+            names[item.name] = item
+        elif ordered:
+            names[item.name] = [child for child in self._children if child.name == item.name]
+        elif found.__class__ is list:
+            found.append(item)
+        else:
+            names[item.name] = [found, item]
+
+    def _link(self, item, idx=None):
+        if self._children is None:
+            self._children = []
+            self._names = {}
 
+        if idx is None:
+            self._children.append(item)
+            self.index_name(item)
+        else:
+            self._children.insert(idx, item)
+            self.index_name(item, ordered=True)
+
+    def unindex_name(self, item):
+        names = self._names
+        found = names.get(item.name)
+        if found is item:
+            del names[item.name]
+        elif found.__class__ is list:
+            for idx, sibling in enumerate(found):
+                if sibling is item:
+                    del found[idx]
+                    break
+            if len(found) == 1:
+                names[item.name] = found[0]
+
+    @reads
     def show(self, **kwargs):
-        label = kwargs.get('label', '')
-        indent = kwargs.get('indent', 2)
-        index_pad = kwargs.get('index_pad', 2)
-        parent = kwargs.get('parent', self)
-
-        def walk(_parent, level=0):
-            if not _parent.is_node():
-                return _parent
-
-            for idx, _node in enumerate(_parent):
-                pad = '' if not level else ' ' * (indent * level)
-                columns = '' if not _node.columns else f', {str(_node.columns)}'
-                print(f' {str(_node.id).zfill(index_pad)}:{pad} {_node.name}{columns}')
-                if _parent.is_node(_node):
-                    walk(_node, level+1)
-
-        header_postfix = f', Columns: {str(self.tree.headings)}' if self.tree.headings else ''
-        if label:
-            label = f' {label}\n'
-        print('-----------------------------------------------------')
-        print(f'{label}   ID: Name{header_postfix}')
-        print('-----------------------------------------------------')
-        walk(parent)
+        write_rows(kwargs.pop('parent', self), **kwargs)
+
+    @reads
+    def render(self, stream=None, format='tree', **kwargs):
+        # Formats are 'tree', as show prints, 'csv', 'tsv' and 'fixed'. See render.write.
+        write_rows(self, stream, format, **kwargs)
+
+    @reads
+    def select(self, where=None, **kwargs):
+        # Items below this node matching where, a predicate from query.py, a
+        # callable or a dict of column values, and the depth, type, limit,
+        # order_by and load keywords. Matches found by walking come in preorder.
+        return Query(self, where, **kwargs).run()
+
+    @reads
+    def explain(self, where=None, **kwargs):
+        # How select would find the items, and how many it looked at.
+        return Query(self, where, **kwargs).explain()
+
+    @snapshot
+    def walk(self, load=True):
+        # Without load, nodes whose children are not loaded are shown as empty.
+        stack = [iter(self)]
+        while stack:
+            for item in stack[-1]:
+                yield item, len(stack)-1
+                if isinstance(item, Node) and (load or item.is_loaded()) and item._children:
+                    stack.append(iter(item._children))
+                    break
+            else:
+                stack.pop()
+
+    @snapshot
+    def iter_preorder(self, load=True):
+        stack = [iter(self)]
+        while stack:
+            for item in stack[-1]:
+                yield item
+                if isinstance(item, Node) and (load or item.is_loaded()) and item._children:
+                    stack.append(iter(item._children))
+                    break
+            else:
+                stack.pop()
+
+    @snapshot
+    def iter_postorder(self):
+        stack = [iter(self)]
+        parents = []
+        while stack:
+            for item in stack[-1]:
+                if isinstance(item, Node) and item._children:
+                    stack.append(iter(item._children))
+                    parents.append(item)
+                    break
+                yield item
+            else:
+                stack.pop()
+                if parents:
+                    yield parents.pop()
+
+    @snapshot
+    def iter_bfs(self):
+        queue = deque((self, ))
+        while queue:
+            for item in queue.popleft():
+                yield item
+                if isinstance(item, Node) and item._children:
+                    queue.append(item._children)
 
     def query(self, query):
         if isinstance(query, int):
             item = self.find_by_id(query)
-        elif isinstance(query, str):
+        elif isinstance(query, (str, TreePath)):
             item = self.find(query)
         else:
             item = None
 
         return item
 
+    @writes
     def append(self, item, parent=None) -> str:
-        parent = parent if parent else self
+        parent = parent if parent is not None else self
 
-        if self.tree.unique:
-            for i in parent:
-                if i.name == item.name:
-                    raise ValueError(f'duplicate name {item.name} found.')
+        tree = parent.tree
+        if tree.unique and tree._batch is None and parent.named(item.name):
+            raise ValueError(f'duplicate name {item.name} found.')
+        if tree._pending:
+            tree._unshare(parent, structure=True)
 
         new_item = None
         if isinstance(item, Leaf) or isinstance(item, Node):
-            super(Node, self).append(item)
+            parent._link(item)
 
-            new_item = parent[len(parent)-1]
-            if new_item.parent is None:
-                new_item.parent = parent
+            new_item = item
+            new_item.parent = parent
 
-            item.id = self.tree.next_id()
-            item.columns += [None] * (len(self.tree.headings) - len(item.columns))
+            if item._columns is None:
+                item._columns = item.columns
+            if item.is_node() and item.is_loaded() and item._children:
+                # Children keep their ids, unless they are taken here, see adopt.
+                item.id = None
+                tree.adopt(item)
+            else:
+                item.id = tree.next_id(item)
+                item._columns += [None] * (len(tree.headings) - len(item._columns))
+                tree.register(item)
+            if tree._batch is not None:
+                tree._batch.added(item)
+            if tree._observers:
+                tree.notify('added', item)
 
         return new_item
 
+    @writes
     def insert(self, idx, item, parent=None):
-        parent = parent if parent else self
+        parent = parent if parent is not None else self
 
-        if self.tree.unique:
-            for i in parent:
-                if i.name == item.name:
-                    raise ValueError(f'duplicate name {item.name}" found.')
+        tree = parent.tree
+        if tree.unique and tree._batch is None and parent.named(item.name):
+            raise ValueError(f'duplicate name {item.name}" found.')
+        if tree._pending:
+            tree._unshare(parent, structure=True)
 
         if idx == int(const.END):
             idx = len(parent)
@@ -194,60 +753,88 @@ class Node(Base, deque):
             idx = int(const.START)
 
         if isinstance(item, Leaf) or isinstance(item, Node):
-            super(Node, self).insert(idx, item)
-
-            if item.parent is None:
-                item.parent = parent
-
-            item.id = self.tree.next_id()
-            item.columns += [None] * (len(self.tree.headings) - len(item.columns))
+            parent._link(item, idx)
+            item.parent = parent
+
+            if item._columns is None:
+                item._columns = item.columns
+            if item.is_node() and item.is_loaded() and item._children:
+                # Children keep their ids, unless they are taken here, see adopt.
+                item.id = None
+                tree.adopt(item)
+            else:
+                item.id = tree.next_id(item)
+                item._columns += [None] * (len(tree.headings) - len(item._columns))
+                tree.register(item)
+            if tree._batch is not None:
+                tree._batch.added(item)
+            if tree._observers:
+                tree.notify('added', item)
         return item
 
-    def to_list(self, parent=None):
-        def set_data(_item, _data):
-            for node in _item:
-                _item_data = {'name': node.name, 'columns': node.columns}
-                _data.append(_item_data)
-                if node.is_node():
-                    _item_data['children'] = []
-                    set_data(node, _item_data['children'])
-
+    @reads
+    def to_list(self, parent=None, load=True):
         data = []
-        parent = parent if parent else self
-        for item in parent:
-            if item.is_node():
-                item_data = {'name': item.name, 'columns': item.columns, 'children': []}
-                data.append(item_data)
-                set_data(item, item_data['children'])
-            else:
+        parent = parent if parent is not None else self
+        stack = [(iter(parent), data)]
+        while stack:
+            items, _data = stack[-1]
+            for item in items:
                 item_data = {'name': item.name, 'columns': item.columns}
-                data.append(item_data)
-        return data
-
-    def populate(self, data, **kwargs):
-        def walk(parent, item):
-            if 'children' in item:
-                new_node = Node(**item)
-                parent.append(new_node, parent=parent)
-                if 'children' in item and len(item['children']):
-                    for node in item['children']:
-                        walk(new_node, node)
+                _data.append(item_data)
+                if isinstance(item, Node):
+                    item_data['children'] = []
+                    if (load or item.is_loaded()) and item:
+                        stack.append((iter(item), item_data['children']))
+                        break
             else:
-                new_node = Leaf(**item)
-                parent.append(new_node, parent=parent)
+                stack.pop()
+        return data
 
-            items.append(new_node)
+    @reads
+    def dump_json(self, stream):
+        # Write what to_list would return as JSON, while walking the items.
+        write_json(self, stream)
 
+    @writes
+    def populate(self, data, **kwargs):
         if not data:
             return
 
+        if kwargs.get('fast', False):
+            return self.tree.bulk_load(data, parent=kwargs.get('parent', self))
+
         items = []
-        if isinstance(data, list):
-            for cfg in data:
-                walk(kwargs.get('parent', self), cfg)
+        if not isinstance(data, list):
+            return items
+
+        # Nodes are listed after their children, as they are completed.
+        stack = [(kwargs.get('parent', self), iter(data))]
+        while stack:
+            parent, entries = stack[-1]
+            for item in entries:
+                if 'loader' in item:
+                    new_node = LazyNode(**item)
+                    parent.append(new_node, parent=parent)
+                    items.append(new_node)
+                    continue
+                elif 'children' in item:
+                    new_node = Node(**item)
+                    parent.append(new_node, parent=parent)
+                    stack.append((new_node, iter(item['children'] or ())))
+                    break
+
+                new_leaf = Leaf(**item)
+                parent.append(new_leaf, parent=parent)
+                items.append(new_leaf)
+            else:
+                stack.pop()
+                if stack:
+                    items.append(parent)
 
         return items
 
+    @reads
     def get_cell(self, row, column):
         item = self.query(row)
         if item is None:
@@ -257,6 +844,7 @@ class Node(Base, deque):
         else:
             return self.name
 
+    @writes
     def set_cell(self, row, column, value):
         item = self.query(row)
         if item is None:
@@ -264,105 +852,691 @@ class Node(Base, deque):
         elif column:
             item.set(column, value)
         else:
-            item.name = value
-
-    def find_all(self, query, recursive=False):
-        def find(item):
-            if item.name == query:
-                items.append(item)
-
-            for child in item:
-                if '/' in query and query not in child.path() and child.is_node():
-                    for d in child:
-                        if query in d.path() and d not in items:
-                            items.append(d)
-                        if d.is_node() and recursive:
-                            find(d)
-                elif query in child.path() and child not in items:
-                    items.append(child)
-                elif recursive and child.is_node():
-                    find(child)
-
-        items = []
-        find(self)
-        return items
+            item.rename(value)
+
+    def find_all(self, query, recursive=False, lazy=False, load=True):
+        items = self.iter_find(query, recursive, load)
+        return items if lazy else list(items)
+
+    @snapshot
+    def iter_find(self, query, recursive=False, load=True):
+        # Match the pattern one segment per level, tracking every position the
+        # pattern could be at. Relative patterns match anywhere when recursive.
+        path = query if isinstance(query, TreePath) else compile_path(query)
+        matchers = path.matchers
+        if recursive and not path.absolute:
+            matchers = (None, ) + matchers
+        size = len(matchers)
+
+        closures = {}
+
+        def closure(states):
+            key = frozenset(states)
+            if key not in closures:
+                result = set()
+                for pos in states:
+                    result.add(pos)
+                    while pos < size and matchers[pos] is None:
+                        pos += 1
+                        result.add(pos)
+                closures[key] = (size in result, tuple(pos for pos in result if pos < size))
+            return closures[key]
+
+        seen = set()
+        stack = [(self.tree if path.absolute else self, False, closure((0, ))[1])]
+        while stack:
+            parent, matched, active = stack.pop()
+            if matched and id(parent) not in seen:
+                seen.add(id(parent))
+                yield parent
+
+            if not active or not parent.is_node() or not (load or parent.is_loaded()) or not parent._children:
+                continue
 
+            moves = []
+            if len(active) == 1 and matchers[active[0]].__class__ is str:
+                pos = active[0]
+                for child in parent.named(matchers[pos]):
+                    moves.append((child, closure((pos+1, ))))
+            else:
+                for child in parent:
+                    states = []
+                    for pos in active:
+                        match = matchers[pos]
+                        if match is None:
+                            states.append(pos)
+                        elif match.__class__ is str:
+                            if match == child.name:
+                                states.append(pos+1)
+                        elif match(str(child.name)):
+                            states.append(pos+1)
+                    if states:
+                        moves.append((child, closure(states)))
+
+            for child, (matched, states) in reversed(moves):
+                stack.append((child, matched, states))
+
+    @reads
     def find_by_id(self, _id):
-        for child in self:
-            if child.id == _id:
-                return child
+        item = self.tree.fetch(_id)
+        if item is None or item.id != _id:
+            return
 
-            if child.is_node() and len(child):
-                result = child.query(_id)
-                if result is not None:
-                    return result
+        parent = item.parent
+        while parent is not None and parent is not self:
+            parent = parent.parent
 
+        return item if parent is self else None
+
+    @reads
     def find(self, query, **kwargs):
         def search(parent, _query):
-            for _child in parent:
-                if _child.name == _query:
-                    return _child
-
-            for _child in parent:
-                if _child.is_node():
-                    result = search(_child, _query)
-                    if result is not None:
-                        return result
+            if not (load or parent.is_loaded()):
+                return
+            found = parent.named(_query)
+            if found:
+                return found[0]
+
+            stack = [iter(parent)]
+            while stack:
+                for _child in stack[-1]:
+                    if isinstance(_child, Node) and (load or _child.is_loaded()) and _child._children:
+                        found = _child.named(_query)
+                        if found:
+                            return found[0]
+                        stack.append(iter(_child._children))
+                        break
+                else:
+                    stack.pop()
 
         _all = kwargs.get('all', False)
+        load = kwargs.get('load', True)
 
         if _all:
-            return self.find_all(query, recursive=kwargs.get('recursive', True))
-
-        if '/' in query:
-            if query.startswith('/'):
-                item = None
-                parts = query.lstrip('/').split('/', 1)
-                for child in self.tree:
-                    if child.name == parts[0]:
-                        item = child
-                        break
-            else:
-                parts = query.split('/', 1)
-                item = search(self, parts.pop(0))
+            return self.find_all(
+                query, recursive=kwargs.get('recursive', True), lazy=kwargs.get('lazy', False), load=load)
 
-            if item and query in item.path():
-                return item
-            elif item:
-                return item.find(parts[0])
-        else:
-            return search(self, query)
+        path = query if isinstance(query, TreePath) else compile_path(query)
+        item = path.resolve(self, load=load)
+
+        # A relative path whose first name is not a child of this node is
+        # anchored at the first item with that name, anywhere below it.
+        if item is None and not path.absolute and path.parts and path.parts[0] != '..':
+            head = search(self, path.parts[0])
+            if head is not None:
+                item = path.resolve(head, start=1, load=load)
+
+        return item
+
+
+class LazyNode(Node):
+    # A node whose children come from loader(node), called the first time they
+    # are used. The loader returns data in the shape populate takes, where an
+    # entry with a 'loader' key is itself a lazy node.
+    __slots__ = ('loader', 'size')
+
+    def __init__(self, data=None, **kwargs):
+        self.loader = (data or kwargs).get('loader')
+        self.size = 0
+        super().__init__(data, **kwargs)
+        self._children = LoaderChildren(self)
+
+    def __iter__(self):
+        self.touch()
+        return Node.__iter__(self)
+
+    def __len__(self):
+        self.touch()
+        return Node.__len__(self)
+
+    def __getitem__(self, idx):
+        self.touch()
+        return Node.__getitem__(self, idx)
+
+    def named(self, name):
+        self.touch()
+        return Node.named(self, name)
+
+    def index(self, item):
+        self.touch()
+        return Node.index(self, item)
+
+    def touch(self):
+        tree = self._tree
+        if tree is not None and id(self) in tree._loaded:
+            tree._loaded.move_to_end(id(self))
+
+    def unload(self):
+        # Put the placeholder back. The items are dropped, and get new ids when loaded again.
+        if not self.is_loaded():
+            return
+
+        tree = self._tree
+        if tree is not None:
+            if tree._pending:
+                tree._unshare(self, structure=True)
+            if tree._observers:
+                tree.announce('unloaded', self)
+            for child in Node.__iter__(self):
+                tree.unregister(child)
+            if tree._loaded.pop(id(self), None) is not None:
+                tree._held -= self.size
+        self.size = 0
+        self._children = LoaderChildren(self)
+        self._names = None
 
 
 class Tree(Node):
+    __slots__ = (
+        'items', 'unique', 'headings', 'label', 'store', 'budget',
+        '_ids', '_pending', '_loaded', '_held', '_observers', '_indexes',
+        '_journal', '_batch', '_lock',
+    )
+    type = 'Tree'
+
     def __init__(self, **kwargs):
         self.items = 0
+        self._ids = {}
+        self._pending = {}
+        self._loaded = OrderedDict()
+        self._held = 0
+        self._observers = []
+        self._indexes = {}
+        self._journal = None
+        self._batch = None
+        self._lock = RWLock() if kwargs.get('concurrent') else None
+        self.budget = kwargs.get('budget')
         self.unique = kwargs.get('unique', True)
         self.headings = kwargs.get('headings', [])
+        self.store = ColumnStore(self.headings, kwargs.get('dtypes')) if kwargs.get('columnar') else None
         super().__init__()
 
         self.id = 0
         self.name = '.'
         self.label = kwargs.get('label', '')
-        self.type = 'Tree'
         self.parent = None
+        self._tree = self
 
-    def next_id(self):
+    def next_id(self, item=None):
         self.items += 1
+        if item is not None:
+            self._ids[self.items] = item
         return self.items
 
+    def fetch(self, _id):
+        return self._ids.get(_id)
+
+    def column_index(self, column):
+        # Columns are numbered from 1, column 0 being the name, or named by their heading.
+        return column if isinstance(column, int) else self.headings.index(column)+1
+
+    @writes
+    def observe(self, observer):
+        # The observer's added, removed, moved, renamed and changed methods are
+        # called after each change to the tree.
+        self._observers.append(observer)
+
+    @writes
+    def unobserve(self, observer):
+        self._observers.remove(observer)
+
+    def notify(self, event, *args):
+        for observer in self._observers:
+            getattr(observer, event)(*args)
+
+    def announce(self, event, node):
+        # Lazy loads and unloads are not changes, and are told only to the
+        # observers with loaded and unloaded methods, as indexes have.
+        for observer in self._observers:
+            method = getattr(observer, event, None)
+            if method is not None:
+                method(node)
+
+    @writes
+    def subscribe(self, subscriber, batch=None):
+        # The subscriber is called with lists of change events, see Journal.
+        # Until a first subscriber, changes cost only the check for observers.
+        if self._journal is None:
+            self._journal = Journal(self)
+        if batch is not None:
+            self._journal.batch = batch
+        self._journal.subscribe(subscriber)
+
+    @writes
+    def unsubscribe(self, subscriber):
+        journal = self._journal
+        journal.unsubscribe(subscriber)
+        if not journal.subscribers:
+            self._journal = None
+
+    @writes
+    def flush_events(self):
+        if self._journal is not None:
+            self._journal.flush()
+
+    def reading(self):
+        # In a concurrent tree, hold off writers across several reads that
+        # have to agree. Iterating a node directly is not locked, the walks
+        # as iter_preorder are, and hand out what they found under the lock.
+        return self._lock.read() if self._lock is not None else nullcontext()
+
+    def writing(self):
+        return self._lock.write() if self._lock is not None else nullcontext()
+
+    def batch(self):
+        # Changes made in a with block are committed, or undone on an
+        # exception, as one. Duplicate names are allowed until the block ends. See Batch.
+        return Batch(self)
+
+    def register(self, item):
+        # Point the item at this tree, and index any children it arrives with.
+        store = self.store
+        item._tree = self
+        if store is not None:
+            store.put(item.id, item._columns)
+            item._columns = None
+        if not item.is_node() or not item.is_loaded():
+            return
+
+        stack = list(item)
+        while stack:
+            child = stack.pop()
+            child._tree = self
+            self._ids[child.id] = child
+            if store is not None:
+                store.put(child.id, child._columns)
+                child._columns = None
+            if child.is_node() and child.is_loaded():
+                stack.extend(child)
+
+    def _unshare(self, item, structure=False):
+        # Before an item changes, give clones that still read through its
+        # ancestors (and the item itself, for a change to its children) their own copies.
+        path = []
+        node = item if structure else item.parent
+        while node is not None:
+            path.append(node)
+            node = node.parent
+
+        for node in reversed(path):
+            for lazy in list(self._pending.get(id(node), ())):
+                lazy.load()
+
+    def evict(self, keep=None):
+        # Unload the least recently used lazy nodes until the items they hold
+        # fit the budget, sparing keep and the nodes above it.
+        budget = self.budget or 0
+        spared = set()
+        while keep is not None:
+            spared.add(id(keep))
+            keep = keep.parent
+
+        for key, node in list(self._loaded.items()):
+            if self._held <= budget:
+                break
+            elif key not in spared and key in self._loaded:
+                node.unload()
+
+    def unregister(self, item):
+        # Forget an item and its descendants, handing column values back to the items.
+        ids = self._ids
+        store = self.store
+        pending = self._pending
+        stack = [item]
+        while stack:
+            item = stack.pop()
+            if pending and id(item) in pending:
+                # Clones still reading through the item are copied while it is here.
+                for lazy in list(pending[id(item)]):
+                    lazy.load()
+            if store is not None:
+                item._columns = store.pop(item.id)
+            item._tree = None
+            if ids.get(item.id) is item:
+                del ids[item.id]
+            if isinstance(item, LazyNode) and self._loaded.pop(id(item), None) is not None:
+                self._held -= item.size
+                item.size = 0
+            if isinstance(item, Node) and isinstance(item._children, LazyChildren):
+                item._children.cancel()
+            elif isinstance(item, Node) and item._children:
+                stack.extend(item._children)
+
+    def adopt(self, item):
+        # Take in an item and its descendants from elsewhere, keeping the ids that are free here.
+        ids = self._ids
+        store = self.store
+        width = len(self.headings)
+
+        # New ids are handed out above every id the subtree keeps.
+        items = [item]
+        if isinstance(item, Node) and item.is_loaded():
+            items.extend(item.iter_preorder(load=False))
+        taken = self.taken([item.id for item in items if item.id is not None])
+        kept = [item.id for item in items if item.id is not None and item.id not in taken]
+        self.items = max(self.items, max(kept, default=0))
+
+        for item in items:
+            if item.id is None or item.id in taken or item.id in ids:
+                item.id = self.next_id(item)
+            else:
+                ids[item.id] = item
+
+            item._columns += [None] * (width - len(item._columns))
+            item._tree = self
+            if store is not None:
+                store.put(item.id, item._columns)
+                item._columns = None
+
+    def taken(self, ids):
+        # Those of the ids that items here have.
+        return {_id for _id in ids if _id in self._ids}
+
+    @writes
+    def bulk_load(self, data, parent=None):
+        parent = parent if parent is not None else self
+        items = self._bulk_load(data, parent)
+        if self._observers or self._batch is not None:
+            for item in list(parent)[len(parent) - len(data):]:
+                if self._batch is not None:
+                    self._batch.added(item)
+                if self._observers:
+                    self.notify('added', item)
+        return items
+
+    def _bulk_load(self, data, parent=None):
+        # Build the items detached, checking names once per node, then attach
+        # them in one step. Nothing is attached if a duplicate name is found.
+        # Entries may bring their own ids, as items read back from storage do.
+        parent = parent if parent is not None else self
+        items = []
+        if not data or not isinstance(data, list):
+            return items
+        if self._pending:
+            self._unshare(parent, structure=True)
+        if isinstance(parent._children, LazyChildren):
+            parent._children.load()
+
+        unique = self.unique
+        width = len(self.headings)
+        store = self.store
+        last_id = self.items
+        created = []
+        rows = []
+
+        def index(children):
+            names = {}
+            for child in children:
+                found = names.get(child.name)
+                if found is None:
+                    names[child.name] = child
+                elif unique:
+                    raise ValueError(f'duplicate name {child.name} found.')
+                elif found.__class__ is list:
+                    found.append(child)
+                else:
+                    names[child.name] = [found, child]
+            return names
+
+        # The cyclic collector would rescan the growing tree many times over.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            stack = [(parent, iter(data), [])]
+            while stack:
+                node, entries, children = stack[-1]
+                for entry in entries:
+                    _id = entry.get('id')
+                    if _id is None:
+                        last_id += 1
+                        _id = last_id
+                    columns = entry.get('columns')
+                    columns = list(columns) + [None] * (width - len(columns)) if columns else [None] * width
+
+                    loader = entry.get('loader')
+                    is_node = loader is None and 'children' in entry
+                    if loader is not None:
+                        item = LazyNode.__new__(LazyNode)
+                        item.loader = loader
+                        item.size = 0
+                        item._children = LoaderChildren(item)
+                        item._names = None
+                    else:
+                        item = Node.__new__(Node) if is_node else Leaf.__new__(Leaf)
+                    item.id = _id
+                    item.name = entry.get('name')
+                    item.parent = node
+                    item._tree = self
+                    if store is None:
+                        item._columns = columns
+                    else:
+                        item._columns = None
+                        rows.append(columns)
+
+                    children.append(item)
+                    created.append(item)
+                    if is_node:
+                        item._children = None
+                        item._names = None
+                        stack.append((item, iter(entry['children'] or ()), []))
+                        break
+                    items.append(item)
+                else:
+                    stack.pop()
+                    if not stack:
+                        break
+
+                    if children:
+                        node._children = children
+                        node._names = index(children)
+                    items.append(node)
+
+            names = index(children)
+            if unique and parent._names and not names.keys().isdisjoint(parent._names):
+                name = next(name for name in names if name in parent._names)
+                raise ValueError(f'duplicate name {name} found.')
+
+            if parent._children is None:
+                parent._children = []
+                parent._names = {}
+            parent._children.extend(children)
+            for child in children:
+                parent.index_name(child)
+
+            self.items = max(last_id, max((item.id for item in created), default=0))
+            self._ids.update((item.id, item) for item in created)
+            if store is not None:
+                store.reserve(last_id)
+                for item, columns in zip(created, rows):
+                    store.put(item.id, columns)
+        finally:
+            if enabled:
+                gc.enable()
+
+        return items
+
+    @reads
+    def save(self, path):
+        save_snapshot(self, path)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        # Rebuild a saved tree, keeping its ids. Pass columnar or dtypes to
+        # override how the saved tree kept its column values, and concurrent
+        # to share it between threads.
+        with Snapshot(path) as snapshot:
+            columnar = kwargs.get('columnar', snapshot.columnar)
+            tree = cls(
+                headings=snapshot.headings,
+                unique=snapshot.unique,
+                label=snapshot.label,
+                columnar=columnar,
+                dtypes=kwargs.get('dtypes', snapshot.dtypes),
+                concurrent=kwargs.get('concurrent', False),
+            )
+            width = snapshot.width
+            store = tree.store
+            table = snapshot.table()
+            lookup = table.__getitem__
+            ids = snapshot.ids
+            counts = snapshot.counts
+            names = snapshot.names
+            cells = snapshot.cells
+            parents = snapshot.parents
+
+            enabled = gc.isenabled()
+            gc.disable()
+            try:
+                items = []
+                for row in range(len(snapshot)):
+                    idx = parents[row]
+                    parent = items[idx] if idx >= 0 else tree
+                    if counts[row] < 0:
+                        item = Leaf.__new__(Leaf)
+                    else:
+                        item = Node.__new__(Node)
+                        item._children = [] if counts[row] else None
+                        item._names = {} if counts[row] else None
+                    item.id = ids[row]
+                    item.name = table[names[row]]
+                    item.parent = parent
+                    item._tree = tree
+
+                    columns = list(map(lookup, cells[row*width:(row+1)*width]))
+                    if store is None:
+                        item._columns = columns
+                    else:
+                        item._columns = None
+                        store.put(item.id, columns)
+
+                    if parent._children is None:
+                        parent._children = []
+                        parent._names = {}
+                    parent._children.append(item)
+                    parent.index_name(item)
+                    tree._ids[item.id] = item
+                    items.append(item)
+            finally:
+                if enabled:
+                    gc.enable()
+
+            tree.items = max(snapshot.items, max(tree._ids, default=0))
+        return tree
+
+    @classmethod
+    def load_json(cls, stream, **kwargs):
+        # Build a tree from JSON in the shape populate takes, appending each
+        # item as soon as it is read. The kwargs are passed on to the tree.
+        def create(parent, entry):
+            columns = entry.get('columns')
+            item = Node if 'children' in entry else Leaf
+            return parent.append(item(name=entry.get('name'), columns=list(columns) if columns else []))
+
+        tree = cls(**kwargs)
+        read_json(stream, tree, create)
+        return tree
+
+    @writes
     def reindex(self, start=0):
-        def walk(_parent):
-            for _item in _parent:
-                _item.id = self.next_id()
-                if _item.is_node():
-                    walk(_item)
+        rows = None
+        if self.store is not None:
+            rows = [self.store.row(item.id) for item in self.iter_preorder()]
+            self.store.clear()
 
         self.items = start
-        for item in self:
-            item.id = self.next_id()
-            if item.is_node():
-                walk(item)
+        self._ids = {}
+        for item in self.iter_preorder():
+            item.id = self.next_id(item)
+            if rows is not None:
+                self.store.put(item.id, rows[item.id-start-1])
+
+    @writes
+    def aggregates(self, **reducers):
+        # Descendant counts, depths, heights and column reducers given as
+        # name=(column, fn), kept up to date as the tree changes.
+        return Aggregates(self, **reducers)
+
+    @writes
+    def row_index(self):
+        # Preorder rows, found by row_of(item) and item_at(row), kept up to
+        # date as the tree changes instead of renumbering it with reindex.
+        return RowIndex(self)
+
+    @writes
+    def view(self):
+        # A tree view's rows, with expanded nodes, read a window at a time.
+        return View(self)
+
+    def parallel_map(self, fn, columns, workers=None, size=None):
+        # Fill columns with fn's results for each item, from worker processes. See parallel.py.
+        return parallel_map(self, fn, columns, workers, size)
+
+    def parallel_reduce(self, fn, combine, initial=None, workers=None, size=None):
+        return parallel_reduce(self, fn, combine, initial, workers, size)
+
+    @writes
+    def create_index(self, column, kind='hash'):
+        # Hash indexes find equal values, sorted ones ranges as well. A column
+        # has one index, a new one replacing the last. Column 0 is the name.
+        if kind not in INDEXES:
+            raise ValueError(f'unknown index kind {kind}.')
+        idx = self.column_index(column)
+        self.drop_index(idx)
+        index = self._indexes[idx] = INDEXES[kind](self, idx)
+        self.observe(index)
+        return index
+
+    @writes
+    def drop_index(self, column):
+        idx = self.column_index(column)
+        index = self._indexes.pop(idx, None)
+        if index is not None:
+            self.unobserve(index)
+
+    @reads
+    def lookup(self, column, value):
+        # Items whose column equals value, walking the tree when it has no index.
+        idx = self.column_index(column)
+        index = self._indexes.get(idx)
+        if index is not None:
+            return index.lookup(value)
+        return [item for item in self.iter_preorder() if item.get(idx) == value]
+
+    @reads
+    def range(self, column, lo=None, hi=None):
+        # Items with lo <= value < hi in value order, either bound left open
+        # with None, walking the tree when it has no sorted index.
+        idx = self.column_index(column)
+        index = self._indexes.get(idx)
+        if index is not None and index.kind == 'sorted':
+            return index.range(lo, hi)
+
+        matches = []
+        for item in self.iter_preorder():
+            value = item.get(idx)
+            try:
+                if value is not None and (lo is None or lo <= value) and (hi is None or value < hi):
+                    matches.append((value, len(matches), item))
+            except TypeError:
+                continue
+        return [item for _, _, item in sorted(matches)]
+
+    @reads
+    def column(self, column):
+        # Without a column store, the values are gathered from the items into a detached column.
+        if self.store is not None:
+            return self.store.column(column)
+
+        idx = self.column_index(column)
+        if not 0 < idx <= len(self.headings):
+            raise IndexError(f'column {column} out of range.')
+
+        values = [(item.id, item.get(idx)) for item in self.iter_preorder()]
+        result = Column(self.headings[idx-1])
+        result.grow(max((row for row, _ in values), default=-1)+1)
+        for row, value in values:
+            result[row] = value
+        return result
 
 
 def main():
@@ -565,7 +1739,8 @@ def main():
 
         t2 = Tree(headings=['Type', 'Date', 'Path'], unique=False)
 
-        for i in src.clone(t2):
+        node1 = src.clone(t2)
+        for i in (node1, *node1.iter_preorder()):
             i.set((1, 2, 3), (i.type, dt_string, i.path()))
 
         for i in t2.query('Node n1-2-2').populate(src.to_list()):
@@ -573,7 +1748,8 @@ def main():
 
         t2.show(label='Tree: Two')
 
-        for i in node2.move(t2):
+        node2.move(t2)
+        for i in (node2, *node2.iter_preorder()):
             i.set((1, 2, 3), (i.type, dt_string, i.path()))
 
         t1.show(label='Tree: One')
@@ -0,0 +1,288 @@
+from bisect import bisect_right
+from itertools import accumulate
+
+LOAD = 256
+
+
+class Children:
+    # The children of an expanded node, with the rows each shows, itself and
+    # those below it. As RowIndex holds rows, children are held in blocks of
+    # about LOAD, with Fenwick trees over the blocks' lengths and rows, so
+    # the rows of a child change, and children come and go, without a pass
+    # over their siblings.
+    def __init__(self, items, counts, load=LOAD):
+        self.load = load
+        self.blocks = [(items[idx:idx+load], counts[idx:idx+load]) for idx in range(0, len(items), load)] or [([], [])]
+        self.block = {}
+        for block in self.blocks:
+            for item in block[0]:
+                self.block[id(item)] = block
+        self.rebuild()
+
+    def rebuild(self):
+        blocks = self.blocks
+        self.position = {id(block): idx for idx, block in enumerate(blocks)}
+        self.lengths = self.build([len(items) for items, _ in blocks])
+        self.totals = self.build([sum(counts) for _, counts in blocks])
+
+    def build(self, values):
+        fenwick = [0] + values
+        for idx in range(1, len(fenwick)):
+            parent = idx + (idx & -idx)
+            if parent < len(fenwick):
+                fenwick[parent] += fenwick[idx]
+        return fenwick
+
+    def grow(self, fenwick, idx, count):
+        idx += 1
+        while idx < len(fenwick):
+            fenwick[idx] += count
+            idx += idx & -idx
+
+    def before(self, fenwick, idx):
+        # The sum over the blocks before block idx.
+        total = 0
+        while idx:
+            total += fenwick[idx]
+            idx -= idx & -idx
+        return total
+
+    def find(self, fenwick, value):
+        # The block value falls in, and what is left of it there.
+        idx = 0
+        step = 1 << (len(fenwick) - 1).bit_length()
+        while step:
+            nxt = idx + step
+            if nxt < len(fenwick) and fenwick[nxt] <= value:
+                idx = nxt
+                value -= fenwick[nxt]
+            step >>= 1
+        return idx, value
+
+    def change(self, item, count):
+        block = self.block[id(item)]
+        items, counts = block
+        counts[items.index(item)] += count
+        self.grow(self.totals, self.position[id(block)], count)
+
+    def insert(self, idx, item, count):
+        blocks = self.blocks
+        pos, offset = self.find(self.lengths, idx)
+        if pos >= len(blocks):
+            pos = len(blocks) - 1
+            offset = len(blocks[pos][0])
+
+        block = blocks[pos]
+        items, counts = block
+        items.insert(offset, item)
+        counts.insert(offset, count)
+        self.block[id(item)] = block
+        if len(items) <= 2 * self.load:
+            self.grow(self.lengths, pos, 1)
+            self.grow(self.totals, pos, count)
+            return
+
+        load = self.load
+        parts = [(items[start:start+load], counts[start:start+load]) for start in range(0, len(items), load)]
+        items[:], counts[:] = parts[0]
+        for part in parts[1:]:
+            for child in part[0]:
+                self.block[id(child)] = part
+        blocks[pos+1:pos+1] = parts[1:]
+        self.rebuild()
+
+    def place(self, node, item):
+        # Where an item just put among the node's children is. The blocks
+        # whose first child is still where it was are before it, so one
+        # block is searched.
+        children = node._children
+        blocks = self.blocks
+        lo, hi = 0, len(blocks)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            items = blocks[mid][0]
+            start = self.before(self.lengths, mid)
+            if items and start < len(children) and children[start] is items[0]:
+                lo = mid + 1
+            else:
+                hi = mid
+        if not lo:
+            return 0
+        start = self.before(self.lengths, lo-1)
+        return children.index(item, start, start + len(blocks[lo-1][0]) + 1)
+
+    def remove(self, item):
+        # Drop a child, returning the rows it showed.
+        block = self.block.pop(id(item))
+        items, counts = block
+        offset = items.index(item)
+        del items[offset]
+        count = counts.pop(offset)
+        pos = self.position[id(block)]
+        self.grow(self.lengths, pos, -1)
+        self.grow(self.totals, pos, -count)
+        if not items and len(self.blocks) > 1:
+            del self.blocks[pos]
+            self.rebuild()
+        return count
+
+    def locate(self, row):
+        # The index of the child showing a row, the child, and the row counted from the child's own.
+        pos, row = self.find(self.totals, row)
+        items, counts = self.blocks[pos]
+        ends = list(accumulate(counts))
+        offset = bisect_right(ends, row)
+        if offset:
+            row -= ends[offset-1]
+        return self.before(self.lengths, pos) + offset, items[offset], row
+
+
+class View:
+    # The rows a tree view shows: the top level, and the children of every
+    # expanded node whose ancestors are expanded too. Expanded nodes keep the
+    # number of rows shown below them, and their children with the rows each
+    # shows, updated as they change, so a window of rows is found by
+    # searching down from the top.
+    def __init__(self, tree, load=LOAD):
+        self.tree = tree
+        self.load = load
+        self.expanded = {id(tree)}
+        self.visible = {}
+        self.children = {}
+        self.build(tree)
+        tree.observe(self)
+
+    def __len__(self):
+        return self.visible[id(self.tree)]
+
+    def close(self):
+        self.tree.unobserve(self)
+
+    def is_expanded(self, node):
+        return id(node) in self.expanded
+
+    def build(self, node):
+        visible = self.visible
+        items = list(node)
+        counts = [1 + visible.get(id(child), 0) for child in items]
+        self.children[id(node)] = Children(items, counts, self.load)
+        count = visible[id(node)] = sum(counts)
+        return count
+
+    def expand(self, node):
+        if id(node) in self.expanded or not node.is_node():
+            return
+        count = self.build(node)
+        self.expanded.add(id(node))
+        self.shift(node.parent, count, node)
+
+    def collapse(self, node):
+        if id(node) not in self.expanded or node is self.tree:
+            return
+        count = self.visible.pop(id(node))
+        self.expanded.discard(id(node))
+        del self.children[id(node)]
+        self.shift(node.parent, -count, node)
+
+    def toggle(self, node):
+        if id(node) in self.expanded:
+            self.collapse(node)
+        else:
+            self.expand(node)
+
+    def shift(self, node, count, child=None):
+        # The rows below node changed by count, those of child when it is
+        # given, as do those of its expanded ancestors.
+        visible = self.visible
+        expanded = self.expanded
+        children = self.children
+        while node is not None and id(node) in expanded:
+            visible[id(node)] += count
+            if child is not None:
+                children[id(node)].change(child, count)
+            child = node
+            node = node.parent
+
+    def rows(self, start, count):
+        # The rows [start, start+count) as (item, depth, columns).
+        rows = []
+        if count <= 0 or not 0 <= start < len(self):
+            return rows
+
+        # Search down to the item on the start row, keeping where to go on from at each level.
+        stack = []
+        node = self.tree
+        depth = 0
+        children = self.children
+        while True:
+            idx, item, start = children[id(node)].locate(start)
+            stack.append([node, idx+1, depth])
+            if not start:
+                break
+            node = item
+            start -= 1
+            depth += 1
+
+        expanded = self.expanded
+        while True:
+            rows.append((item, depth, item.columns))
+            if len(rows) == count:
+                break
+            if id(item) in expanded:
+                stack.append([item, 0, depth+1])
+
+            while stack:
+                frame = stack[-1]
+                node, idx, depth = frame
+                if idx < len(node):
+                    frame[1] += 1
+                    item = node[idx]
+                    break
+                stack.pop()
+            else:
+                break
+        return rows
+
+    def forget(self, item):
+        # Drop the state of the nodes of a subtree that left the tree.
+        stack = [item]
+        while stack:
+            node = stack.pop()
+            if node.is_node() and node.is_loaded():
+                self.expanded.discard(id(node))
+                self.visible.pop(id(node), None)
+                self.children.pop(id(node), None)
+                stack.extend(node)
+
+    def added(self, item):
+        parent = item.parent
+        if id(parent) not in self.expanded:
+            return
+        count = 1 + self.visible.get(id(item), 0)
+        children = self.children[id(parent)]
+        idx = len(parent) - 1 if parent[-1] is item else children.place(parent, item)
+        children.insert(idx, item, count)
+        self.shift(parent, count)
+
+    def removed(self, item, parent, idx):
+        if id(parent) in self.expanded:
+            self.shift(parent, -self.children[id(parent)].remove(item))
+        self.forget(item)
+
+    def moved(self, item, parent, idx):
+        if id(parent) in self.expanded:
+            self.shift(parent, -self.children[id(parent)].remove(item))
+        self.added(item)
+
+    def unloaded(self, node):
+        # The children are dropped, so the node shows collapsed, as before it was first read.
+        if id(node) in self.expanded:
+            self.collapse(node)
+        for child in node._children or ():
+            self.forget(child)
+
+    def renamed(self, item, name):
+        pass
+
+    def changed(self, item, column, old, value):
+        pass